@@ -0,0 +1,278 @@
+"""
+Benchmark xrayctl workflows against a local Xray stub.
+
+Starts the stub (benchmarks/stub_server.py) in-process, then runs every
+scenario in a fresh interpreter, so peak memory is measured per scenario,
+and reports as JSON:
+
+- wall time (median of --runs)
+- throughput (records, or scans, per second)
+- requests served, and how many the stub throttled with 429
+- peak RSS
+
+Save a report before a change and pass it with --baseline afterwards to
+get the relative change of every metric.
+
+Scenarios:
+    refresh         refresh_inventory, buffered parquet output
+    refresh-stream  refresh_inventory with streaming output
+    rules           list_rules with fetch_all
+    scan            scan_artifact with wait, repeated --scans times
+
+Usage:
+    python benchmarks/run.py [--scenario refresh --scenario rules] [--runs 3]
+    python benchmarks/run.py --repos 100 --artifacts 5000 --latency-ms 20 --server-rate-limit 50
+    python benchmarks/run.py > before.json   # ...change...   python benchmarks/run.py --baseline before.json
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_server import XrayStub, add_config_args, config_from_args  # noqa: E402
+
+SCENARIOS = ("refresh", "refresh-stream", "rules", "scan")
+_WORKFLOW_MODULES = (
+    "xrayctl.api.client",
+    "xrayctl.workflows.artifacts",
+    "xrayctl.workflows.ignore_rules",
+    "xrayctl.workflows.scans",
+)
+
+
+# -- worker side (runs in a fresh interpreter) ---------------------------------
+
+
+def _client(url: str, params: Dict[str, Any]) -> Any:
+    from xrayctl.api.client import XrayClient
+    from xrayctl.api.ratelimit import AdaptiveRateLimiter
+
+    return XrayClient(
+        base_url=url,
+        token="benchmark",
+        pool_size=max(10, params["concurrency"]),
+        limiter=AdaptiveRateLimiter(params["rate_limit"]),
+    )
+
+
+def _refresh(stream: bool) -> Callable[[str, Dict[str, Any]], Tuple[int, bool, Dict[str, Any]]]:
+    def run(url: str, params: Dict[str, Any]) -> Tuple[int, bool, Dict[str, Any]]:
+        from xrayctl.workflows.artifacts import refresh_inventory
+
+        client = _client(url, params)
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, "inventory.parquet")
+            summary = refresh_inventory(
+                client,
+                out_path=out,
+                page_size=params["page_size"],
+                repo_page_size=200,
+                repo_regex=None,
+                include_repo_metadata=False,
+                concurrency=params["concurrency"],
+                stream=stream,
+                # Every run lists the repos, and leaves the user's repo catalog alone
+                catalog_path=os.path.join(tmp, "repos.sqlite"),
+                catalog_ttl=0,
+            )
+            extra = {"output_bytes": os.path.getsize(out), "repos_failed": summary["repos_failed"]}
+        return summary["artifacts_total"], summary["ok"], extra
+
+    return run
+
+
+def _rules(url: str, params: Dict[str, Any]) -> Tuple[int, bool, Dict[str, Any]]:
+    from xrayctl.workflows.ignore_rules import list_rules
+
+    out = list_rules(
+        _client(url, params),
+        watch=None,
+        policy=None,
+        vulnerability=None,
+        cve=None,
+        license_name=None,
+        component_name=None,
+        component_version=None,
+        page=1,
+        rows=params["rows"],
+        order_by=None,
+        direction=None,
+        expires_before=None,
+        expires_after=None,
+        fetch_all=True,
+        concurrency=params["concurrency"],
+    )
+    return len(out["response"]["data"]), out["ok"], {}
+
+
+def _scan(url: str, params: Dict[str, Any]) -> Tuple[int, bool, Dict[str, Any]]:
+    from xrayctl.workflows.scans import scan_artifact
+
+    client = _client(url, params)
+    durations: List[float] = []
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        history = os.path.join(tmp, "scan_durations.json")
+        for i in range(params["scans"]):
+            start = time.perf_counter()
+            out = scan_artifact(
+                client,
+                component_id=f"npm://pkg-{i}:1.0.0",
+                wait=True,
+                repo="repo-0000",
+                path=f"/org/pkg-{i}/pkg-{i}.tgz",
+                poll_seconds=params["poll_seconds"],
+                timeout_seconds=params["scan_timeout"],
+                max_poll_seconds=params["max_poll_seconds"],
+                history_path=history,
+            )
+            durations.append(time.perf_counter() - start)
+            ok = ok and bool(out.get("ok"))
+    return len(durations), ok, {"scan_s": [round(d, 2) for d in durations]}
+
+
+_WORKERS: Dict[str, Callable[[str, Dict[str, Any]], Tuple[int, bool, Dict[str, Any]]]] = {
+    "refresh": _refresh(stream=False),
+    "refresh-stream": _refresh(stream=True),
+    "rules": _rules,
+    "scan": _scan,
+}
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def _worker(scenario: str, url: str, params: Dict[str, Any]) -> None:
+    # Import the whole stack up front so the measurement covers the work, not module loading.
+    for module in _WORKFLOW_MODULES:
+        importlib.import_module(module)
+
+    rss_before = _peak_rss_mb()
+    start = time.perf_counter()
+    items, ok, extra = _WORKERS[scenario](url, params)
+    wall = time.perf_counter() - start
+    result = {"items": items, "ok": ok, "wall_s": wall, "rss_before_mb": rss_before, "peak_rss_mb": _peak_rss_mb()}
+    print(json.dumps(dict(result, **extra)))
+
+
+# -- driver side ------------------------------------------------------------------
+
+
+def _run_scenario(stub: XrayStub, scenario: str, params: Dict[str, Any], runs: int) -> Dict[str, Any]:
+    results = []
+    for _ in range(runs):
+        stub.reset_stats()
+        cmd = [sys.executable, os.path.abspath(__file__), "--worker", scenario, "--url", stub.url]
+        proc = subprocess.run(cmd + ["--params", json.dumps(params)], capture_output=True, text=True)
+        if proc.returncode != 0:
+            lines = proc.stderr.strip().splitlines()
+            return {"ok": False, "error": lines[-1] if lines else "worker failed"}
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        result["requests"] = stub.stats.requests
+        result["throttled"] = stub.stats.throttled
+        result["bytes_received"] = stub.stats.bytes_sent
+        results.append(result)
+
+    walls = [r["wall_s"] for r in results]
+    median = sorted(results, key=lambda r: r["wall_s"])[len(results) // 2]
+    report = {k: v for k, v in median.items() if k not in ("wall_s",)}
+    report["wall_s"] = round(statistics.median(walls), 3)
+    report["wall_s_runs"] = [round(w, 3) for w in walls]
+    report["throughput_per_s"] = round(median["items"] / median["wall_s"], 1) if median["wall_s"] > 0 else None
+    report["peak_rss_mb"] = max((r["peak_rss_mb"] for r in results if r["peak_rss_mb"] is not None), default=None)
+    return report
+
+
+def _compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+    changes: Dict[str, Dict[str, str]] = {}
+    for scenario, now in report["scenarios"].items():
+        before = (baseline.get("scenarios") or {}).get(scenario)
+        if not before:
+            continue
+        delta: Dict[str, str] = {}
+        for metric in ("wall_s", "throughput_per_s", "peak_rss_mb", "requests"):
+            old, new = before.get(metric), now.get(metric)
+            if isinstance(old, (int, float)) and isinstance(new, (int, float)) and old:
+                delta[metric] = f"{(new - old) / old * 100:+.1f}%"
+        changes[scenario] = delta
+    return changes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--scenario", action="append", choices=SCENARIOS, help="Scenario to run (repeatable, default: all)"
+    )
+    parser.add_argument("--runs", type=int, default=3, help="Runs per scenario; the median is reported")
+    parser.add_argument("--baseline", default=None, help="Previous report to compare against")
+    group = parser.add_argument_group("client")
+    group.add_argument("--concurrency", type=int, default=4)
+    group.add_argument("--page-size", type=int, default=1000, help="Artifacts page size for refresh")
+    group.add_argument("--rows", type=int, default=100, help="Ignore rules page size")
+    group.add_argument("--rate-limit", type=float, default=None, help="Client-side starting rate (requests/s)")
+    group.add_argument("--scans", type=int, default=3)
+    group.add_argument("--poll-seconds", type=int, default=1)
+    group.add_argument("--max-poll-seconds", type=int, default=5)
+    group.add_argument("--scan-timeout", type=int, default=120)
+    add_config_args(parser.add_argument_group("stub server"))
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--url", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--params", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.worker, args.url, json.loads(args.params))
+        return
+    if args.runs < 1:
+        parser.error("--runs must be >= 1")
+
+    params = {
+        "concurrency": args.concurrency,
+        "page_size": args.page_size,
+        "rows": args.rows,
+        "rate_limit": args.rate_limit,
+        "scans": args.scans,
+        "poll_seconds": args.poll_seconds,
+        "max_poll_seconds": args.max_poll_seconds,
+        "scan_timeout": args.scan_timeout,
+    }
+    stub = XrayStub(config_from_args(args)).start()
+    try:
+        report: Dict[str, Any] = {
+            "python": sys.version.split()[0],
+            "stub": asdict(stub.config),
+            "client": params,
+            "scenarios": {s: _run_scenario(stub, s, params, args.runs) for s in (args.scenario or SCENARIOS)},
+        }
+    finally:
+        stub.shutdown()
+        stub.server_close()
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            report["change_vs_baseline"] = _compare(report, json.load(f))
+    print(json.dumps(report, indent=2))
+    if not all(s.get("ok") for s in report["scenarios"].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
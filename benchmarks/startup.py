@@ -0,0 +1,92 @@
+"""
+Track CLI startup cost per subcommand.
+
+For every handler registered in `xrayctl.commands.COMMANDS`, this imports
+`xrayctl.main` plus the handler's workflow module in a fresh interpreter under
+`python -X importtime` and reports the import time. It fails if a command
+pulls in a heavy dependency it should not need (e.g. pandas for `ping`), or
+if `--max-ms` is given and a command's import time exceeds it.
+
+Usage:
+    python benchmarks/startup.py [--runs 5] [--max-ms 300]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+from xrayctl.commands import COMMANDS
+
+HEAVY = ("pandas", "pyarrow", "requests", "yaml")
+
+# Handlers allowed to load the dataframe stack.
+DATAFRAME_COMMANDS = {"artifacts_refresh", "artifacts_query"}
+
+
+def _allowed_heavy(handler: str) -> Set[str]:
+    allowed: Set[str] = set()
+    if COMMANDS[handler].needs_client:
+        allowed.add("requests")
+    if handler in DATAFRAME_COMMANDS:
+        allowed |= {"pandas", "pyarrow"}
+    if handler.startswith("config_"):
+        allowed.add("yaml")  # config commands read/write the yaml file
+    return allowed
+
+
+def _measure(module: str) -> Tuple[float, Set[str]]:
+    code = f"import xrayctl.main, importlib; importlib.import_module({module!r})"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    modules: Set[str] = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        modules.add(name.strip())
+        if not name.startswith("  "):  # top-level import (no nesting indent)
+            total_us += int(cumulative)
+    return total_us / 1000.0, modules
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    p.add_argument("--runs", type=int, default=5, help="Measurements per command (median is reported)")
+    p.add_argument("--max-ms", type=float, default=None, help="Fail if a command's import time exceeds this")
+    args = p.parse_args()
+
+    report: Dict[str, Dict[str, object]] = {}
+    problems: List[str] = []
+
+    for handler, cmd in sorted(COMMANDS.items()):
+        timings: List[float] = []
+        modules: Set[str] = set()
+        for _ in range(args.runs):
+            ms, modules = _measure(cmd.module)
+            timings.append(ms)
+
+        loaded_heavy = {m for m in HEAVY if m in modules}
+        unexpected = sorted(loaded_heavy - _allowed_heavy(handler))
+        median_ms = round(statistics.median(timings), 1)
+        report[handler] = {"import_ms": median_ms, "heavy_modules": sorted(loaded_heavy)}
+
+        if unexpected:
+            problems.append(f"{handler}: unexpectedly imports {', '.join(unexpected)}")
+        if args.max_ms is not None and median_ms > args.max_ms:
+            problems.append(f"{handler}: import time {median_ms}ms exceeds {args.max_ms}ms")
+
+    print(json.dumps({"ok": not problems, "commands": report, "problems": problems}, indent=2))
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
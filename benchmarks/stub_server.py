@@ -0,0 +1,292 @@
+"""
+Local Xray stub server for benchmarks.
+
+Implements the endpoints xrayctl calls, with the same paging semantics as
+Xray: repos and artifacts page by `offset`/`num_of_rows` (the response's
+`offset` is the next offset, -1 on the last page), ignore rules page by
+`page_num`/`num_of_rows` and report `total_count`. Artifact pages are
+generated on the fly, so large estates cost no server memory.
+
+Knobs (see StubConfig): data volume, per-request latency, the largest page
+the server hands out, a server-side rate limit and a random 429 rate, and
+how long on-demand scans take.
+
+Usage:
+    python benchmarks/stub_server.py --port 8765 --repos 50 --artifacts 2000 --latency-ms 20
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+API = "/xray/api/v1"
+
+
+@dataclass
+class StubConfig:
+    repos: int = 20
+    artifacts_per_repo: int = 1000
+    rules: int = 500
+    latency_ms: float = 0.0
+    # Pages larger than this are truncated, like a server-side maximum page size.
+    max_page_size: int = 1000
+    # Server-side token bucket (requests/second); requests over it get 429. 0 disables it.
+    rate_limit: float = 0.0
+    # Fraction of requests answered with a random 429.
+    throttle_rate: float = 0.0
+    retry_after: Optional[float] = 1.0
+    scan_seconds: float = 2.0
+    seed: int = 0
+
+
+@dataclass
+class StubStats:
+    requests: int = 0
+    throttled: int = 0
+    bytes_sent: int = 0
+    by_endpoint: Dict[str, int] = field(default_factory=dict)
+
+
+def _artifact(repo: str, j: int) -> Dict[str, Any]:
+    digest = hashlib.sha256(f"{repo}/{j}".encode()).hexdigest()
+    return {
+        "name": f"pkg-{j % 97}-{j}.tgz",
+        "repo_path": f"/org/pkg-{j % 97}/{j}/pkg-{j % 97}-{j}.tgz",
+        "repo_full_path": f"{repo}/org/pkg-{j % 97}/{j}/pkg-{j % 97}-{j}.tgz",
+        "package_id": f"npm://pkg-{j % 97}",
+        "version": f"1.{j % 13}.{j % 7}",
+        "sha256": digest,
+        "size": f"{int(digest[:4], 16) / 100:.2f} KB",
+        "created": f"2024-{1 + j % 12:02d}-{1 + j % 28:02d}T12:00:00Z",
+        "deployed_by": f"ci-{j % 5}",
+        "sec_issues": {"critical": j % 3, "high": j % 5, "medium": j % 7, "low": j % 11, "total": j % 26},
+    }
+
+
+def _rule(i: int) -> Dict[str, Any]:
+    return {
+        "id": f"rule-{i}",
+        "notes": f"benchmark rule {i}",
+        "author": "bench",
+        "created": "2024-01-01T00:00:00Z",
+        "ignore_filters": {"cves": [f"CVE-2024-{1000 + i}"], "watches": [f"watch-{i % 10}"]},
+    }
+
+
+class XrayStub(ThreadingHTTPServer):
+    """Threaded HTTP server answering like Xray for the configured estate."""
+
+    daemon_threads = True
+
+    def __init__(self, config: StubConfig, port: int = 0) -> None:
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.config = config
+        self.stats = StubStats()
+        self.repo_names = [f"repo-{i:04d}" for i in range(config.repos)]
+        self.rules = [_rule(i) for i in range(config.rules)]
+        self._lock = threading.Lock()
+        self._tokens = config.rate_limit
+        self._last = time.monotonic()
+        self._last_trigger: Optional[float] = None
+        self._scans: Dict[Tuple[str, str], float] = {}
+        self._random = random.Random(config.seed)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "XrayStub":
+        threading.Thread(target=self.serve_forever, name="xray-stub", daemon=True).start()
+        return self
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Benchmark workers exit with pooled keep-alive connections still open; that is expected.
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats = StubStats()
+            self._scans.clear()
+
+    def admit(self, endpoint: str) -> bool:
+        """Count a request; False if it should be throttled."""
+        cfg = self.config
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.by_endpoint[endpoint] = self.stats.by_endpoint.get(endpoint, 0) + 1
+            throttled = cfg.throttle_rate > 0 and self._random.random() < cfg.throttle_rate
+            if cfg.rate_limit > 0 and not throttled:
+                now = time.monotonic()
+                self._tokens = min(cfg.rate_limit, self._tokens + (now - self._last) * cfg.rate_limit)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                else:
+                    throttled = True
+            if throttled:
+                self.stats.throttled += 1
+            return not throttled
+
+    def trigger_scan(self) -> None:
+        with self._lock:
+            self._last_trigger = time.monotonic()
+
+    def scan_done(self, repo: str, path: str) -> bool:
+        # A scan completes scan_seconds after it was triggered (or first polled).
+        with self._lock:
+            now = time.monotonic()
+            started = self._scans.setdefault((repo, path), self._last_trigger or now)
+            return now - started >= self.config.scan_seconds
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, a kept-alive
+    # connection stalls on delayed ACKs (~40 ms per response) and penalizes pooling.
+    disable_nagle_algorithm = True
+    server: XrayStub
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def _send(self, code: int, obj: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(obj).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server._lock:
+            self.server.stats.bytes_sent += len(body)
+
+    def _begin(self, endpoint: str) -> bool:
+        cfg = self.server.config
+        if cfg.latency_ms > 0:
+            time.sleep(cfg.latency_ms / 1000.0)
+        if self.server.admit(endpoint):
+            return True
+        headers = {"Retry-After": str(cfg.retry_after)} if cfg.retry_after is not None else {}
+        self._send(429, {"errors": [{"message": "Too many requests"}]}, headers)
+        return False
+
+    def _page(self, q: Dict[str, str], total: int) -> Tuple[int, int, int]:
+        offset = int(q.get("offset", 0))
+        size = min(int(q.get("num_of_rows", 200)), self.server.config.max_page_size)
+        end = min(offset + size, total)
+        return offset, end, (end if end < total else -1)
+
+    def do_GET(self) -> None:
+        u = urlparse(self.path)
+        q = {k: v[0] for k, v in parse_qs(u.query).items()}
+        path = u.path[len(API):] if u.path.startswith(API) else u.path
+        endpoint = "ignore_rules/{id}" if path.startswith("/ignore_rules/") else path.lstrip("/")
+        if not self._begin(endpoint):
+            return
+        srv = self.server
+
+        if path == "/system/ping":
+            self._send(200, {"status": "pong"})
+        elif path == "/repos":
+            start, end, nxt = self._page(q, len(srv.repo_names))
+            data = [{"name": n, "type": "local", "pkg_type": "npm"} for n in srv.repo_names[start:end]]
+            self._send(200, {"data": data, "offset": nxt})
+        elif path == "/artifacts":
+            repo = q.get("repo", "")
+            total = srv.config.artifacts_per_repo if repo in srv.repo_names else 0
+            start, end, nxt = self._page(q, total)
+            self._send(200, {"data": [_artifact(repo, j) for j in range(start, end)], "offset": nxt})
+        elif path == "/ignore_rules":
+            page = max(1, int(q.get("page_num", 1)))
+            rows = min(int(q.get("num_of_rows", 50)), srv.config.max_page_size)
+            data = srv.rules[(page - 1) * rows:page * rows]
+            self._send(200, {"data": data, "total_count": len(srv.rules)})
+        elif endpoint == "ignore_rules/{id}":
+            rule_id = path.rsplit("/", 1)[1]
+            rule = next((r for r in srv.rules if r["id"] == rule_id), None)
+            if rule is None:
+                self._send(404, {"errors": [{"message": "not found"}]})
+            else:
+                self._send(200, rule)
+        else:
+            self._send(404, {"errors": [{"message": f"unknown endpoint {u.path}"}]})
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        path = urlparse(self.path).path
+        path = path[len(API):] if path.startswith(API) else path
+        if not self._begin(path.lstrip("/")):
+            return
+        srv = self.server
+
+        if path == "/scanArtifact":
+            srv.trigger_scan()
+            self._send(200, {"info": "Scan of artifact is in progress"})
+        elif path == "/artifact/status":
+            done = srv.scan_done(str(body.get("repo")), str(body.get("path")))
+            self._send(200, {"overall": {"status": "DONE" if done else "SCANNING"}})
+        elif path == "/ignore_rules":
+            with srv._lock:
+                rule = dict(body, id=f"rule-{len(srv.rules)}")
+                srv.rules.append(rule)
+            self._send(201, {"info": f"Successfully created ignore rule with id: {rule['id']}"})
+        else:
+            self._send(404, {"errors": [{"message": f"unknown endpoint {path}"}]})
+
+
+def add_config_args(parser: argparse.ArgumentParser) -> None:
+    """Command-line flags for every StubConfig field."""
+    defaults = StubConfig()
+    parser.add_argument("--repos", type=int, default=defaults.repos)
+    parser.add_argument("--artifacts", type=int, default=defaults.artifacts_per_repo, help="Artifacts per repo")
+    parser.add_argument("--rules", type=int, default=defaults.rules)
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms, help="Added to every request")
+    parser.add_argument("--max-page-size", type=int, default=defaults.max_page_size)
+    parser.add_argument("--server-rate-limit", type=float, default=defaults.rate_limit, help="Requests/s before 429s")
+    parser.add_argument("--throttle-rate", type=float, default=defaults.throttle_rate, help="Fraction of random 429s")
+    parser.add_argument("--scan-seconds", type=float, default=defaults.scan_seconds)
+
+
+def config_from_args(args: argparse.Namespace) -> StubConfig:
+    return StubConfig(
+        repos=args.repos,
+        artifacts_per_repo=args.artifacts,
+        rules=args.rules,
+        latency_ms=args.latency_ms,
+        max_page_size=args.max_page_size,
+        rate_limit=args.server_rate_limit,
+        throttle_rate=args.throttle_rate,
+        scan_seconds=args.scan_seconds,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_args(parser)
+    args = parser.parse_args()
+
+    stub = XrayStub(config_from_args(args), port=args.port)
+    print(json.dumps({"url": stub.url, "config": asdict(stub.config)}), flush=True)
+    try:
+        stub.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+from xrayctl.api.jsonstream import StreamedPage
+
+# Numbers, literals and multi-byte UTF-8 (2, 3 and 4 bytes) around and inside the items array,
+# plus meta fields on both sides of it.
+BODY = json.dumps(
+    {
+        "total_count": 12345,
+        "data": [
+            {"name": "café-1.0.tgz", "size": -12.5e3, "ok": True, "sha": None},
+            {"name": "日本語", "size": 0, "nested": {"a": [1, 2.25, False]}, "tag": "\U0001f680"},
+            [],
+            {},
+            "plain",
+            1234567890123,
+            -0.5,
+            1e-7,
+            True,
+            False,
+            None,
+        ],
+        "offset": 98765,
+        "label": "end ü",
+    },
+    ensure_ascii=False,
+).encode("utf-8")
+EXPECTED = json.loads(BODY)
+EXPECTED_META = {k: v for k, v in EXPECTED.items() if k != "data"}
+
+
+def _read(chunks, **kwargs):
+    page = StreamedPage(chunks, **kwargs)
+    return list(page), page.meta
+
+
+@pytest.mark.parametrize("split", range(1, len(BODY)))
+def test_every_split_point(split):
+    items, meta = _read([BODY[:split], BODY[split:]])
+    assert items == EXPECTED["data"]
+    assert meta == EXPECTED_META
+
+
+def test_one_byte_chunks():
+    items, meta = _read([BODY[i:i + 1] for i in range(len(BODY))])
+    assert items == EXPECTED["data"]
+    assert meta == EXPECTED_META
+
+
+@pytest.mark.parametrize("body", [b"12345", b"-1.5e10", b"true", b"false", b"null"])
+def test_scalars_split_across_chunks(body):
+    # Numbers and literals as the last array element, cut at every byte.
+    raw = b'{"data":[' + body + b'],"offset":-1}'
+    start = len(b'{"data":[')
+    for split in range(start, start + len(body) + 1):
+        items, meta = _read([raw[:split], raw[split:]])
+        assert items == [json.loads(body)]
+        assert meta == {"offset": -1}
+
+
+def test_bare_array_and_empty_chunks():
+    items, meta = _read([b"", b" [1, ", b"", b'{"a": 2}', b"]\n"])
+    assert items == [1, {"a": 2}]
+    assert meta == {}
+
+
+def test_other_items_key():
+    items, meta = _read([b'{"repos":[{"name":"r"}],"data":5}'], items_key="repos")
+    assert items == [{"name": "r"}]
+    assert meta == {"data": 5}
+
+
+@pytest.mark.parametrize("cut", range(0, len(BODY)))
+def test_truncated_body(cut):
+    with pytest.raises(ValueError):
+        _read([BODY[:cut]])
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"",
+        b"   \n",
+        b"<html>oops</html>",
+        b"null",
+        b"42",
+        b'"data"',
+        b"Service Unavailable",
+        b'{"data":[1,}',
+        b'{"data":[1 2]}',
+        b'{"data":[1],"offset":}',
+        b'{"data" [1]}',
+    ],
+)
+def test_not_a_json_page(body):
+    with pytest.raises(ValueError):
+        _read([body])
+
+
+def test_iterates_once_and_closes():
+    closed = []
+    page = StreamedPage([b'{"data":[1]}'], on_close=lambda: closed.append(True))
+    assert list(page) == [1]
+    assert closed == [True]
+    with pytest.raises(RuntimeError):
+        list(page)
+
+
+def test_from_data():
+    page = StreamedPage.from_data({"data": [1, 2], "offset": 2})
+    assert list(page) == [1, 2]
+    assert page.meta == {"offset": 2}
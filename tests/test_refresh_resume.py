@@ -0,0 +1,110 @@
+import os
+import sys
+
+import pyarrow.parquet as pq
+import pytest
+
+from xrayctl.api.client import XrayClient
+from xrayctl.workflows.artifacts import refresh_inventory
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from stub_server import StubConfig, XrayStub  # noqa: E402
+
+REPOS = 4
+ARTIFACTS_PER_REPO = 25
+PAGE_SIZE = 10  # 3 pages per repo
+
+
+class _Interrupted(KeyboardInterrupt):
+    pass
+
+
+@pytest.fixture(scope="module")
+def stub():
+    server = XrayStub(StubConfig(repos=REPOS, artifacts_per_repo=ARTIFACTS_PER_REPO)).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _refresh(stub, out_path, *, hooks=(), **kwargs):
+    client = XrayClient(base_url=stub.url, token="t", hooks=list(hooks))
+    try:
+        return refresh_inventory(
+            client,
+            out_path=out_path,
+            page_size=PAGE_SIZE,
+            repo_page_size=100,
+            repo_regex=None,
+            include_repo_metadata=False,
+            catalog_path=os.path.join(os.path.dirname(out_path), "repos.sqlite"),
+            catalog_ttl=0,
+            **kwargs,
+        )
+    finally:
+        client.close()
+
+
+def _artifact_requests(counter):
+    def hook(event):
+        if event.endpoint.endswith("/artifacts"):
+            counter.append(event)
+
+    return hook
+
+
+def _interrupt_after(pages):
+    # Dies like a killed run once `pages` artifact pages have been received (the next one is lost).
+    seen = []
+
+    def hook(event):
+        if event.endpoint.endswith("/artifacts"):
+            seen.append(event)
+            if len(seen) > pages:
+                raise _Interrupted()
+
+    return hook
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_resume_matches_clean_run(stub, tmp_path, stream):
+    clean = str(tmp_path / "clean.parquet")
+    summary = _refresh(stub, clean, stream=stream)
+    assert summary["ok"] and summary["artifacts_total"] == REPOS * ARTIFACTS_PER_REPO
+
+    out = str(tmp_path / "resumed.parquet")
+    # Two repos complete, the third interrupted after its first page.
+    with pytest.raises(_Interrupted):
+        _refresh(stub, out, hooks=[_interrupt_after(7)], checkpoint=True, stream=stream)
+    assert not os.path.exists(out)
+    assert os.path.exists(os.path.join(out + ".checkpoint", "journal.jsonl"))
+
+    requests = []
+    summary = _refresh(stub, out, hooks=[_artifact_requests(requests)], resume=True, stream=stream)
+    assert summary["ok"]
+    assert summary["repos_resumed"] == 3
+    # Only the rest of the third repo (2 pages) and the fourth repo (3 pages) are fetched again.
+    assert [e.status_code for e in requests] == [200] * 5
+    assert not os.path.exists(out + ".checkpoint")
+
+    assert pq.read_table(out).equals(pq.read_table(clean))
+
+
+def test_resume_refuses_other_options(stub, tmp_path):
+    out = str(tmp_path / "inv.parquet")
+    with pytest.raises(_Interrupted):
+        _refresh(stub, out, hooks=[_interrupt_after(2)], checkpoint=True)
+    with pytest.raises(ValueError):
+        _refresh(stub, out, resume=True, unknown_columns="drop")
+
+
+def test_resume_without_checkpoint(stub, tmp_path):
+    with pytest.raises(ValueError):
+        _refresh(stub, str(tmp_path / "inv.parquet"), resume=True)
+
+
+def test_no_checkpoint_by_default(stub, tmp_path):
+    out = str(tmp_path / "inv.parquet")
+    with pytest.raises(_Interrupted):
+        _refresh(stub, out, hooks=[_interrupt_after(2)])
+    assert not os.path.exists(out + ".checkpoint")
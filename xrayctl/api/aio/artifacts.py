@@ -0,0 +1,16 @@
+from __future__ import annotations
+from typing import Any
+from xrayctl.api import artifacts
+from xrayctl.api.aio.client import AsyncXrayClient
+
+
+async def list_artifacts(
+    client: AsyncXrayClient,
+    *,
+    repo: str,
+    offset: int = 0,
+    num_of_rows: int = 200,
+) -> Any:
+    """Async `xrayctl.api.artifacts.list_artifacts`."""
+    method, path, kwargs = artifacts.list_artifacts_request(repo=repo, offset=offset, num_of_rows=num_of_rows)
+    return await client.request(method, path, **kwargs)
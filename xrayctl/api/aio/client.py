@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+from xrayctl.api.client import build_headers, parse_response, should_retry
+from xrayctl.api.metrics import RequestHook, emit
+from xrayctl.api.ratelimit import AdaptiveRateLimiter, backoff_delay, parse_retry_after
+
+
+def _httpx() -> Any:
+    try:
+        import httpx
+    except ImportError as e:  # optional dependency
+        raise ImportError("AsyncXrayClient requires httpx: pip install 'xrayctl[async]'") from e
+    return httpx
+
+
+@dataclass
+class AsyncXrayClient:
+    """
+    asyncio counterpart of XrayClient.
+
+    Same constructor fields and the same `request` contract: paths are
+    relative to `base_url`, responses are parsed the same way and errors
+    raise XrayHTTPError with identical status/details mapping. Project
+    scoping is applied by the functions in `xrayctl.api.aio`, exactly as the
+    sync API layer does.
+
+    One client holds one pooled httpx.AsyncClient; `pool_size` caps the
+    number of concurrent connections. Use it as an async context manager
+    or call `aclose()` when done.
+    """
+
+    base_url: str
+    token: str
+    timeout: int = 30
+    project: Optional[str] = None
+    pool_size: int = 100
+    keep_alive: bool = True
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    limiter: Optional[AdaptiveRateLimiter] = None
+    hooks: List[RequestHook] = field(default_factory=list)
+
+    _http: Optional[Any] = field(default=None, init=False, repr=False)
+
+    @property
+    def http(self) -> Any:
+        """The underlying httpx.AsyncClient, created on first use."""
+        if self._http is None:
+            if self.pool_size < 1:
+                raise ValueError("--pool-size must be >= 1")
+            httpx = _httpx()
+            limits = httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size if self.keep_alive else 0,
+            )
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url.rstrip("/"),
+                headers=build_headers(self.token, keep_alive=self.keep_alive),
+                limits=limits,
+                timeout=self.timeout,
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        """Release pooled connections held by the client."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def __aenter__(self) -> "AsyncXrayClient":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.aclose()
+
+    async def request(self, method: str, path: str, *, json_body: Optional[dict] = None, params: Optional[dict] = None) -> Any:
+        """
+        Execute an HTTP request against the Xray API.
+
+        Args:
+            method: HTTP method (e.g. 'GET', 'POST').
+            path: API path (e.g. '/xray/api/v1/artifacts').
+            json_body: Optional JSON body for POST/PUT requests.
+            params: Optional query parameters.
+
+        Returns:
+            Parsed JSON response, or raw text if response is not JSON.
+
+        Raises:
+            XrayHTTPError: If the response status code is >= 400.
+        """
+        resp = await self._send(method, path, json_body=json_body, params=params)
+        return parse_response(resp)
+
+    async def _send(self, method: str, path: str, *, json_body: Optional[dict], params: Optional[dict]) -> Any:
+        # Same retry/pacing policy as XrayClient._send, with non-blocking sleeps.
+        httpx = _httpx()
+        attempt = 0
+        while True:
+            if self.limiter is not None:
+                wait = self.limiter.reserve()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            started = time.perf_counter()
+            try:
+                resp = await self.http.request(method, path, json=json_body, params=params)
+            except (httpx.TransportError, httpx.TimeoutException) as e:
+                retry = attempt < self.max_retries and should_retry(method, None)
+                if self.hooks:
+                    emit(
+                        self.hooks,
+                        method,
+                        path,
+                        status_code=None,
+                        started=started,
+                        bytes_received=0,
+                        attempt=attempt,
+                        retried=retry,
+                        error=type(e).__name__,
+                    )
+                if not retry:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt, base=self.backoff_base, cap=self.backoff_max))
+                attempt += 1
+                continue
+
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            if self.limiter is not None:
+                if resp.status_code == 429:
+                    self.limiter.on_throttle(retry_after)
+                else:
+                    self.limiter.on_success()
+
+            retry = attempt < self.max_retries and should_retry(method, resp.status_code)
+            if self.hooks:
+                emit(
+                    self.hooks,
+                    method,
+                    path,
+                    status_code=resp.status_code,
+                    started=started,
+                    bytes_received=len(resp.content),
+                    attempt=attempt,
+                    retried=retry,
+                )
+            if not retry:
+                return resp
+
+            await resp.aclose()
+            if retry_after is None:
+                retry_after = backoff_delay(attempt, base=self.backoff_base, cap=self.backoff_max)
+            await asyncio.sleep(retry_after)
+            attempt += 1
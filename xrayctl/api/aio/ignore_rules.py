@@ -0,0 +1,22 @@
+from __future__ import annotations
+from typing import Any, Dict, Optional
+from xrayctl.api import ignore_rules
+from xrayctl.api.aio.client import AsyncXrayClient
+
+
+async def create_ignore_rule(client: AsyncXrayClient, payload: Dict[str, Any]) -> Any:
+    """Async `xrayctl.api.ignore_rules.create_ignore_rule`."""
+    method, path, kwargs = ignore_rules.create_ignore_rule_request(client.project, payload)
+    return await client.request(method, path, **kwargs)
+
+
+async def get_ignore_rules(client: AsyncXrayClient, params: Optional[Dict[str, Any]] = None) -> Any:
+    """Async `xrayctl.api.ignore_rules.get_ignore_rules`."""
+    method, path, kwargs = ignore_rules.get_ignore_rules_request(client.project, params)
+    return await client.request(method, path, **kwargs)
+
+
+async def get_ignore_rule(client: AsyncXrayClient, rule_id: str) -> Any:
+    """Async `xrayctl.api.ignore_rules.get_ignore_rule`."""
+    method, path, kwargs = ignore_rules.get_ignore_rule_request(client.project, rule_id)
+    return await client.request(method, path, **kwargs)
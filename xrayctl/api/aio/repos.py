@@ -0,0 +1,16 @@
+from __future__ import annotations
+from typing import Any, Optional
+from xrayctl.api import repos
+from xrayctl.api.aio.client import AsyncXrayClient
+
+
+async def list_repos(
+    client: AsyncXrayClient,
+    *,
+    offset: int = 0,
+    num_of_rows: int = 200,
+    search: Optional[str] = None,
+) -> Any:
+    """Async `xrayctl.api.repos.list_repos`."""
+    method, path, kwargs = repos.list_repos_request(offset=offset, num_of_rows=num_of_rows, search=search)
+    return await client.request(method, path, **kwargs)
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from typing import Any
+from xrayctl.api import scans
+from xrayctl.api.aio.client import AsyncXrayClient
+
+
+async def scan_artifact(client: AsyncXrayClient, component_id: str) -> Any:
+    """Async `xrayctl.api.scans.scan_artifact`."""
+    method, path, kwargs = scans.scan_artifact_request(component_id)
+    return await client.request(method, path, **kwargs)
+
+
+async def artifact_status(client: AsyncXrayClient, *, repo: str, path: str) -> Any:
+    """Async `xrayctl.api.scans.artifact_status`."""
+    method, api_path, kwargs = scans.artifact_status_request(client.project, repo=repo, path=path)
+    return await client.request(method, api_path, **kwargs)
@@ -0,0 +1,9 @@
+from __future__ import annotations
+from typing import Any
+from xrayctl.api import system
+from xrayctl.api.aio.client import AsyncXrayClient
+
+
+async def ping(client: AsyncXrayClient) -> Any:
+    method, path, kwargs = system.ping_request()
+    return await client.request(method, path, **kwargs)
@@ -1,6 +1,19 @@
 from __future__ import annotations
-from typing import Any, Dict
-from xrayctl.api.client import XrayClient
+from typing import TYPE_CHECKING, Any, Dict
+from xrayctl.api.jsonstream import StreamedPage
+
+if TYPE_CHECKING:
+    from xrayctl.api.client import ApiRequest, XrayClient
+
+
+def list_artifacts_request(*, repo: str, offset: int = 0, num_of_rows: int = 200) -> ApiRequest:
+    """Request of `list_artifacts` and `stream_artifacts`."""
+    params: Dict[str, Any] = {
+        "repo": repo,
+        "offset": offset,
+        "num_of_rows": num_of_rows,
+    }
+    return "GET", "/xray/api/v1/artifacts", {"params": params}
 
 
 def list_artifacts(
@@ -22,9 +35,29 @@ def list_artifacts(
     Returns:
         API response containing repository metadata and paging info.
     """
-    params: Dict[str, Any] = {
-        "repo": repo,
-        "offset": offset,
-        "num_of_rows": num_of_rows,
-    }
-    return client.request("GET", "/xray/api/v1/artifacts", params=params)
+    method, path, kwargs = list_artifacts_request(repo=repo, offset=offset, num_of_rows=num_of_rows)
+    return client.request(method, path, **kwargs)
+
+
+def stream_artifacts(
+    client: XrayClient,
+    *,
+    repo: str,
+    offset: int = 0,
+    num_of_rows: int = 200,
+) -> StreamedPage:
+    """
+    Same endpoint as `list_artifacts`, decoded incrementally.
+
+    Args:
+        client: Initialized XrayClient.
+        repo: Repository key.
+        offset: Pagination offset returned by previous response.
+        num_of_rows: Number of artifacts per page.
+
+    Returns:
+        StreamedPage yielding artifacts as they are received; the next
+        `offset` is in `meta` once the page has been iterated.
+    """
+    method, path, kwargs = list_artifacts_request(repo=repo, offset=offset, num_of_rows=num_of_rows)
+    return client.request_stream(method, path, **kwargs)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class ResponseCache:
+    """
+    On-disk cache of GET responses, used by XrayClient.request.
+
+    Entries are keyed by base URL, path, query params and the identity of the
+    token (so two users sharing a cache directory never see each other's
+    data). An entry younger than `ttl` seconds is served without contacting
+    Xray. An older entry that carried an ETag or Last-Modified header is
+    revalidated with a conditional request; a 304 refreshes it in place.
+
+    The cache is capped at `max_entries` files; hits bump a file's mtime and
+    the least recently used entries are evicted first.
+    """
+
+    def __init__(self, directory: Path | str, *, ttl: int, max_entries: int = 5000) -> None:
+        if ttl < 0:
+            raise ValueError("--cache-ttl must be >= 0")
+        if max_entries < 1:
+            raise ValueError("cache max entries must be >= 1")
+        self.directory = Path(directory).expanduser()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._count: Optional[int] = None
+
+    def key(self, *, base_url: str, path: str, params: Optional[Dict[str, Any]], token: str) -> str:
+        ident = hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+        raw = json.dumps([base_url.rstrip("/"), path, params or {}, ident], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored entry for `key` (fresh or not), or None."""
+        try:
+            with self._path(key).open("r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - float(entry.get("stored_at", 0)) < self.ttl
+
+    def touch(self, key: str) -> None:
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    def put(
+        self,
+        key: str,
+        data: Any,
+        *,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Store (or refresh) an entry and evict old entries past the size cap."""
+        entry = {"stored_at": time.time(), "etag": etag, "last_modified": last_modified, "data": data}
+        path = self._path(key)
+        is_new = not path.exists()
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True, mode=0o700)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, separators=(",", ":"))
+            os.replace(tmp, path)
+        except OSError:
+            # The cache is best-effort; never fail a command because it could not be written.
+            return
+
+        if is_new:
+            self._account_new_entry()
+
+    def _account_new_entry(self) -> None:
+        with self._lock:
+            if self._count is None:
+                self._count = sum(1 for p in self.directory.glob("*.json"))
+            else:
+                self._count += 1
+            if self._count <= self.max_entries:
+                return
+
+            entries = []
+            for p in self.directory.glob("*.json"):
+                try:
+                    entries.append((p.stat().st_mtime, p))
+                except OSError:
+                    continue
+            entries.sort()
+            # Evict down to 90% of the cap so eviction does not run on every put.
+            excess = len(entries) - int(self.max_entries * 0.9)
+            for _, p in entries[: max(excess, 0)]:
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+            self._count = len(entries) - max(excess, 0)
@@ -1,12 +1,98 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, Optional
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from xrayctl.api.cache import ResponseCache
+from xrayctl.api.jsonstream import StreamedPage
+from xrayctl.api.metrics import RequestHook, emit
+from xrayctl.api.ratelimit import (
+    IDEMPOTENT_METHODS,
+    RETRY_STATUSES,
+    AdaptiveRateLimiter,
+    backoff_delay,
+    parse_retry_after,
+)
 from xrayctl.errors import XrayHTTPError
 
+# An API call as built by the endpoint modules: (method, path, keyword arguments of `request`).
+# The sync and async clients send the same ones, so each endpoint is described only once.
+ApiRequest = Tuple[str, str, Dict[str, Any]]
+
+
+def build_headers(token: str, *, keep_alive: bool = True) -> Dict[str, str]:
+    """
+    Construct HTTP headers for Xray API requests.
+
+    Args:
+        token: JFrog access token.
+        keep_alive: Whether connections may be reused.
+
+    Returns:
+        Dict[str, str]: Headers including Authorization and content type.
+    """
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+    }
+    if not keep_alive:
+        headers["Connection"] = "close"
+    return headers
+
+
+def parse_response(resp: Any) -> Any:
+    """
+    Decode an HTTP response and map error statuses to XrayHTTPError.
+
+    Works with any response object exposing `status_code`, `json()` and
+    `text` (requests and httpx both do), so the sync and async clients
+    share one error contract.
+
+    Returns:
+        Parsed JSON response, or raw text if response is not JSON.
+
+    Raises:
+        XrayHTTPError: If the response status code is >= 400.
+    """
+    # Best-effort response parsing
+    try:
+        data = resp.json()
+    except ValueError:
+        data = resp.text
+
+    if resp.status_code >= 400:
+        msg = None
+        if isinstance(data, dict):
+            msg = data.get("error") or data.get("message")
+        raise XrayHTTPError(
+            message=msg or f"HTTP {resp.status_code}",
+            status_code=resp.status_code,
+            details=data,
+        )
+
+    return data
+
+
+def should_retry(method: str, status_code: Optional[int]) -> bool:
+    """
+    Decide whether a failed attempt may be resent.
+
+    429 means the server did not process the request, so it is retried for
+    every method. 5xx responses and connection errors (`status_code=None`)
+    are only retried for idempotent methods, where resending cannot
+    duplicate a side effect (e.g. create the same ignore rule twice).
+    """
+    if status_code == 429:
+        return True
+    if status_code is not None and status_code not in RETRY_STATUSES:
+        return False
+    return method.upper() in IDEMPOTENT_METHODS
+
 
 @dataclass
 class XrayClient:
@@ -14,24 +100,64 @@ class XrayClient:
     token: str
     timeout: int = 30
     project: Optional[str] = None
+    pool_size: int = 10
+    keep_alive: bool = True
+    cache: Optional[ResponseCache] = None
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    limiter: Optional[AdaptiveRateLimiter] = None
+    # Called with a RequestEvent for every HTTP attempt (see xrayctl.api.metrics)
+    hooks: List[RequestHook] = field(default_factory=list)
+
+    _session: Optional[requests.Session] = field(default=None, init=False, repr=False)
 
     def _headers(self) -> Dict[str, str]:
+        return build_headers(self.token, keep_alive=self.keep_alive)
+
+    @property
+    def session(self) -> requests.Session:
         """
-        Construct HTTP headers for Xray API requests.
+        Long-lived pooled session shared by every request made through this client.
+
+        The session is created on first use. Auth headers are attached once here
+        instead of being rebuilt per request, and connections to the Xray host
+        are kept alive and reused across pages.
 
         Returns:
-            Dict[str, str]: Headers including Authorization and content type.
+            requests.Session: The client's session.
         """
-        return {
-            "Authorization": f"Bearer {self.token}",
-            "Accept": "application/json",
-            "Content-Type": "application/json",
-        }
+        if self._session is None:
+            if self.pool_size < 1:
+                raise ValueError("--pool-size must be >= 1")
+            s = requests.Session()
+            s.headers.update(self._headers())
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            self._session = s
+        return self._session
+
+    def close(self) -> None:
+        """Release pooled connections held by the client."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def __enter__(self) -> "XrayClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
 
     def request(self, method: str, path: str, *, json_body: Optional[dict] = None, params: Optional[dict] = None) -> Any:
         """
         Execute an HTTP request against the Xray API.
 
+        GET requests are answered from `cache` when one is configured and the
+        entry is still fresh, and revalidated with If-None-Match /
+        If-Modified-Since once it is stale.
+
         Args:
             method: HTTP method (e.g. 'GET', 'POST').
             path: API path (e.g. '/xray/api/v1/artifacts').
@@ -44,30 +170,227 @@ class XrayClient:
         Raises:
             XrayHTTPError: If the response status code is >= 400.
         """
-        url = self.base_url.rstrip("/") + path
-        resp = requests.request(
-            method=method,
-            url=url,
-            headers=self._headers(),
-            json=json_body,
-            params=params,
-            timeout=self.timeout,
-        )
+        if self.cache is not None and method.upper() == "GET" and json_body is None:
+            return self._cached_get(path, params=params)
 
-        # Best-effort response parsing
-        try:
-            data = resp.json()
-        except ValueError:
-            data = resp.text
+        resp = self._send(method, path, json_body=json_body, params=params)
+        return self._parse(resp)
 
-        if resp.status_code >= 400:
-            msg = None
-            if isinstance(data, dict):
-                msg = data.get("error") or data.get("message")
-            raise XrayHTTPError(
-                message=msg or f"HTTP {resp.status_code}",
+    def _send(
+        self,
+        method: str,
+        path: str,
+        *,
+        json_body: Optional[dict] = None,
+        params: Optional[dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        """Send one request with retries (see `_send_with_retries`) and report its final attempt to `hooks`."""
+        resp, attempt, started = self._send_with_retries(
+            method, path, json_body=json_body, params=params, headers=headers
+        )
+        if self.hooks:
+            emit(
+                self.hooks,
+                method,
+                path,
                 status_code=resp.status_code,
-                details=data,
+                started=started,
+                bytes_received=len(resp.content),
+                attempt=attempt,
             )
+        return resp
+
+    def _send_with_retries(
+        self,
+        method: str,
+        path: str,
+        *,
+        json_body: Optional[dict] = None,
+        params: Optional[dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+    ) -> Tuple[requests.Response, int, float]:
+        """
+        Send one request, retrying throttled and transient failures.
 
+        Every attempt first takes a slot from `limiter` (if any). Retries
+        follow `should_retry`, waiting for Retry-After when the server sends
+        it and for exponential backoff with full jitter otherwise. After
+        `max_retries` retries the last response is returned (or the last
+        connection error raised) for the caller to handle as usual.
+
+        Attempts that are retried or raise are reported to `hooks` here; the
+        returned one is reported by the caller once its body has been read.
+
+        Returns:
+            `(response, attempt number, time.perf_counter() when it was sent)`.
+        """
+        url = self.base_url.rstrip("/") + path
+        attempt = 0
+        while True:
+            if self.limiter is not None:
+                wait = self.limiter.reserve()
+                if wait > 0:
+                    time.sleep(wait)
+            started = time.perf_counter()
+            try:
+                resp = self.session.request(
+                    method=method,
+                    url=url,
+                    json=json_body,
+                    params=params,
+                    headers=headers,
+                    timeout=self.timeout,
+                    stream=stream,
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                retry = attempt < self.max_retries and should_retry(method, None)
+                if self.hooks:
+                    emit(
+                        self.hooks,
+                        method,
+                        path,
+                        status_code=None,
+                        started=started,
+                        bytes_received=0,
+                        attempt=attempt,
+                        retried=retry,
+                        error=type(e).__name__,
+                    )
+                if not retry:
+                    raise
+                time.sleep(backoff_delay(attempt, base=self.backoff_base, cap=self.backoff_max))
+                attempt += 1
+                continue
+
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            if self.limiter is not None:
+                if resp.status_code == 429:
+                    self.limiter.on_throttle(retry_after)
+                else:
+                    self.limiter.on_success()
+
+            if attempt >= self.max_retries or not should_retry(method, resp.status_code):
+                return resp, attempt, started
+
+            if self.hooks:
+                emit(
+                    self.hooks,
+                    method,
+                    path,
+                    status_code=resp.status_code,
+                    started=started,
+                    # Throttled bodies are not worth downloading just to count them
+                    bytes_received=int(resp.headers.get("Content-Length") or 0) if stream else len(resp.content),
+                    attempt=attempt,
+                    retried=True,
+                )
+            resp.close()
+            if retry_after is None:
+                retry_after = backoff_delay(attempt, base=self.backoff_base, cap=self.backoff_max)
+            time.sleep(retry_after)
+            attempt += 1
+
+    def request_stream(
+        self,
+        method: str,
+        path: str,
+        *,
+        json_body: Optional[dict] = None,
+        params: Optional[dict] = None,
+        items_key: str = "data",
+        chunk_size: int = 1 << 16,
+    ) -> StreamedPage:
+        """
+        Execute a request whose records are decoded incrementally.
+
+        Unlike `request`, the body is never materialized as a whole: the
+        returned StreamedPage yields the elements of the `items_key` array as
+        they arrive and exposes the remaining top-level fields as `meta`
+        once iterated. Error statuses raise XrayHTTPError up front, exactly
+        like `request`. When a response cache is configured, GETs go through
+        `request` (and the cache) instead and are wrapped in the same
+        interface.
+
+        Args:
+            method: HTTP method (e.g. 'GET', 'POST').
+            path: API path (e.g. '/xray/api/v1/artifacts').
+            json_body: Optional JSON body for POST/PUT requests.
+            params: Optional query parameters.
+            items_key: Top-level key of the record array.
+            chunk_size: Bytes read from the socket at a time.
+
+        Returns:
+            StreamedPage over the response records.
+
+        Raises:
+            XrayHTTPError: If the response status code is >= 400.
+        """
+        if self.cache is not None and method.upper() == "GET" and json_body is None:
+            return StreamedPage.from_data(self.request(method, path, params=params), items_key=items_key)
+
+        resp, attempt, started = self._send_with_retries(method, path, json_body=json_body, params=params, stream=True)
+        received = 0
+
+        def close() -> None:
+            resp.close()
+            if self.hooks:
+                emit(
+                    self.hooks,
+                    method,
+                    path,
+                    status_code=resp.status_code,
+                    started=started,
+                    bytes_received=received,
+                    attempt=attempt,
+                )
+
+        if resp.status_code >= 400:
+            try:
+                parse_response(resp)
+            finally:
+                received = len(resp.content)
+                close()
+
+        def counted() -> Iterator[bytes]:
+            nonlocal received
+            for chunk in resp.iter_content(chunk_size):
+                received += len(chunk)
+                yield chunk
+
+        chunks = counted() if self.hooks else resp.iter_content(chunk_size)
+        return StreamedPage(chunks, items_key=items_key, on_close=close)
+
+    def _cached_get(self, path: str, *, params: Optional[dict]) -> Any:
+        assert self.cache is not None
+        key = self.cache.key(base_url=self.base_url, path=path, params=params, token=self.token)
+        entry = self.cache.get(key)
+
+        headers: Dict[str, str] = {}
+        if entry is not None:
+            if self.cache.is_fresh(entry):
+                self.cache.touch(key)
+                return entry["data"]
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        resp = self._send("GET", path, params=params, headers=headers or None)
+
+        if resp.status_code == 304 and entry is not None:
+            self.cache.put(key, entry["data"], etag=entry.get("etag"), last_modified=entry.get("last_modified"))
+            return entry["data"]
+
+        data = self._parse(resp)
+        self.cache.put(
+            key,
+            data,
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+        )
         return data
+
+    def _parse(self, resp: requests.Response) -> Any:
+        return parse_response(resp)
@@ -1,6 +1,33 @@
 from __future__ import annotations
 from typing import Any, Dict, Optional
-from xrayctl.api.client import XrayClient
+from xrayctl.api.client import ApiRequest, XrayClient
+
+
+def create_ignore_rule_request(project: Optional[str], payload: Dict[str, Any]) -> ApiRequest:
+    """Request of `create_ignore_rule`."""
+    params = {}
+    if project:
+        params["projectKey"] = project
+    return "POST", "/xray/api/v1/ignore_rules", {"json_body": payload, "params": params}
+
+
+def get_ignore_rules_request(project: Optional[str], params: Optional[Dict[str, Any]] = None) -> ApiRequest:
+    """Request of `get_ignore_rules`."""
+    # For project-scoped usage, Xray supports projectKey as a query parameter. :contentReference[oaicite:4]{index=4}
+    q = dict(params or {})
+    if project and "projectKey" not in q:
+        q["projectKey"] = project
+
+    return "GET", "/xray/api/v1/ignore_rules", {"params": q}
+
+
+def get_ignore_rule_request(project: Optional[str], rule_id: str) -> ApiRequest:
+    """Request of `get_ignore_rule`."""
+    params: Optional[Dict[str, Any]] = None
+    if project:
+        params = {"projectKey": project}
+    # Usage: GET /xray/api/v1/ignore_rules/{id} :contentReference[oaicite:1]{index=1}
+    return "GET", f"/xray/api/v1/ignore_rules/{rule_id}", {"params": params}
 
 
 def create_ignore_rule(client: XrayClient, payload: Dict[str, Any]) -> Any:
@@ -14,10 +41,8 @@ def create_ignore_rule(client: XrayClient, payload: Dict[str, Any]) -> Any:
     Returns:
         API response containing the created ignore rule.
     """
-    params = {}
-    if client.project:
-        params["projectKey"] = client.project
-    return client.request("POST", "/xray/api/v1/ignore_rules", json_body=payload, params=params)
+    method, path, kwargs = create_ignore_rule_request(client.project, payload)
+    return client.request(method, path, **kwargs)
 
 
 def get_ignore_rules(client: XrayClient, params: Optional[Dict[str, Any]] = None) -> Any:
@@ -31,12 +56,8 @@ def get_ignore_rules(client: XrayClient, params: Optional[Dict[str, Any]] = None
     Returns:
         API response containing ignore rules.
     """
-    # For project-scoped usage, Xray supports projectKey as a query parameter. :contentReference[oaicite:4]{index=4}
-    q = dict(params or {})
-    if client.project and "projectKey" not in q:
-        q["projectKey"] = client.project
-
-    return client.request("GET", "/xray/api/v1/ignore_rules", params=q)
+    method, path, kwargs = get_ignore_rules_request(client.project, params)
+    return client.request(method, path, **kwargs)
 
 
 def get_ignore_rule(client: XrayClient, rule_id: str) -> Any:
@@ -50,8 +71,5 @@ def get_ignore_rule(client: XrayClient, rule_id: str) -> Any:
     Returns:
         API response containing ignore rule details.
     """
-    params: Optional[Dict[str, Any]] = None
-    if client.project:
-        params = {"projectKey": client.project}
-    # Usage: GET /xray/api/v1/ignore_rules/{id} :contentReference[oaicite:1]{index=1}
-    return client.request("GET", f"/xray/api/v1/ignore_rules/{rule_id}", params=params)
+    method, path, kwargs = get_ignore_rule_request(client.project, rule_id)
+    return client.request(method, path, **kwargs)
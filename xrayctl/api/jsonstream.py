@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import codecs
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+_WS = " \t\n\r"
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+# Drop consumed text from the buffer once this much has accumulated.
+_COMPACT_AT = 1 << 16
+
+
+class StreamedPage:
+    """
+    Records of one API page, decoded incrementally from the response body.
+
+    Iterating yields the elements of the top-level `items_key` array (e.g.
+    `data`) one at a time, as soon as each has been received, without ever
+    holding the whole body in memory. Other top-level fields (`offset`,
+    `total_count`, ...) are collected into `meta`; fields that come after
+    the array are only available once iteration has finished. A body that is
+    a bare JSON array is iterated directly.
+
+    A page can be iterated once. The underlying response is closed when
+    iteration ends or `close()` is called.
+    """
+
+    def __init__(
+        self,
+        chunks: Iterable[bytes],
+        *,
+        items_key: str = "data",
+        on_close: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.items_key = items_key
+        self.meta: Dict[str, Any] = {}
+        self._chunks = iter(chunks)
+        self._on_close = on_close
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._consumed = False
+        self._items: Optional[Iterator[Any]] = None
+
+    @classmethod
+    def from_data(cls, data: Any, *, items_key: str = "data") -> "StreamedPage":
+        """Wrap an already decoded response (e.g. a cache hit) in the same interface."""
+        page = cls((), items_key=items_key)
+        if isinstance(data, list):
+            page._items = iter(data)
+        else:
+            page.meta = {k: v for k, v in data.items() if k != items_key} if isinstance(data, dict) else {}
+            page._items = iter((data.get(items_key) or []) if isinstance(data, dict) else [])
+        return page
+
+    def close(self) -> None:
+        if self._on_close is not None:
+            self._on_close()
+            self._on_close = None
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._items is not None:
+            yield from self._items
+            return
+        if self._consumed:
+            raise RuntimeError("StreamedPage can only be iterated once")
+        self._consumed = True
+        try:
+            yield from self._parse()
+        finally:
+            self.close()
+
+    # -- incremental parsing -------------------------------------------------
+
+    def _fill(self) -> bool:
+        """Read the next chunk into the buffer; False once the body is exhausted."""
+        if self._eof:
+            return False
+        if self._pos > _COMPACT_AT:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        for chunk in self._chunks:
+            if chunk:
+                self._buf += self._text.decode(chunk)
+                return True
+        self._buf += self._text.decode(b"", final=True)
+        self._eof = True
+        return False
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next significant character ('' at end of body)."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WS:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, ch: str) -> None:
+        if self._peek() != ch:
+            raise ValueError(f"Malformed JSON response: expected {ch!r} at offset {self._pos}")
+        self._pos += 1
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number running up to the buffer edge (e.g. "12" or "1e") may continue in the next chunk.
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                i = end
+                while i < len(self._buf) and self._buf[i] in _NUMBER_CHARS:
+                    i += 1
+                if i == len(self._buf) and self._fill():
+                    continue
+            self._pos = end
+            return value
+
+    def _array(self) -> Iterator[Any]:
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            ch = self._peek()
+            self._pos += 1
+            if ch == "]":
+                return
+            if ch != ",":
+                raise ValueError(f"Malformed JSON response: expected ',' or ']' at offset {self._pos - 1}")
+
+    def _parse(self) -> Iterator[Any]:
+        first = self._peek()
+        if first == "[":
+            yield from self._array()
+            return
+        if first != "{":
+            # An empty body, an HTML error/login page from a proxy, `null`, ...: not a page. Reading it
+            # as an empty one would make a repo look empty (and its rows or partition disappear).
+            found = repr(first) if first else "an empty body"
+            raise ValueError(f"Malformed JSON response: expected an object or array, got {found} at offset {self._pos}")
+
+        self._pos += 1
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key == self.items_key and self._peek() == "[":
+                yield from self._array()
+            else:
+                self.meta[key] = self._value()
+            ch = self._peek()
+            self._pos += 1
+            if ch == "}":
+                return
+            if ch != ",":
+                raise ValueError(f"Malformed JSON response: expected ',' or '}}' at offset {self._pos - 1}")
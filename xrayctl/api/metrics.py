@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import math
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Sequence
+
+# Relative width of a latency bucket: reported percentiles are at most 5% above the true value.
+_BUCKET_GROWTH = 1.05
+_LOG_GROWTH = math.log(_BUCKET_GROWTH)
+# Latencies below this (ms) share the first bucket.
+_MIN_MS = 0.01
+PERCENTILES = (50, 95, 99)
+
+# Path segments that identify a resource rather than a route, e.g. /ignore_rules/<id>.
+_ID_SEGMENTS = (re.compile(r"(/ignore_rules/)[^/?]+"),)
+
+
+def endpoint_template(path: str) -> str:
+    """
+    Route of an API path with resource ids collapsed, e.g.
+    '/xray/api/v1/ignore_rules/{id}' for '/xray/api/v1/ignore_rules/abc123'.
+
+    Metrics are keyed by this so that per-id requests aggregate into one endpoint.
+    """
+    path = path.split("?", 1)[0]
+    for pattern in _ID_SEGMENTS:
+        path = pattern.sub(r"\1{id}", path)
+    return path
+
+
+@dataclass(frozen=True)
+class RequestEvent:
+    """
+    One HTTP attempt made by XrayClient.
+
+    Every retry is a separate event; `retried` is True on attempts whose
+    outcome (a retryable status or connection error) led to another
+    attempt. `status_code` is None when no response arrived, and `error`
+    then names the exception. `seconds` runs from sending the request to
+    having read the whole body (for streamed pages: until the page was
+    consumed or closed).
+    """
+
+    method: str
+    endpoint: str
+    status_code: Optional[int]
+    seconds: float
+    bytes_received: int
+    attempt: int = 0
+    retried: bool = False
+    error: Optional[str] = None
+
+
+# Hooks receive every event on the thread that made the request, so they
+# must be cheap and thread-safe. Exceptions raised by a hook propagate.
+RequestHook = Callable[[RequestEvent], None]
+
+
+def emit(
+    hooks: Sequence[RequestHook],
+    method: str,
+    path: str,
+    *,
+    status_code: Optional[int],
+    started: float,
+    bytes_received: int,
+    attempt: int,
+    retried: bool = False,
+    error: Optional[str] = None,
+) -> None:
+    """Build the RequestEvent of one attempt (`started` is a time.perf_counter() value) and pass it to `hooks`."""
+    event = RequestEvent(
+        method=method.upper(),
+        endpoint=endpoint_template(path),
+        status_code=status_code,
+        seconds=time.perf_counter() - started,
+        bytes_received=bytes_received,
+        attempt=attempt,
+        retried=retried,
+        error=error,
+    )
+    for hook in hooks:
+        hook(event)
+
+
+class LatencyHistogram:
+    """
+    Latency distribution in logarithmic buckets.
+
+    Memory is bounded by the latency range rather than the number of
+    samples, so a collector can stay attached to a refresh of any size.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._buckets: Dict[int, int] = {}
+
+    def add(self, ms: float) -> None:
+        index = math.ceil(math.log(max(ms, _MIN_MS) / _MIN_MS) / _LOG_GROWTH)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, n in other._buckets.items():
+            self._buckets[index] = self._buckets.get(index, 0) + n
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Upper bound of the bucket holding the p-th percentile (ms), or None without samples."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                return min(_MIN_MS * _BUCKET_GROWTH**index, self.max_ms)
+        return self.max_ms
+
+    def summary(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {f"p{p}": _ms(self.percentile(p)) for p in PERCENTILES}
+        out["mean"] = _ms(self.total_ms / self.count) if self.count else None
+        out["max"] = _ms(self.max_ms) if self.count else None
+        return out
+
+
+def _ms(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 2)
+
+
+@dataclass
+class EndpointStats:
+    """Aggregated events of one `METHOD endpoint`."""
+
+    requests: int = 0
+    attempts: int = 0
+    retries: int = 0
+    errors: int = 0
+    bytes_received: int = 0
+    status_codes: Dict[str, int] = field(default_factory=dict)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def add(self, event: RequestEvent) -> None:
+        self.attempts += 1
+        if event.attempt == 0:
+            self.requests += 1
+        else:
+            self.retries += 1
+        if event.status_code is None:
+            self.errors += 1
+        key = str(event.status_code) if event.status_code is not None else (event.error or "error")
+        self.status_codes[key] = self.status_codes.get(key, 0) + 1
+        self.bytes_received += event.bytes_received
+        self.latency.add(event.seconds * 1000.0)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "errors": self.errors,
+            "status_codes": dict(sorted(self.status_codes.items())),
+            "bytes_received": self.bytes_received,
+            "latency_ms": self.latency.summary(),
+        }
+
+
+class MetricsCollector:
+    """
+    Per-endpoint request metrics; pass it as a hook to XrayClient.
+
+    Aggregates request and retry counts, status codes, bytes received and a
+    latency histogram for every `METHOD endpoint`, safely across worker
+    threads. `summary()` returns a JSON-serialisable report.
+
+    Example:
+        metrics = MetricsCollector()
+        client = XrayClient(base_url=url, token=token, hooks=[metrics])
+        ...
+        print(metrics.summary())
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, EndpointStats] = {}
+
+    def __call__(self, event: RequestEvent) -> None:
+        key = f"{event.method} {event.endpoint}"
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = EndpointStats()
+            stats.add(event)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Metrics so far.
+
+        Returns:
+            `{"totals": {...}, "endpoints": {"GET /xray/api/v1/artifacts": {...}, ...}}`;
+            totals cover every endpoint, endpoints are ordered by request count.
+        """
+        with self._lock:
+            items = sorted(self._endpoints.items(), key=lambda kv: (-kv[1].attempts, kv[0]))
+            endpoints = {key: stats.summary() for key, stats in items}
+            totals = EndpointStats()
+            for _, stats in items:
+                totals.requests += stats.requests
+                totals.attempts += stats.attempts
+                totals.retries += stats.retries
+                totals.errors += stats.errors
+                totals.bytes_received += stats.bytes_received
+                for code, n in stats.status_codes.items():
+                    totals.status_codes[code] = totals.status_codes.get(code, 0) + n
+                totals.latency.merge(stats.latency)
+            return {"totals": totals.summary(), "endpoints": endpoints}
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+# Statuses worth retrying: throttling and transient gateway/server errors.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Methods that are safe to resend after a 5xx or a dropped connection.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta-seconds or HTTP-date) into seconds.
+
+    Returns:
+        Seconds to wait (>= 0), or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, *, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter for retry number `attempt` (0-based)."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class AdaptiveRateLimiter:
+    """
+    Thread-safe token bucket whose rate follows the server's throttling.
+
+    Every limiter honours Retry-After: a throttling response that carries it
+    holds every caller until then. Beyond that, a limiter started without a
+    `rate` never paces requests; retries back off on their own.
+
+    With a `rate` (requests/second), a throttling response also cuts the rate
+    multiplicatively. While requests succeed, the rate climbs back by
+    `increase` requests/second per second, up to `max_rate` (default:
+    `rate`). This keeps throughput close to what the server allows without
+    repeatedly tripping its limit.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        *,
+        max_rate: Optional[float] = None,
+        min_rate: float = 0.5,
+        increase: float = 2.0,
+        decrease: float = 0.7,
+    ) -> None:
+        if rate is not None and rate <= 0:
+            raise ValueError("--rate-limit must be > 0")
+        self.rate = rate
+        self.max_rate = max_rate if max_rate is not None else rate
+        self.min_rate = min_rate
+        self.increase = increase
+        self.decrease = decrease
+        self._lock = threading.Lock()
+        self._tokens = 1.0
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._last_cut = 0.0
+        self._last_raise = self._last
+
+    def reserve(self) -> float:
+        """
+        Take one request slot.
+
+        Returns:
+            Seconds the caller must wait before sending.
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._blocked_until - now)
+            if self.rate is None:
+                return wait
+
+            burst = max(1.0, self.rate)
+            self._tokens = min(burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1.0
+            if self._tokens < 0:
+                wait = max(wait, -self._tokens / self.rate)
+            return wait
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """Record a throttling response (HTTP 429)."""
+        with self._lock:
+            now = time.monotonic()
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+            if self.rate is None:
+                return
+            # Requests already in flight when throttling started all come back 429;
+            # count them as one signal instead of collapsing the rate.
+            if now - self._last_cut < 1.0:
+                return
+            self._last_cut = now
+            self._last_raise = now
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._tokens = min(self._tokens, 0.0)
+            self._last = now
+
+    def on_success(self) -> None:
+        """Record a non-throttled response."""
+        with self._lock:
+            if self.rate is None:
+                return
+            now = time.monotonic()
+            # Time-based, so recovery takes as long at 1 request/s as at 100
+            self.rate += self.increase * (now - self._last_raise)
+            self._last_raise = now
+            if self.max_rate is not None:
+                self.rate = min(self.rate, self.max_rate)
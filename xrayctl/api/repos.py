@@ -1,6 +1,20 @@
 from __future__ import annotations
-from typing import Any, Dict, Optional
-from xrayctl.api.client import XrayClient
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    from xrayctl.api.client import ApiRequest, XrayClient
+
+
+def list_repos_request(*, offset: int = 0, num_of_rows: int = 200, search: Optional[str] = None) -> ApiRequest:
+    """Request of `list_repos`."""
+    params: Dict[str, Any] = {
+        "offset": offset,
+        "num_of_rows": num_of_rows,
+    }
+    if search:
+        params["search"] = search
+
+    return "GET", "/xray/api/v1/repos", {"params": params}
 
 
 def list_repos(
@@ -22,11 +36,5 @@ def list_repos(
     Returns:
         API response containing repository metadata and paging info.
     """
-    params: Dict[str, Any] = {
-        "offset": offset,
-        "num_of_rows": num_of_rows,
-    }
-    if search:
-        params["search"] = search
-
-    return client.request("GET", "/xray/api/v1/repos", params=params)
+    method, path, kwargs = list_repos_request(offset=offset, num_of_rows=num_of_rows, search=search)
+    return client.request(method, path, **kwargs)
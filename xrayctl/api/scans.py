@@ -1,7 +1,23 @@
 from __future__ import annotations
 
-from typing import Any, Dict
-from xrayctl.api.client import XrayClient
+from typing import Any, Dict, Optional
+from xrayctl.api.client import ApiRequest, XrayClient
+
+
+def scan_artifact_request(component_id: str) -> ApiRequest:
+    """Request of `scan_artifact`."""
+    # Triggers an on-demand scan using componentID
+    payload = {"componentID": component_id}
+    return "POST", "/xray/api/v1/scanArtifact", {"json_body": payload}
+
+
+def artifact_status_request(project: Optional[str], *, repo: str, path: str) -> ApiRequest:
+    """Request of `artifact_status`."""
+    # Checks scan status for an artifact by repo/path
+    payload: Dict[str, Any] = {"repo": repo, "path": path}
+    if project:
+        payload["project"] = project
+    return "POST", "/xray/api/v1/artifact/status", {"json_body": payload}
 
 
 def scan_artifact(client: XrayClient, component_id: str) -> Any:
@@ -15,9 +31,8 @@ def scan_artifact(client: XrayClient, component_id: str) -> Any:
     Returns:
         API response indicating scan initiation.
     """
-    # Triggers an on-demand scan using componentID
-    payload = {"componentID": component_id}
-    return client.request("POST", "/xray/api/v1/scanArtifact", json_body=payload)
+    method, path, kwargs = scan_artifact_request(component_id)
+    return client.request(method, path, **kwargs)
 
 
 def artifact_status(client: XrayClient, *, repo: str, path: str) -> Any:
@@ -32,8 +47,5 @@ def artifact_status(client: XrayClient, *, repo: str, path: str) -> Any:
     Returns:
         API response containing scan status details.
     """
-    # Checks scan status for an artifact by repo/path
-    payload: Dict[str, Any] = {"repo": repo, "path": path}
-    if client.project:
-        payload["project"] = client.project
-    return client.request("POST", "/xray/api/v1/artifact/status", json_body=payload)
+    method, api_path, kwargs = artifact_status_request(client.project, repo=repo, path=path)
+    return client.request(method, api_path, **kwargs)
@@ -1,9 +1,15 @@
 from __future__ import annotations
 from typing import Any
-from xrayctl.api.client import XrayClient
+from xrayctl.api.client import ApiRequest, XrayClient
 
 
-def ping(client: XrayClient) -> Any:
+def ping_request() -> ApiRequest:
+    """Request of `ping`."""
     # This is the common Xray endpoint. If your instance differs,
     # you only change it here.
-    return client.request("GET", "/xray/api/v1/system/ping")
+    return "GET", "/xray/api/v1/system/ping", {}
+
+
+def ping(client: XrayClient) -> Any:
+    method, path, kwargs = ping_request()
+    return client.request(method, path, **kwargs)
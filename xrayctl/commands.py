@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import importlib
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+# Keep this module free of heavy imports: it is loaded on every CLI invocation.
+# Workflow modules (and whatever they pull in, e.g. pandas/pyarrow) are only
+# imported once the selected command actually runs.
+
+
+@dataclass(frozen=True)
+class Command:
+    """
+    A registered CLI handler.
+
+    Attributes:
+        module: Workflow module imported lazily when the command runs.
+        run: Adapter mapping parsed args onto the workflow call:
+            `run(workflow_module, client, args) -> result`.
+        needs_client: Whether an XrayClient (and thus url/token) is required,
+            or a predicate deciding it from the parsed args.
+        daemon: Whether the command may be forwarded to a running
+            `xrayctl serve` (see xrayctl.daemon). Long-running commands stay
+            local so that Ctrl-C stops them.
+        paths: Names of args holding local file paths; they are made
+            absolute before the command is forwarded to the daemon.
+    """
+
+    module: str
+    run: Callable[[ModuleType, Any, Any], Any]
+    needs_client: Union[bool, Callable[[Any], bool]] = True
+    daemon: bool = False
+    paths: Tuple[str, ...] = ()
+
+    def load(self) -> ModuleType:
+        return importlib.import_module(self.module)
+
+    def wants_client(self, args: Any) -> bool:
+        return self.needs_client(args) if callable(self.needs_client) else self.needs_client
+
+
+def _config_init(wf: ModuleType, client: Any, args: Any) -> Any:
+    return wf.init_config(args.config)
+
+
+def _config_view(wf: ModuleType, client: Any, args: Any) -> Any:
+    return wf.view_effective(args)
+
+
+def _config_set(wf: ModuleType, client: Any, args: Any) -> Any:
+    return wf.set_value(args.config, args.key, args.value)
+
+
+def _config_save(wf: ModuleType, client: Any, args: Any) -> Any:
+    return wf.save_from_flags(args)
+
+
+def _ping(wf: ModuleType, client: Any, args: Any) -> Any:
+    return wf.ping(client)
+
+
+def _ignore_rules_create(wf: ModuleType, client: Any, args: Any) -> Any:
+    return wf.create(
+        client,
+        note=args.note,
+        watches=args.watch,
+        cves=args.cve,
+        vulns=args.vuln,
+        licenses=args.license,
+        expires_at=args.expires_at,
+        dry_run=args.dry_run,
+    )
+
+
+def _ignore_rules_list(wf: ModuleType, client: Any, args: Any) -> Any:
+    return wf.list_rules(
+        client,
+        watch=args.watch,
+        policy=args.policy,
+        vulnerability=args.vulnerability,
+        cve=args.cve,
+        license_name=args.license,
+        component_name=args.component_name,
+        component_version=args.component_version,
+        page=args.page,
+        rows=args.rows,
+        order_by=args.order_by,
+        direction=args.direction,
+        expires_before=args.expires_before,
+        expires_after=args.expires_after,
+        fetch_all=args.all,
+        concurrency=args.concurrency,
+        local=args.local,
+        index_path=args.index,
+        stream=args.output_format == "ndjson",
+    )
+
+
+def _ignore_rules_apply(wf: ModuleType, client: Any, args: Any) -> Any:
+    return wf.apply_rules(client, rules_file=args.file, concurrency=args.concurrency, dry_run=args.dry_run)
+
+
+def _ignore_rules_sync(wf: ModuleType, client: Any, args: Any) -> Any:
+    return wf.sync_rules(client, index_path=args.index, rows=args.rows, concurrency=args.concurrency)
+
+
+def _ignore_rules_get(wf: ModuleType, client: Any, args: Any) -> Any:
+    return wf.get_ignore_rule(client, args.id)
+
+
+def _scan_artifact(wf: ModuleType, client: Any, args: Any) -> Any:
+    return wf.scan_artifact(
+        client,
+        component_id=args.component_id,
+        wait=args.wait,
+        repo=args.repo,
+        path=args.path,
+        poll_seconds=args.poll_seconds,
+        timeout_seconds=args.timeout_seconds,
+        max_poll_seconds=args.max_poll_seconds,
+        learn=args.learn,
+    )
+
+
+def _scan_artifacts(wf: ModuleType, client: Any, args: Any) -> Any:
+    return wf.scan_artifacts(
+        client,
+        from_file=args.from_file,
+        wait=args.wait,
+        concurrency=args.concurrency,
+        poll_seconds=args.poll_seconds,
+        timeout_seconds=args.timeout_seconds,
+        max_poll_seconds=args.max_poll_seconds,
+        learn=args.learn,
+    )
+
+
+def _artifacts_refresh(wf: ModuleType, client: Any, args: Any) -> Any:
+    return wf.refresh_inventory(
+        client,
+        out_path=args.out,
+        page_size=args.page_size,
+        repo_page_size=args.repo_page_size,
+        repo_regex=args.repo_regex,
+        include_repo_metadata=args.include_repo_metadata,
+        concurrency=args.concurrency,
+        stream=args.stream,
+        incremental=args.incremental,
+        manifest=args.manifest,
+        max_age_hours=args.max_age_hours,
+        checkpoint=args.checkpoint,
+        checkpoint_path=args.checkpoint_dir,
+        resume=args.resume,
+        partition_by=args.partition_by,
+        unknown_columns=args.unknown_columns,
+        catalog_path=args.catalog,
+        catalog_ttl=args.catalog_ttl,
+    )
+
+
+def _artifacts_query(wf: ModuleType, client: Any, args: Any) -> Any:
+    return wf.query_inventory(
+        inventory_path=args.inventory,
+        repos=args.repo,
+        name=args.name,
+        path=args.path,
+        sha256=args.sha256,
+        min_size=args.min_size,
+        max_size=args.max_size,
+        where=args.where,
+        columns=[c.strip() for c in args.columns.split(",") if c.strip()] if args.columns else None,
+        limit=args.limit,
+        result_format=args.output_format,
+    )
+
+
+def _repos_sync(wf: ModuleType, client: Any, args: Any) -> Any:
+    return wf.sync_repos(client, catalog_path=args.catalog, page_size=args.page_size)
+
+
+def _repos_list(wf: ModuleType, client: Any, args: Any) -> Any:
+    return wf.list_repos(
+        client,
+        repo_regex=args.repo_regex,
+        page_size=args.page_size,
+        local=args.local,
+        catalog_path=args.catalog,
+    )
+
+
+def _batch(wf: ModuleType, client: Any, args: Any) -> Any:
+    return wf.run_batch(client, from_file=args.from_file, concurrency=args.concurrency, order=args.order)
+
+
+COMMANDS: Dict[str, Command] = {
+    "config_init": Command("xrayctl.workflows.config", _config_init, needs_client=False),
+    "config_view": Command("xrayctl.workflows.config", _config_view, needs_client=False),
+    "config_set": Command("xrayctl.workflows.config", _config_set, needs_client=False),
+    "config_save": Command("xrayctl.workflows.config", _config_save, needs_client=False),
+    "ping": Command("xrayctl.workflows.system", _ping, daemon=True),
+    "ignore_rules_create": Command("xrayctl.workflows.ignore_rules", _ignore_rules_create, daemon=True),
+    "ignore_rules_list": Command(
+        "xrayctl.workflows.ignore_rules",
+        _ignore_rules_list,
+        # --local answers from the SQLite index and works offline
+        needs_client=lambda args: not args.local,
+        daemon=True,
+        paths=("index",),
+    ),
+    "ignore_rules_sync": Command("xrayctl.workflows.ignore_rules", _ignore_rules_sync),
+    "ignore_rules_apply": Command("xrayctl.workflows.ignore_rules", _ignore_rules_apply),
+    "ignore_rules_get": Command("xrayctl.workflows.ignore_rules", _ignore_rules_get, daemon=True),
+    "scan_artifact": Command("xrayctl.workflows.scans", _scan_artifact),
+    "scan_artifacts": Command("xrayctl.workflows.scans", _scan_artifacts),
+    "artifacts_refresh": Command("xrayctl.workflows.artifacts", _artifacts_refresh),
+    "artifacts_query": Command(
+        "xrayctl.workflows.artifacts",
+        _artifacts_query,
+        needs_client=False,
+        daemon=True,
+        paths=("inventory",),
+    ),
+    "repos_sync": Command("xrayctl.workflows.repos", _repos_sync, daemon=True, paths=("catalog",)),
+    "repos_list": Command(
+        "xrayctl.workflows.repos",
+        _repos_list,
+        # --local reads the catalog written by `repos sync` and works offline
+        needs_client=lambda args: not args.local,
+        daemon=True,
+        paths=("catalog",),
+    ),
+    # Reads its specs from stdin, so it always runs in the calling process
+    "batch": Command("xrayctl.workflows.batch", _batch),
+}
+
+
+def get_command(handler: Optional[str]) -> Command:
+    """
+    Look up a registered handler.
+
+    Raises:
+        ValueError: If no command is registered under `handler`.
+    """
+    cmd = COMMANDS.get(handler or "")
+    if cmd is None:
+        raise ValueError(f"Unknown handler: {handler}")
+    return cmd
@@ -3,11 +3,10 @@ from __future__ import annotations
 import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Optional
-
-import yaml
+from typing import Any, Dict, Mapping, Optional
 
 DEFAULT_CONFIG_PATH = Path.home() / ".config" / "xrayctl" / "config.yaml"
+DEFAULT_CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "xrayctl"
 
 @dataclass
 class Settings:
@@ -16,23 +15,71 @@ class Settings:
     project: Optional[str] = None
     timeout: int = 30
     fmt: str = "json"
+    pool_size: int = 10
+    keep_alive: bool = True
+    cache_ttl: int = 0
+    cache_dir: str = str(DEFAULT_CACHE_DIR / "http")
+    max_retries: int = 3
+    rate_limit: Optional[float] = None
 
 def _read_yaml(path: Path) -> Dict[str, Any]:
     if not path.exists():
         return {}
+    import yaml  # deferred: only paid when a config file actually exists
+
     with path.open("r", encoding="utf-8") as f:
         return yaml.safe_load(f) or {}
 
-def load_settings(url, token, project, timeout, fmt, config_path) -> Settings:
+def parse_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+def _optional_float(value: Any) -> Optional[float]:
+    return float(value) if value not in (None, "") else None
+
+def load_settings(
+    url,
+    token,
+    project,
+    timeout,
+    fmt,
+    config_path,
+    pool_size=None,
+    keep_alive=None,
+    cache_ttl=None,
+    cache_dir=None,
+    max_retries=None,
+    rate_limit=None,
+    env: Optional[Mapping[str, str]] = None,
+) -> Settings:
+    # `env` stands in for os.environ, e.g. a client's XRAY_* variables forwarded to `xrayctl serve`
+    env = os.environ if env is None else env
     path = Path(config_path).expanduser() if config_path else DEFAULT_CONFIG_PATH
     cfg = _read_yaml(path)
 
     return Settings(
-        url=url or os.getenv("XRAY_URL") or cfg.get("url"),
-        token=token or os.getenv("XRAY_TOKEN") or cfg.get("token"),
-        project=project or os.getenv("XRAY_PROJECT") or cfg.get("project"),
-        timeout=int(timeout or os.getenv("XRAY_TIMEOUT") or cfg.get("timeout", 30)),
-        fmt=fmt or os.getenv("XRAY_FORMAT") or cfg.get("format", "json"),
+        url=url or env.get("XRAY_URL") or cfg.get("url"),
+        token=token or env.get("XRAY_TOKEN") or cfg.get("token"),
+        project=project or env.get("XRAY_PROJECT") or cfg.get("project"),
+        timeout=int(timeout or env.get("XRAY_TIMEOUT") or cfg.get("timeout", 30)),
+        fmt=fmt or env.get("XRAY_FORMAT") or cfg.get("format", "json"),
+        pool_size=int(
+            pool_size if pool_size is not None else env.get("XRAY_POOL_SIZE") or cfg.get("pool_size", 10)
+        ),
+        keep_alive=parse_bool(
+            keep_alive if keep_alive is not None else env.get("XRAY_KEEP_ALIVE", cfg.get("keep_alive", True))
+        ),
+        cache_ttl=int(
+            cache_ttl if cache_ttl is not None else env.get("XRAY_CACHE_TTL") or cfg.get("cache_ttl", 0)
+        ),
+        cache_dir=cache_dir or env.get("XRAY_CACHE_DIR") or cfg.get("cache_dir") or str(DEFAULT_CACHE_DIR / "http"),
+        max_retries=int(
+            max_retries if max_retries is not None else env.get("XRAY_MAX_RETRIES") or cfg.get("max_retries", 3)
+        ),
+        rate_limit=_optional_float(
+            rate_limit if rate_limit is not None else env.get("XRAY_RATE_LIMIT") or cfg.get("rate_limit")
+        ),
     )
 
 def default_config() -> Dict[str, Any]:
@@ -42,12 +89,19 @@ def default_config() -> Dict[str, Any]:
         "project": None,
         "timeout": 30,
         "format": "json",
+        "pool_size": 10,
+        "keep_alive": True,
+        "cache_ttl": 0,
+        "max_retries": 3,
+        "rate_limit": None,
     }
 
 def _resolve_config_path(config_path: Optional[str]) -> Path:
     return Path(config_path).expanduser() if config_path else DEFAULT_CONFIG_PATH
 
 def write_config(data: Dict[str, Any], config_path: Optional[str] = None) -> Path:
+    import yaml
+
     path = _resolve_config_path(config_path)
     path.parent.mkdir(parents=True, exist_ok=True)
 
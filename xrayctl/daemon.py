@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import argparse
+import importlib
+import io
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+from xrayctl import __version__
+from xrayctl.commands import COMMANDS, Command, get_command
+from xrayctl.config import DEFAULT_CACHE_DIR, parse_bool
+
+# `forward` runs on every CLI invocation, so this module stays as light as
+# commands.py: the server half imports socketserver and the workflows lazily.
+
+DEFAULT_SOCKET_PATH = DEFAULT_CACHE_DIR / "daemon.sock"
+PROTOCOL_VERSION = 1
+# Global args holding local paths; made absolute before forwarding, like Command.paths.
+_GLOBAL_PATHS = ("config", "cache_dir", "output_file", "metrics_file")
+# Output is sent in frames of at most this many characters (and on every flush).
+_FRAME_CHARS = 1 << 16
+
+
+def socket_path(args: Any) -> Path:
+    """Daemon socket: --daemon-socket, XRAY_DAEMON_SOCKET or ~/.cache/xrayctl/daemon.sock."""
+    return Path(
+        getattr(args, "daemon_socket", None) or os.environ.get("XRAY_DAEMON_SOCKET") or DEFAULT_SOCKET_PATH
+    ).expanduser()
+
+
+def _identity() -> Dict[str, Any]:
+    # Everything a command resolves from the process rather than its args: the default config
+    # path (HOME) and the cache directory holding indexes, histories and checkpoints. A daemon
+    # only serves callers that would resolve them the same way.
+    return {
+        "version": __version__,
+        "protocol": PROTOCOL_VERSION,
+        "home": str(Path.home()),
+        "cache_dir": str(DEFAULT_CACHE_DIR),
+    }
+
+
+def _forwardable(args: Any) -> Optional[Command]:
+    if args.command in ("hello", "serve") or args.no_daemon or args.profile:
+        return None
+    try:
+        cmd = get_command(getattr(args, "handler", None))
+    except ValueError:
+        return None
+    return cmd if cmd.daemon else None
+
+
+def _portable_args(args: Any, cmd: Command) -> Dict[str, Any]:
+    data = dict(vars(args))
+    for name in _GLOBAL_PATHS + cmd.paths:
+        value = data.get(name)
+        if isinstance(value, str) and value:
+            data[name] = os.path.abspath(os.path.expanduser(value))
+    return data
+
+
+def _send(sock: socket.socket, message: Dict[str, Any]) -> None:
+    sock.sendall(json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n")
+
+
+def forward(args: Any) -> Optional[int]:
+    """
+    Run a command in a running `xrayctl serve`, relaying its output.
+
+    Only commands registered with `daemon=True` are forwarded, and only when
+    a daemon socket exists and neither --no-daemon, XRAY_NO_DAEMON nor
+    --profile (which profiles this process) is set. XRAY_* variables are
+    sent along; relative paths are resolved here first.
+
+    Returns:
+        The command's exit code, or None if it was not forwarded and should
+        run locally (no daemon, a stale socket, or a daemon for another
+        xrayctl version, HOME or cache directory).
+    """
+    if parse_bool(os.environ.get("XRAY_NO_DAEMON", "")) or not hasattr(socket, "AF_UNIX"):
+        return None
+    cmd = _forwardable(args)
+    if cmd is None:
+        return None
+    path = socket_path(args)
+    if not path.exists():
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    with sock:
+        _send(
+            sock,
+            {
+                "identity": _identity(),
+                "args": _portable_args(args, cmd),
+                "env": {k: v for k, v in os.environ.items() if k.startswith("XRAY_")},
+            },
+        )
+        with sock.makefile("rb") as frames:
+            return _relay(frames)
+
+
+def _relay(frames: BinaryIO) -> Optional[int]:
+    started = False
+    for line in frames:
+        frame = json.loads(line)
+        if "fallback" in frame and not started:
+            return None
+        started = True
+        try:
+            if "out" in frame:
+                sys.stdout.write(frame["out"])
+                sys.stdout.flush()
+            elif "err" in frame:
+                sys.stderr.write(frame["err"])
+                sys.stderr.flush()
+            elif "exit" in frame:
+                return int(frame["exit"])
+        except BrokenPipeError:
+            # Same as a local run: the reader went away, stop quietly
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 1
+    # The daemon went away mid-command; the command may have had effects, so don't rerun it
+    sys.stderr.write("xrayctl: the daemon closed the connection before the command finished\n")
+    return 1
+
+
+# -- server --------------------------------------------------------------------
+
+
+class _FrameWriter(io.TextIOBase):
+    """Text stream sending what is written to the caller as "out" or "err" frames."""
+
+    def __init__(self, send: Any, kind: str) -> None:
+        self._send = send
+        self._kind = kind
+        self._parts: list = []
+        self._size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        self._parts.append(s)
+        self._size += len(s)
+        if self._size >= _FRAME_CHARS:
+            self.flush()
+        return len(s)
+
+    def flush(self) -> None:
+        if self._parts:
+            text = "".join(self._parts)
+            self._parts, self._size = [], 0
+            self._send({self._kind: text})
+
+
+class XrayDaemon:
+    """
+    Long-lived server answering forwarded commands on a Unix socket.
+
+    Each connection carries one command, run on its own thread through the
+    same `execute` as the CLI. Workflow modules stay imported between
+    commands. XrayClients are kept per distinct connection settings (url,
+    token, pool size, ...), so their pooled connections, response cache and
+    rate limiter are shared by every command using them. Config files are
+    re-read per command.
+
+    The socket is created 0600, so only the owning user can connect, which
+    matters since callers send their tokens. Its directory is created 0700
+    if missing but left as is otherwise (it may be shared, e.g. with
+    `--daemon-socket /tmp/...`).
+    """
+
+    def __init__(self, path: Path, *, idle_timeout: float = 0) -> None:
+        import socketserver
+
+        if idle_timeout < 0:
+            raise ValueError("--idle-timeout must be >= 0")
+        self.path = path
+        self.idle_timeout = idle_timeout
+        self._clients: Dict[Tuple[Tuple[str, Any], ...], Any] = {}
+        self._lock = threading.Lock()
+        self._active = 0
+        self._last_active = time.monotonic()
+        self._prepare_path()
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                daemon._handle(self.connection, self.rfile)
+
+        class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+        umask = os.umask(0o177)
+        try:
+            self.server = Server(str(path), Handler)
+        finally:
+            os.umask(umask)
+
+    def _prepare_path(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        if not self.path.exists():
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(self.path))
+        except OSError:
+            self.path.unlink()  # left behind by a daemon that did not shut down cleanly
+            return
+        finally:
+            probe.close()
+        raise ValueError(f"An xrayctl daemon is already listening on {self.path}")
+
+    def client(self, options: Dict[str, Any]) -> Any:
+        """Warm XrayClient for `client_options`, created on first use."""
+        from xrayctl.main import build_client
+
+        key = tuple(sorted(options.items()))
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = build_client(options)
+            return client
+
+    def _handle(self, conn: socket.socket, rfile: BinaryIO) -> None:
+        from xrayctl.main import execute
+
+        lock = threading.Lock()
+
+        def send(message: Dict[str, Any]) -> None:
+            with lock:
+                _send(conn, message)
+
+        with self._lock:
+            self._active += 1
+        try:
+            request = json.loads(rfile.readline() or b"{}")
+            if request.get("control") == "stop":
+                send({"exit": 0})
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+            if request.get("identity") != _identity():
+                send({"fallback": "daemon runs another xrayctl version, HOME or cache directory"})
+                return
+
+            out, err = _FrameWriter(send, "out"), _FrameWriter(send, "err")
+            try:
+                code = execute(
+                    argparse.Namespace(**request["args"]),
+                    stdout=out,
+                    stderr=err,
+                    env=request.get("env") or {},
+                    get_client=self.client,
+                )
+            except Exception as e:  # e.g. an unparseable XRAY_TIMEOUT, which a local run reports the same way
+                err.write(f"xrayctl: {e}\n")
+                code = 1
+            out.flush()
+            err.flush()
+            send({"exit": code})
+        except OSError:
+            return  # the caller went away
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._last_active = time.monotonic()
+
+    def _watch_idle(self) -> None:
+        while True:
+            time.sleep(min(1.0, self.idle_timeout))
+            with self._lock:
+                idle = self._active == 0 and time.monotonic() - self._last_active >= self.idle_timeout
+            if idle:
+                self.server.shutdown()
+                return
+
+    def serve_forever(self) -> None:
+        """Serve until shut down (`xrayctl serve --stop`, SIGTERM, Ctrl-C or idle timeout)."""
+        if self.idle_timeout:
+            threading.Thread(target=self._watch_idle, name="xrayctl-idle", daemon=True).start()
+        try:
+            self.server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self.server.server_close()
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def stop(path: Path) -> bool:
+    """Ask the daemon on `path` to exit; False if none is listening."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        return False
+    with sock:
+        _send(sock, {"control": "stop"})
+        with sock.makefile("rb") as frames:
+            frames.readline()
+    return True
+
+
+def serve_command(args: Any) -> int:
+    """`xrayctl serve`: run the daemon in the foreground, or stop one with --stop."""
+    from xrayctl.output import print_out
+
+    path = socket_path(args)
+    try:
+        if not hasattr(socket, "AF_UNIX"):
+            raise ValueError("xrayctl serve needs Unix domain sockets, which this platform lacks")
+        if args.stop:
+            if not stop(path):
+                raise ValueError(f"No xrayctl daemon is listening on {path}")
+            print_out({"ok": True, "stopped": str(path)})
+            return 0
+        daemon = XrayDaemon(path, idle_timeout=args.idle_timeout)
+    except Exception as e:
+        print_out({"ok": False, "error": str(e)})
+        return 1
+
+    import signal
+
+    # Imports paid once here instead of by the first forwarded commands
+    for cmd in COMMANDS.values():
+        if cmd.daemon:
+            cmd.load()
+    # Not a forwarded command's module, but every forwarded command builds a client; imported by
+    # name since nothing here uses the module itself.
+    importlib.import_module("xrayctl.api.client")
+
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=daemon.server.shutdown, daemon=True).start())
+    print_out({"ok": True, "socket": str(path), "pid": os.getpid()})
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
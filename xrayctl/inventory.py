@@ -0,0 +1,1032 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+
+def _check_out_path(out_path: str) -> None:
+    if not (out_path.endswith(".parquet") or out_path.endswith(".csv")):
+        raise ValueError("--out must end with .parquet or .csv")
+
+
+# -- inventory schema ----------------------------------------------------------
+
+_DICT = pa.dictionary(pa.int32(), pa.string())
+
+# Columns with a fixed type. Sizes are stored in bytes and timestamps in UTC;
+# dictionary-encoded (categorical) columns hold low-cardinality strings.
+INVENTORY_TYPES: Dict[str, pa.DataType] = {
+    "repo": _DICT,
+    "name": pa.string(),
+    "repo_path": pa.string(),
+    "repo_full_path": pa.string(),
+    "package_id": pa.string(),
+    "package_type": _DICT,
+    "version": pa.string(),
+    "sha256": pa.string(),
+    "size": pa.int64(),
+    "created": pa.timestamp("ms", tz="UTC"),
+    "deployed_by": _DICT,
+    "scans_status": _DICT,
+    "violations": pa.int64(),
+}
+# Column families: vulnerability counts, and repo listing metadata
+# (--include-repo-metadata), which repeats on every row of a repo.
+_COUNT_PREFIX = "sec_issues."
+_REPO_META_PREFIX = "repo_"
+
+UNKNOWN_COLUMN_POLICIES = ("keep", "drop")
+
+
+def inventory_type(column: str) -> Optional[pa.DataType]:
+    """Schema type of an inventory column, or None for columns outside the schema."""
+    if column in INVENTORY_TYPES:
+        return INVENTORY_TYPES[column]
+    if column.startswith(_COUNT_PREFIX):
+        return pa.int64()
+    if column.startswith(_REPO_META_PREFIX):
+        return _DICT
+    return None
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if hasattr(value, "item"):
+        value = value.item()  # numpy scalar
+    # Integers come back as floats when json_normalize had to fill in NaNs.
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+def _as_text(s: pd.Series) -> pd.Series:
+    # Strings stay as they are; anything else (numbers, lists, ...) becomes its JSON text.
+    if isinstance(s.dtype, pd.CategoricalDtype) or pd.api.types.infer_dtype(s, skipna=True) in ("string", "empty"):
+        return s
+    return s.map(_text, na_action="ignore").astype(object)
+
+
+def _size_or_none(value: Any) -> Optional[int]:
+    try:
+        return parse_size(value)
+    except ValueError:
+        return None
+
+
+def conform_inventory(df: pd.DataFrame, *, unknown_columns: str = "keep") -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Apply the inventory schema to a normalized frame.
+
+    Known columns get their schema type: sizes like "1.5 MB" become bytes,
+    timestamps become UTC datetimes, counts nullable integers, and
+    low-cardinality strings (repo, repo metadata, package type, ...)
+    categoricals. Unknown columns are either kept as strings, with
+    non-string values as their JSON text, or dropped, depending on
+    `unknown_columns`. Values that do not parse become nulls. Already
+    conformed frames pass through unchanged.
+
+    Returns:
+        `(conformed frame, names of dropped unknown columns)`.
+    """
+    if unknown_columns not in UNKNOWN_COLUMN_POLICIES:
+        raise ValueError(f"--unknown-columns must be one of: {', '.join(UNKNOWN_COLUMN_POLICIES)}")
+    out: Dict[str, pd.Series] = {}
+    dropped: List[str] = []
+    for col in df.columns:
+        s = df[col]
+        type_ = inventory_type(col)
+        if type_ is None:
+            if unknown_columns == "drop":
+                dropped.append(col)
+            else:
+                out[col] = _as_text(s)
+        elif pa.types.is_dictionary(type_):
+            out[col] = s if isinstance(s.dtype, pd.CategoricalDtype) else _as_text(s).astype("category")
+        elif pa.types.is_timestamp(type_):
+            out[col] = pd.to_datetime(s, utc=True, errors="coerce", format="ISO8601").dt.as_unit("ms")
+        elif pa.types.is_integer(type_):
+            if col == "size" and not pd.api.types.is_numeric_dtype(s):
+                s = s.map(_size_or_none)
+            out[col] = pd.to_numeric(s, errors="coerce").round().astype("Int64")
+        else:
+            out[col] = _as_text(s)
+    return pd.DataFrame(out, index=df.index), dropped
+
+
+def normalize_inventory(
+    records: List[Dict[str, Any]], *, unknown_columns: str = "keep"
+) -> Tuple[pd.DataFrame, List[str]]:
+    """Flatten raw artifact rows (nested keys become `a.b` columns) and apply the inventory schema."""
+    return conform_inventory(pd.json_normalize(records), unknown_columns=unknown_columns)
+
+
+def inventory_table(df: pd.DataFrame) -> pa.Table:
+    """
+    Arrow table of a conformed inventory frame, with the schema's exact types.
+
+    Dictionary columns always get int32 indices and columns that are
+    entirely null are typed as strings, so chunks of the same inventory
+    always convert to the same schema.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    fields = []
+    arrays = []
+    for field, col in zip(table.schema, table.columns):
+        type_ = inventory_type(field.name) or field.type
+        if pa.types.is_null(type_) or pa.types.is_large_string(type_):
+            type_ = pa.string()
+        if col.type != type_:
+            col = col.cast(type_)
+        fields.append(pa.field(field.name, type_))
+        arrays.append(col)
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields, metadata=table.schema.metadata))
+
+
+# zstd roughly halves inventory files compared to parquet's default snappy, at similar read speed.
+_PARQUET_COMPRESSION = "zstd"
+# Timestamps in CSV inventories are written as ISO8601 UTC, like the API returns them.
+_CSV_DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+# Rows per parquet row group. Each group carries min/max statistics that
+# `artifacts query` prunes by: big enough to keep the footer small, small
+# enough that a filter can skip most of a large inventory.
+_ROW_GROUP_ROWS = 64 * 1024
+# Sort keys of buffered parquet inventories, so each row group covers a narrow repo/path range.
+_SORT_COLUMNS = ("repo", "repo_path", "name")
+
+
+def _sort_for_pruning(table: pa.Table) -> pa.Table:
+    # Dictionary columns are sorted by value, not by their (first-seen) indices.
+    keys = [c for c in _SORT_COLUMNS if c in table.column_names]
+    if not keys or table.num_rows < 2:
+        return table
+    columns = {}
+    for c in keys:
+        col = table.column(c)
+        columns[c] = col.cast(col.type.value_type) if pa.types.is_dictionary(col.type) else col
+    order = pc.sort_indices(pa.table(columns), sort_keys=[(c, "ascending") for c in keys])
+    return table.take(order)
+
+
+class InventoryWriter(ABC):
+    """
+    Base class for inventory writers.
+
+    Writers receive normalized DataFrame chunks through `write()` and produce
+    a single .parquet or .csv file. Output goes to a temporary file next to
+    `out_path` and is moved into place on `close()`, so a failed refresh never
+    clobbers the previous inventory.
+    """
+
+    def __init__(self, out_path: str, *, tmp_path: Optional[str] = None) -> None:
+        _check_out_path(out_path)
+        self.out_path = out_path
+        self.tmp_path = tmp_path or out_path + ".tmp"
+        self.rows = 0
+        self.columns: List[str] = []
+        self.columns_dropped: List[str] = []
+
+    @abstractmethod
+    def write(self, df: pd.DataFrame) -> None:
+        """Add a normalized chunk of rows."""
+
+    def reuse(self, repo: str, snapshot: Dict[str, Any]) -> None:
+        """Carry a repo's rows over from the previous inventory (see `read_snapshot_by_repo`)."""
+        if repo in snapshot:
+            self.write(snapshot[repo])
+
+    def prune(self, *, keep: Set[str], scope: Callable[[str], bool]) -> None:
+        """Drop stale repos from a partitioned inventory; single-file inventories are rewritten whole."""
+
+    @abstractmethod
+    def _finish(self) -> None:
+        """Complete the temporary file; `close()` then moves it into place."""
+
+    def close(self) -> None:
+        self._finish()
+        os.replace(self.tmp_path, self.out_path)
+
+    def abort(self) -> None:
+        try:
+            os.remove(self.tmp_path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "InventoryWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class BufferedInventoryWriter(InventoryWriter):
+    """
+    Collects every chunk in memory and writes the whole table on close.
+
+    Parquet rows are sorted by repo, path and name and written in row groups
+    of `_ROW_GROUP_ROWS` rows, so the row group statistics let `artifacts
+    query` skip groups by repo or path.
+    """
+
+    def __init__(self, out_path: str, *, tmp_path: Optional[str] = None) -> None:
+        super().__init__(out_path, tmp_path=tmp_path)
+        self._frames: List[pd.DataFrame] = []
+        self._tables: List[pa.Table] = []
+
+    def write(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        # Parquet chunks are held as arrow tables, which are far more compact than object columns.
+        if self.out_path.endswith(".parquet"):
+            self._tables.append(inventory_table(df))
+        else:
+            self._frames.append(df)
+
+    def _finish(self) -> None:
+        if self.out_path.endswith(".parquet"):
+            table = pa.concat_tables(self._tables, promote_options="permissive") if self._tables else pa.table({})
+            self._tables = []
+            self.rows = table.num_rows
+            self.columns = list(table.column_names)
+            table = _sort_for_pruning(table)
+            pq.write_table(table, self.tmp_path, compression=_PARQUET_COMPRESSION, row_group_size=_ROW_GROUP_ROWS)
+        else:
+            df = pd.concat(self._frames, ignore_index=True) if self._frames else pd.DataFrame()
+            self._frames = []
+            self.rows = int(df.shape[0])
+            self.columns = list(df.columns)
+            df.to_csv(self.tmp_path, index=False, date_format=_CSV_DATE_FORMAT)
+
+
+class StreamingInventoryWriter(InventoryWriter):
+    """
+    Flushes each chunk to disk as it arrives, keeping memory flat.
+
+    Parquet chunks are collected into row groups of `_ROW_GROUP_ROWS` rows
+    (so memory is bounded by one row group); CSV chunks are appended. Since the file
+    header is written with the first chunk, the first non-empty chunk pins the
+    column set and types: later chunks are conformed to it (missing columns
+    are filled with nulls, unseen columns are dropped and reported in
+    `columns_dropped`).
+    """
+
+    def __init__(self, out_path: str, *, tmp_path: Optional[str] = None) -> None:
+        super().__init__(out_path, tmp_path=tmp_path)
+        self._schema: Optional[pa.Schema] = None
+        self._parquet: Optional[pq.ParquetWriter] = None
+        self._pending: List[pa.Table] = []
+        self._pending_rows = 0
+
+    def _conform(self, df: pd.DataFrame) -> pd.DataFrame:
+        extra = [c for c in df.columns if c not in self.columns]
+        for c in extra:
+            if c not in self.columns_dropped:
+                self.columns_dropped.append(c)
+        return df.reindex(columns=self.columns)
+
+    def _to_table(self, df: pd.DataFrame) -> pa.Table:
+        table = inventory_table(df)
+        if self._schema is None:
+            self._schema = table.schema
+        arrays = []
+        for field in self._schema:
+            col = table.column(field.name)
+            if col.type != field.type:
+                try:
+                    col = col.cast(field.type)
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                    raise ValueError(
+                        f"Inventory column {field.name!r} changed type from {field.type} to {col.type} "
+                        "mid-stream; rerun without --stream"
+                    ) from e
+            arrays.append(col)
+        return pa.Table.from_arrays(arrays, schema=self._schema)
+
+    def write(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        first = not self.columns
+        if first:
+            self.columns = list(df.columns)
+        else:
+            df = self._conform(df)
+
+        if self.out_path.endswith(".parquet"):
+            table = self._to_table(df)
+            self._pending.append(table)
+            self._pending_rows += table.num_rows
+            if self._pending_rows >= _ROW_GROUP_ROWS:
+                self._flush_row_groups(final=False)
+        else:
+            df.to_csv(self.tmp_path, mode="w" if first else "a", header=first, index=False, date_format=_CSV_DATE_FORMAT)
+
+        self.rows += int(df.shape[0])
+
+    def _flush_row_groups(self, *, final: bool) -> None:
+        # Writes whole row groups only; the remainder waits for more rows unless this is the end.
+        if not self._pending:
+            return
+        table = pa.concat_tables(self._pending)
+        size = table.num_rows if final else table.num_rows - table.num_rows % _ROW_GROUP_ROWS
+        rest = table.slice(size)
+        self._pending, self._pending_rows = ([rest] if rest.num_rows else []), rest.num_rows
+        table = table.slice(0, size)
+        if self._parquet is None:
+            self._parquet = pq.ParquetWriter(self.tmp_path, self._schema, compression=_PARQUET_COMPRESSION)
+        self._parquet.write_table(table, row_group_size=_ROW_GROUP_ROWS)
+
+    def _finish(self) -> None:
+        self._flush_row_groups(final=True)
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+        elif not self.columns:
+            # Nothing arrived: still produce an (empty) file like the buffered writer does.
+            if self.out_path.endswith(".parquet"):
+                pd.DataFrame().to_parquet(self.tmp_path, index=False)
+            else:
+                pd.DataFrame().to_csv(self.tmp_path, index=False)
+
+    def abort(self) -> None:
+        self._pending, self._pending_rows = [], 0
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+        super().abort()
+
+
+class PartitionedInventoryWriter(InventoryWriter):
+    """
+    Writes the inventory as a hive-style dataset directory, one partition per repo.
+
+    Layout: `<out_dir>/repo=<name>/part-0.parquet` plus `_inventory.json`
+    listing every partition with its row count and refresh time. The `repo`
+    column is encoded in the directory name rather than stored in the files.
+
+    Each repo's rows are written to a hidden temporary file in its partition
+    and moved into place when the next repo starts, so a refresh only
+    replaces the partitions of repos it actually refetched. Repos reused from
+    the previous run (`reuse`) keep their files untouched, and `prune`
+    removes partitions of repos that vanished or came back empty.
+    """
+
+    def __init__(self, out_dir: str, *, stream: bool) -> None:
+        if out_dir.endswith(".parquet") or out_dir.endswith(".csv") or os.path.isfile(out_dir):
+            raise ValueError("--partition-by writes a dataset directory; --out must be a directory")
+        self.out_path = out_dir.rstrip("/") or out_dir
+        self.tmp_path = ""
+        self.rows = 0
+        self.columns: List[str] = []
+        self.columns_dropped: List[str] = []
+        self.pruned: List[str] = []
+        self.stream = stream
+        self.partitions: Dict[str, Dict[str, Any]] = dict(
+            (load_dataset_metadata(self.out_path) or {}).get("partitions") or {}
+        )
+        self._refreshed_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self._current: Optional[Tuple[str, InventoryWriter]] = None
+        self._touched: Set[str] = set()
+
+    def _open_partition(self, repo: str) -> InventoryWriter:
+        directory = partition_dir(self.out_path, repo)
+        os.makedirs(directory, exist_ok=True)
+        # Dot-prefixed, so dataset readers ignore it while it is being written.
+        tmp = os.path.join(directory, "." + PARTITION_FILE + ".tmp")
+        return open_writer(os.path.join(directory, PARTITION_FILE), stream=self.stream, tmp_path=tmp)
+
+    def _finish_partition(self) -> None:
+        if self._current is None:
+            return
+        repo, sub = self._current
+        self._current = None
+        sub.close()
+        self.rows += sub.rows
+        self._touched.add(repo)
+        for c in ["repo"] + sub.columns:
+            if c not in self.columns:
+                self.columns.append(c)
+        for c in sub.columns_dropped:
+            if c not in self.columns_dropped:
+                self.columns_dropped.append(c)
+        self.partitions[repo] = {
+            "path": os.path.relpath(sub.out_path, self.out_path),
+            "rows": sub.rows,
+            "refreshed_at": self._refreshed_at,
+        }
+
+    def write(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        for repo, group in df.groupby("repo", sort=False, observed=True):
+            repo = str(repo)
+            if self._current is None or self._current[0] != repo:
+                self._finish_partition()
+                self._current = (repo, self._open_partition(repo))
+            self._current[1].write(group.drop(columns=["repo"]).reset_index(drop=True))
+
+    def reuse(self, repo: str, snapshot: Dict[str, Any]) -> None:
+        self._finish_partition()
+        entry = self.partitions.get(repo)
+        if entry is None:
+            return
+        self.rows += int(entry.get("rows", 0))
+        self._touched.add(repo)
+        try:
+            names = pq.read_schema(os.path.join(self.out_path, entry["path"])).names
+        except (OSError, KeyError, pa.ArrowInvalid):
+            return
+        for c in ["repo"] + names:
+            if c not in self.columns:
+                self.columns.append(c)
+
+    def prune(self, *, keep: Set[str], scope: Callable[[str], bool]) -> None:
+        self._finish_partition()
+        for repo in list(self.partitions):
+            if repo in self._touched or repo in keep or not scope(repo):
+                continue
+            shutil.rmtree(partition_dir(self.out_path, repo), ignore_errors=True)
+            del self.partitions[repo]
+            self.pruned.append(repo)
+
+    def _write_metadata(self) -> None:
+        write_dataset_metadata(
+            self.out_path,
+            {
+                "partition_by": "repo",
+                "format": "parquet",
+                "updated_at": self._refreshed_at,
+                "rows": sum(int(p.get("rows", 0)) for p in self.partitions.values()),
+                "partitions": dict(sorted(self.partitions.items())),
+            },
+        )
+
+    def _finish(self) -> None:
+        self._finish_partition()
+        self._write_metadata()
+
+    def close(self) -> None:
+        self._finish()
+
+    def abort(self) -> None:
+        if self._current is not None:
+            self._current[1].abort()
+            self._current = None
+        # Partitions finished before the failure are already in place; keep the metadata in sync.
+        if self.partitions or os.path.isdir(self.out_path):
+            self._write_metadata()
+
+
+def open_writer(
+    out_path: str,
+    *,
+    stream: bool,
+    partition_by: Optional[str] = None,
+    tmp_path: Optional[str] = None,
+) -> InventoryWriter:
+    """
+    Create an inventory writer for `out_path`.
+
+    Args:
+        out_path: Output file path (.parquet or .csv), or a dataset directory
+            with `partition_by`.
+        stream: Flush chunks as they arrive instead of buffering the whole table.
+        partition_by: Write a dataset partitioned by this column (only "repo").
+        tmp_path: Where a single-file writer stages output before moving it in place.
+
+    Returns:
+        An InventoryWriter; use it as a context manager.
+
+    Raises:
+        ValueError: If `out_path` does not fit the requested layout.
+    """
+    if partition_by is not None:
+        if partition_by != "repo":
+            raise ValueError("--partition-by only supports 'repo'")
+        return PartitionedInventoryWriter(out_path, stream=stream)
+    if stream:
+        return StreamingInventoryWriter(out_path, tmp_path=tmp_path)
+    return BufferedInventoryWriter(out_path, tmp_path=tmp_path)
+
+
+DATASET_METADATA = "_inventory.json"
+DATASET_VERSION = 1
+PARTITION_FILE = "part-0.parquet"
+
+
+def partition_dir(out_dir: str, repo: str) -> str:
+    """Hive-style partition directory of a repo (`repo=<url-quoted name>`)."""
+    return os.path.join(out_dir, "repo=" + quote(repo, safe=""))
+
+
+def is_dataset(path: str) -> bool:
+    return os.path.isdir(path)
+
+
+def load_dataset_metadata(out_dir: str) -> Optional[Dict[str, Any]]:
+    path = os.path.join(out_dir, DATASET_METADATA)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != DATASET_VERSION:
+        return None
+    return data
+
+
+def write_dataset_metadata(out_dir: str, data: Dict[str, Any]) -> None:
+    os.makedirs(out_dir, exist_ok=True)
+    _write_json(os.path.join(out_dir, DATASET_METADATA), dict(data, version=DATASET_VERSION))
+
+
+# Version 2: rows are stored with the typed inventory schema.
+MANIFEST_VERSION = 2
+
+
+def manifest_path(out_path: str) -> str:
+    """Path of the per-repo manifest written next to an inventory file (or dataset directory)."""
+    out_path = out_path.rstrip("/") or out_path
+    return out_path + ".manifest.json"
+
+
+class RecordHasher:
+    """Incremental, key-order independent sha256 over raw API records."""
+
+    def __init__(self) -> None:
+        self._h = hashlib.sha256()
+
+    def update(self, records: List[Dict[str, Any]]) -> None:
+        for r in records:
+            self._h.update(json.dumps(r, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8"))
+            self._h.update(b"\n")
+
+    def hexdigest(self) -> str:
+        return self._h.hexdigest()
+
+
+def hash_records(records: List[Dict[str, Any]]) -> str:
+    """Stable content hash of raw API records."""
+    h = RecordHasher()
+    h.update(records)
+    return h.hexdigest()
+
+
+def load_manifest(path: str) -> Optional[Dict[str, Any]]:
+    """Load a manifest, returning None if it is missing or from another version."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return None
+    return data
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=False)
+    os.replace(tmp, path)
+
+
+def write_manifest(path: str, data: Dict[str, Any]) -> None:
+    _write_json(path, dict(data, version=MANIFEST_VERSION))
+
+
+def read_snapshot_by_repo(out_path: str) -> Dict[str, Any]:
+    """
+    Load a previous inventory file and split it into per-repo frames.
+
+    For a partitioned dataset nothing is loaded: the mapping holds each
+    repo's partition file, which the writer keeps in place when reused.
+
+    Args:
+        out_path: Existing .parquet or .csv inventory, or dataset directory.
+
+    Returns:
+        Mapping of repo name to that repo's rows (or partition file).
+    """
+    if is_dataset(out_path):
+        partitions = (load_dataset_metadata(out_path) or {}).get("partitions") or {}
+        return {
+            repo: os.path.join(out_path, entry["path"])
+            for repo, entry in partitions.items()
+            if os.path.exists(os.path.join(out_path, entry["path"]))
+        }
+    _check_out_path(out_path)
+    if out_path.endswith(".parquet"):
+        df = pd.read_parquet(out_path)
+    else:
+        df = pd.read_csv(out_path)
+    if df.empty or "repo" not in df.columns:
+        return {}
+    # Older or CSV inventories are re-typed so reused rows match freshly fetched ones.
+    df, _ = conform_inventory(df)
+    return {
+        str(name): group.reset_index(drop=True) for name, group in df.groupby("repo", sort=False, observed=True)
+    }
+
+
+def checkpoint_dir(out_path: str) -> str:
+    """Default checkpoint directory of a refresh writing `out_path`."""
+    out_path = out_path.rstrip("/") or out_path
+    return out_path + ".checkpoint"
+
+
+class RefreshCheckpoint:
+    """
+    Durable progress of an in-flight refresh.
+
+    Layout of the checkpoint directory:
+
+    - `journal.jsonl`: a `start` record with the refresh parameters, then one
+      record per event: `page` (a page was appended to the repo's data file),
+      `done` (the repo's pages are complete) and `unchanged` (incremental
+      probe found nothing to fetch).
+    - `repos/<sha1>.ndjson`: one line per fetched page of a repo, holding
+      `offset`, `next_offset` and the raw `data` records.
+
+    Each page is fsync'ed to its data file before the journal records it, and
+    the journal stores the data file size, so a crash can lose at most the
+    page being written. Resuming truncates data files back to the last
+    journaled size.
+    """
+
+    def __init__(self, directory: str, params: Dict[str, Any]) -> None:
+        self.directory = directory
+        self.params = params
+        self._journal_path = os.path.join(directory, "journal.jsonl")
+        self._repos_dir = os.path.join(directory, "repos")
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._journal_params: Optional[Dict[str, Any]] = None
+        self._journal: Optional[Any] = None
+
+    @classmethod
+    def start(cls, directory: str, params: Dict[str, Any]) -> "RefreshCheckpoint":
+        """Start a fresh checkpoint, discarding any previous one in `directory`."""
+        ckpt = cls(directory, params)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(ckpt._repos_dir, exist_ok=True)
+        ckpt._journal = open(ckpt._journal_path, "a", encoding="utf-8")
+        ckpt._log({"event": "start", "params": params})
+        return ckpt
+
+    @classmethod
+    def resume(cls, directory: str, params: Dict[str, Any]) -> "RefreshCheckpoint":
+        """
+        Reopen an existing checkpoint.
+
+        Raises:
+            ValueError: If there is no checkpoint or it was written with different parameters.
+        """
+        ckpt = cls(directory, params)
+        if not os.path.exists(ckpt._journal_path):
+            raise ValueError(f"Nothing to resume: no checkpoint journal at {ckpt._journal_path}")
+
+        with open(ckpt._journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    break  # torn final line from a crash
+                ckpt._apply(rec)
+
+        if ckpt._journal_params != params:
+            raise ValueError(
+                f"Checkpoint at {directory} was written by a refresh with different options; "
+                "rerun without --resume to start over"
+            )
+
+        for repo, st in ckpt._state.items():
+            path = ckpt._data_path(repo)
+            if os.path.exists(path):
+                with open(path, "r+b") as f:
+                    f.truncate(st.get("bytes", 0))
+
+        ckpt._journal = open(ckpt._journal_path, "a", encoding="utf-8")
+        return ckpt
+
+    def _apply(self, rec: Dict[str, Any]) -> None:
+        event = rec.get("event")
+        if event == "start":
+            self._journal_params = rec.get("params")
+            return
+        st = self._state.setdefault(rec["repo"], {"status": "partial", "next_offset": 0, "bytes": 0, "pages": 0})
+        if event == "page":
+            st.update(next_offset=rec["next_offset"], bytes=rec["bytes"], pages=st["pages"] + 1)
+        elif event in ("done", "unchanged"):
+            st["status"] = event
+
+    def _log(self, rec: Dict[str, Any]) -> None:
+        assert self._journal is not None
+        self._journal.write(json.dumps(rec, separators=(",", ":")) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def _data_path(self, repo: str) -> str:
+        return os.path.join(self._repos_dir, hashlib.sha1(repo.encode("utf-8")).hexdigest() + ".ndjson")
+
+    def status(self, repo: str) -> Optional[str]:
+        """'done', 'unchanged', 'partial' or None if the repo was never started."""
+        st = self._state.get(repo)
+        return st["status"] if st else None
+
+    def next_offset(self, repo: str) -> int:
+        return int(self._state.get(repo, {}).get("next_offset", 0))
+
+    def replay(self, repo: str) -> Iterator[Tuple[int, List[Dict[str, Any]], int]]:
+        """Yield the pages already checkpointed for `repo` as (offset, data, next_offset)."""
+        path = self._data_path(repo)
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                page = json.loads(line)
+                yield int(page["offset"]), page["data"], int(page["next_offset"])
+
+    def append(self, repo: str, offset: int, data: List[Dict[str, Any]], next_offset: int) -> None:
+        """Durably append one fetched page of `repo`."""
+        line = json.dumps({"offset": offset, "next_offset": next_offset, "data": data}, separators=(",", ":"))
+        with open(self._data_path(repo), "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        with self._lock:
+            rec = {"event": "page", "repo": repo, "offset": offset, "next_offset": next_offset, "bytes": size}
+            self._log(rec)
+            self._apply(rec)
+
+    def mark(self, repo: str, event: str) -> None:
+        """Record that `repo` is `done` or `unchanged`."""
+        with self._lock:
+            rec = {"event": event, "repo": repo}
+            self._log(rec)
+            self._apply(rec)
+
+    def close(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def remove(self) -> None:
+        """Close and delete the checkpoint once the refresh has been written."""
+        self.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+# -- querying ------------------------------------------------------------------
+
+_SIZE_UNITS = {
+    "": 1,
+    "b": 1,
+    "k": 1024,
+    "kb": 1024,
+    "kib": 1024,
+    "m": 1024 ** 2,
+    "mb": 1024 ** 2,
+    "mib": 1024 ** 2,
+    "g": 1024 ** 3,
+    "gb": 1024 ** 3,
+    "gib": 1024 ** 3,
+    "t": 1024 ** 4,
+    "tb": 1024 ** 4,
+    "tib": 1024 ** 4,
+}
+_SIZE_RE = re.compile(r"^\s*([0-9]+(?:\.[0-9]+)?)\s*([a-zA-Z]*)\s*$")
+_WHERE_RE = re.compile(r"^\s*([^=!<>]+?)\s*(==|=|!=|>=|<=|>|<)\s*(.*?)\s*$")
+
+
+def parse_size(value: Any) -> Optional[int]:
+    """
+    Bytes in a size like 1048576, "512 KB" or "1.5 MB" (binary units).
+
+    Returns:
+        Size in bytes, or None for an empty value.
+
+    Raises:
+        ValueError: If the value is not a recognizable size.
+    """
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    text = str(value).strip()
+    if not text:
+        return None
+    m = _SIZE_RE.match(text)
+    if m is None or m.group(2).lower() not in _SIZE_UNITS:
+        raise ValueError(f"Invalid size: {value!r} (expected e.g. 1048576, 512KB, 1.5MB)")
+    return int(float(m.group(1)) * _SIZE_UNITS[m.group(2).lower()])
+
+
+def _glob_filter(field: str, pattern: str) -> ds.Expression:
+    """
+    Expression matching `field` against a shell glob (`*` and `?`).
+
+    The literal prefix before the first wildcard becomes a range
+    (`prefix <= field < next(prefix)`), which the parquet reader can check
+    against row-group statistics; the full glob is then applied as a regex.
+    """
+    specials = [i for i in (pattern.find("*"), pattern.find("?")) if i >= 0]
+    if not specials:
+        return pc.field(field) == pattern
+
+    prefix = pattern[: min(specials)]
+    regex = "^" + "".join(".*" if c == "*" else "." if c == "?" else re.escape(c) for c in pattern) + "$"
+    expr = pc.match_substring_regex(pc.field(field), pattern=regex)
+    if prefix:
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        expr = (pc.field(field) >= prefix) & (pc.field(field) < upper) & expr
+    return expr
+
+
+def _coerce(value: str, type_: pa.DataType, column: str) -> Any:
+    try:
+        if pa.types.is_integer(type_):
+            return int(value)
+        if pa.types.is_floating(type_):
+            return float(value)
+        if pa.types.is_boolean(type_):
+            return value.strip().lower() in ("1", "true", "yes", "on")
+        if pa.types.is_timestamp(type_):
+            return pa.scalar(pd.Timestamp(value)).cast(type_)
+    except (ValueError, pa.ArrowInvalid) as e:
+        raise ValueError(f"Invalid value {value!r} for column {column!r} ({type_})") from e
+    return value
+
+
+def open_inventory(path: str, *, repos: Optional[List[str]] = None) -> ds.Dataset:
+    """
+    Open an inventory written by `artifacts refresh` as a pyarrow dataset.
+
+    Both single files and repo-partitioned dataset directories are supported.
+    For a dataset, `repos` limits the files opened to those repos' partitions,
+    so reading one repo touches only its own files.
+
+    Raises:
+        ValueError: If the inventory does not exist or has an unsupported extension.
+    """
+    if not is_dataset(path):
+        _check_out_path(path)
+        if not os.path.exists(path):
+            raise ValueError(f"Inventory not found: {path}")
+        return ds.dataset(path, format="parquet" if path.endswith(".parquet") else "csv")
+
+    repo_schema = pa.schema([pa.field("repo", pa.string())])
+    partitioning = ds.partitioning(repo_schema, flavor="hive")
+    source: Any = path
+    if repos:
+        source = [
+            os.path.join(partition_dir(path, repo), PARTITION_FILE)
+            for repo in repos
+            if os.path.exists(os.path.join(partition_dir(path, repo), PARTITION_FILE))
+        ]
+    dataset = ds.dataset(source, format="parquet", partitioning=partitioning, partition_base_dir=path)
+    # Partitions are written independently and may differ in columns; read them under one schema.
+    schemas = [fragment.physical_schema for fragment in dataset.get_fragments()]
+    schema = pa.unify_schemas(schemas + [repo_schema], promote_options="permissive")
+    return ds.dataset(source, format="parquet", partitioning=partitioning, partition_base_dir=path, schema=schema)
+
+
+def build_inventory_filter(
+    schema: pa.Schema,
+    *,
+    repos: Optional[List[str]] = None,
+    name: Optional[str] = None,
+    path: Optional[str] = None,
+    sha256: Optional[List[str]] = None,
+    min_size: Optional[str] = None,
+    max_size: Optional[str] = None,
+    where: Optional[List[str]] = None,
+) -> Optional[ds.Expression]:
+    """
+    Combine query options into one filter expression (None if no filters).
+
+    Each condition is a plain comparison on a column, so the parquet reader
+    can skip row groups whose statistics rule it out before decoding them.
+
+    Args:
+        schema: Inventory schema; used to validate columns and coerce values.
+        repos: Keep only these repos.
+        name: Glob on the artifact name.
+        path: Glob on the artifact path (`repo_path`, or `path`).
+        sha256: Keep only these checksums.
+        min_size: Lower size bound (inclusive), e.g. "10MB".
+        max_size: Upper size bound (inclusive).
+        where: Generic conditions `COLUMN OP VALUE`, OP one of = != > >= < <=.
+
+    Raises:
+        ValueError: On unknown columns, malformed conditions, or size filters
+            over a size column that is not numeric.
+    """
+    names = set(schema.names)
+
+    def column(col: str, flag: str) -> str:
+        if col not in names:
+            raise ValueError(f"{flag}: inventory has no column {col!r} (available: {', '.join(schema.names)})")
+        return col
+
+    exprs: List[ds.Expression] = []
+    if repos:
+        exprs.append(pc.field(column("repo", "--repo")).isin(repos))
+    if name:
+        exprs.append(_glob_filter(column("name", "--name"), name))
+    if path:
+        exprs.append(_glob_filter("repo_path" if "repo_path" in names else column("path", "--path"), path))
+    if sha256:
+        exprs.append(pc.field(column("sha256", "--sha256")).isin([s.lower() for s in sha256]))
+
+    if min_size is not None or max_size is not None:
+        size_type = schema.field(column("size", "--min-size/--max-size")).type
+        if not (pa.types.is_integer(size_type) or pa.types.is_floating(size_type)):
+            raise ValueError(
+                f"Size filters need a numeric size column, but this inventory stores size as {size_type}"
+            )
+        if min_size is not None:
+            exprs.append(pc.field("size") >= parse_size(min_size))
+        if max_size is not None:
+            exprs.append(pc.field("size") <= parse_size(max_size))
+
+    for cond in where or []:
+        m = _WHERE_RE.match(cond)
+        if m is None:
+            raise ValueError(f"--where: expected COLUMN OP VALUE (OP one of = != > >= < <=), got {cond!r}")
+        col, op, raw = m.groups()
+        column(col, "--where")
+        field, value = pc.field(col), _coerce(raw, schema.field(col).type, col)
+        exprs.append(
+            {
+                "=": field == value,
+                "==": field == value,
+                "!=": field != value,
+                ">": field > value,
+                ">=": field >= value,
+                "<": field < value,
+                "<=": field <= value,
+            }[op]
+        )
+
+    if not exprs:
+        return None
+    combined = exprs[0]
+    for expr in exprs[1:]:
+        combined = combined & expr
+    return combined
+
+
+def scan_inventory(
+    dataset: ds.Dataset,
+    *,
+    filter: Optional[ds.Expression],
+    columns: Optional[List[str]],
+    limit: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield matching inventory rows as dicts, reading only the projected columns.
+
+    Batches are decoded one at a time, so memory is bounded by the batch size
+    rather than the inventory size.
+    """
+    if columns:
+        missing = [c for c in columns if c not in dataset.schema.names]
+        if missing:
+            raise ValueError(f"--columns: unknown column(s) {', '.join(missing)}")
+
+    remaining = limit
+    for batch in dataset.to_batches(columns=columns or None, filter=filter):
+        rows = batch.to_pylist()
+        if remaining is not None:
+            rows = rows[:remaining]
+            remaining -= len(rows)
+        for row in rows:
+            yield {k: _json_value(v) for k, v in row.items()}
+        if remaining == 0:
+            return
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, float) and value != value:
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
@@ -1,16 +1,14 @@
+import os
 import sys
+from collections.abc import Iterator
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, Mapping, Optional, TextIO
 
 from xrayctl.xrayparser import build_parser
-from xrayctl.config import load_settings
-from xrayctl.output import print_out
-from xrayctl.api.client import XrayClient
+from xrayctl.config import Settings, load_settings
+from xrayctl.output import open_output, write_out, write_records
 from xrayctl.errors import XrayHTTPError
-from xrayctl.workflows import system as system_wf
-from xrayctl.workflows import config as config_wf
-from xrayctl.workflows import ignore_rules as ignore_wf
-from xrayctl.workflows import scans as scans_wf
-from xrayctl.workflows import artifacts as artifacts_wf
-
+from xrayctl.commands import get_command
 
 
 def _require(value: str | None, name: str) -> str:
@@ -19,10 +17,132 @@ def _require(value: str | None, name: str) -> str:
     return value
 
 
-def main() -> None:
-    parser = build_parser()
-    args = parser.parse_args()
+def _metrics_collector(args):
+    if not (args.metrics or args.metrics_file):
+        return None
+    from xrayctl.api.metrics import MetricsCollector
+
+    return MetricsCollector()
+
+
+def _with_metrics(out: Any, metrics, fmt: str, stderr: TextIO) -> Any:
+    """
+    `out` with the request metrics attached once the command's requests are done.
+
+    Dict results get a "metrics" key and streamed results one final
+    {"metrics": ...} record. Results with no place for it (CSV rows, plain
+    lists) leave the metrics on stderr instead.
+    """
+    if isinstance(out, dict):
+        return dict(out, metrics=metrics.summary())
+    if isinstance(out, Iterator):
+
+        def records():
+            yield from out
+            if fmt == "csv":
+                write_out({"metrics": metrics.summary()}, stderr)
+            else:
+                yield {"metrics": metrics.summary()}
+
+        return records()
+    write_out({"metrics": metrics.summary()}, stderr)
+    return out
+
+
+def _failure(out: dict, args, metrics) -> dict:
+    # Failed commands keep the metrics of the requests they made
+    return dict(out, metrics=metrics.summary()) if args.metrics else out
+
+
+def _write_metrics_file(metrics, path: Optional[str]) -> None:
+    if metrics is None or not path:
+        return
+    with open_output(path) as f:
+        write_out(metrics.summary(), f)
+
+
+def _profiled(args):
+    if not args.profile:
+        return nullcontext()
+    from xrayctl.profiling import profile
+
+    return profile(args.profile, path=args.profile_file, top=args.profile_top)
+
+
+def client_options(settings: Settings, args) -> Dict[str, Any]:
+    """
+    Validated XrayClient settings for a command.
+
+    Plain values only, so that `xrayctl serve` can use them as the key of
+    its warm clients.
+
+    Raises:
+        ValueError: If url/token are missing or a setting is out of range.
+    """
+    if settings.max_retries < 0:
+        raise ValueError("--max-retries must be >= 0")
+    if settings.pool_size < 1:
+        # Checked here: raising it to the workflow's concurrency below would hide the bad value
+        raise ValueError("--pool-size must be >= 1")
+    return {
+        "base_url": _require(settings.url, "url"),
+        "token": _require(settings.token, "token"),
+        "timeout": settings.timeout,
+        "project": settings.project,
+        # Parallel workflows need at least one pooled connection per worker
+        "pool_size": max(settings.pool_size, getattr(args, "concurrency", 1)),
+        "keep_alive": settings.keep_alive,
+        "cache_dir": settings.cache_dir if settings.cache_ttl > 0 and not args.no_cache else None,
+        "cache_ttl": settings.cache_ttl,
+        "max_retries": settings.max_retries,
+        "rate_limit": settings.rate_limit,
+    }
+
+
+def build_client(options: Dict[str, Any], hooks=()):
+    """XrayClient for `client_options`, with its own connection pool and rate limiter."""
+    # Imported here so commands that never talk to Xray don't pay for `requests`.
+    from xrayctl.api.cache import ResponseCache
+    from xrayctl.api.client import XrayClient
+    from xrayctl.api.ratelimit import AdaptiveRateLimiter
+
+    opts = dict(options)
+    cache_dir, cache_ttl = opts.pop("cache_dir"), opts.pop("cache_ttl")
+    rate_limit = opts.pop("rate_limit")
+    return XrayClient(
+        **opts,
+        cache=ResponseCache(cache_dir, ttl=cache_ttl) if cache_dir else None,
+        # One limiter per client: every worker thread paces against the same budget
+        limiter=AdaptiveRateLimiter(rate_limit),
+        hooks=list(hooks),
+    )
 
+
+def execute(
+    args,
+    *,
+    stdout: Optional[TextIO] = None,
+    stderr: Optional[TextIO] = None,
+    env: Optional[Mapping[str, str]] = None,
+    get_client: Optional[Callable[[Dict[str, Any]], Any]] = None,
+) -> int:
+    """
+    Run one parsed command and write its result (or error) like the CLI does.
+
+    Args:
+        args: Namespace from `build_parser().parse_args()`.
+        stdout: Stream for results and errors (default: sys.stdout).
+        stderr: Stream for diagnostics such as CSV metrics (default: sys.stderr).
+        env: Environment for XRAY_* settings (default: os.environ).
+        get_client: Returns the XrayClient for `client_options` (default: a
+            new client per call). `xrayctl serve` passes one that reuses
+            warm clients. Commands recording metrics always get their own.
+
+    Returns:
+        Exit code: 0 on success, 2 for Xray HTTP errors, 1 for anything else.
+    """
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
     settings = load_settings(
         url=args.url,
         token=args.token,
@@ -30,126 +150,84 @@ def main() -> None:
         timeout=args.timeout,
         fmt=args.format,
         config_path=args.config,
+        pool_size=args.pool_size,
+        keep_alive=args.keep_alive,
+        cache_ttl=args.cache_ttl,
+        cache_dir=args.cache_dir,
+        max_retries=args.max_retries,
+        rate_limit=args.rate_limit,
+        env=env,
     )
 
+    metrics = _metrics_collector(args)
     try:
         if args.command == "hello":
-            print("xrayctl is wired up ✅")
-            return
-        
-        h = getattr(args, "handler", None)
-
-        if h == "config_init":
-            out = config_wf.init_config(args.config)
-            print_out(out, fmt=settings.fmt)
-            return
-
-        if h == "config_view":
-            out = config_wf.view_effective(args)
-            print_out(out, fmt=settings.fmt)
-            return
-
-        if h == "config_set":
-            out = config_wf.set_value(args.config, args.key, args.value)
-            print_out(out, fmt=settings.fmt)
-            return
-
-        if h == "config_save":
-            out = config_wf.save_from_flags(args)
-            print_out(out, fmt=settings.fmt)
-            return
-
-        url = _require(settings.url, "url")
-        token = _require(settings.token, "token")
-
-        client = XrayClient(
-            base_url=url,
-            token=token,
-            timeout=settings.timeout,
-            project=settings.project,
-        )
-
-        if getattr(args, "handler", None) == "ignore_rules_create":
-            out = ignore_wf.create(
-                client,
-                note=args.note,
-                watches=args.watch,
-                cves=args.cve,
-                vulns=args.vuln,
-                licenses=args.license,
-                expires_at=args.expires_at,
-                dry_run = args.dry_run
-            )
-            print_out(out, fmt=settings.fmt)
-            return
-        
-        if getattr(args, "handler", None) == "ignore_rules_list":
-            out = ignore_wf.list_rules(
-                client,
-                watch=args.watch,
-                policy=args.policy,
-                vulnerability=args.vulnerability,
-                cve=args.cve,
-                license_name=args.license,
-                component_name=args.component_name,
-                component_version=args.component_version,
-                page=args.page,
-                rows=args.rows,
-                order_by=args.order_by,
-                direction=args.direction,
-                expires_before=args.expires_before,
-                expires_after=args.expires_after,
-                fetch_all=args.all,
-            )
-            print_out(out, fmt=settings.fmt)
-            return
-
-        if getattr(args, "handler", None) == "ignore_rules_get":
-            out = ignore_wf.get_rule(client, args.id)
-            print_out(out, fmt=settings.fmt)
-            return
-        
-        if getattr(args, "handler", None) == "scan_artifact":
-            out = scans_wf.scan_artifact(
-                client,
-                component_id=args.component_id,
-                wait=args.wait,
-                repo=args.repo,
-                path=args.path,
-                poll_seconds=args.poll_seconds,
-                timeout_seconds=args.timeout_seconds,
-            )
-            print_out(out, fmt=settings.fmt)
-            return
-
-        if getattr(args, "handler", None) == "artifacts_refresh":
-            out = artifacts_wf.refresh_inventory(
-                client,
-                out_path=args.out,
-                page_size=args.page_size,
-                repo_page_size=args.repo_page_size,
-                repo_regex=args.repo_regex,
-                include_repo_metadata=args.include_repo_metadata,
-            )
-            print_out(out, fmt=settings.fmt)
-            return
-
-
-
-        if getattr(args, "handler", None) == "ping":
-            out = system_wf.ping(client)
-            print_out(out, fmt=settings.fmt)
-            return
-
-        raise ValueError(f"Unknown handler: {getattr(args, 'handler', None)}")
+            print("xrayctl is wired up ✅", file=stdout)
+            return 0
+
+        # The profile covers loading the workflow, the requests and rendering the output
+        with _profiled(args):
+            cmd = get_command(getattr(args, "handler", None))
+            workflow = cmd.load()
+            client = None
+            if cmd.wants_client(args):
+                options = client_options(settings, args)
+                if metrics is not None or get_client is None:
+                    client = build_client(options, hooks=[metrics] if metrics is not None else [])
+                else:
+                    client = get_client(options)
+
+            # Commands with row output may pick their own format (e.g. artifacts query --result-format);
+            # workflows that can stream (ndjson) look at the resolved format.
+            fmt = getattr(args, "result_format", None) or settings.fmt
+            args.output_format = fmt
+            with open_output(args.output_file, stdout=stdout) as stream:
+                out = cmd.run(workflow, client, args)
+                if args.metrics:
+                    out = _with_metrics(out, metrics, fmt, stderr)
+                if isinstance(out, Iterator):
+                    # Streaming commands yield records as they complete
+                    write_records(out, stream, fmt=fmt)
+                else:
+                    write_out(out, stream, fmt=fmt)
+        return 0
+
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); stop quietly instead of tracing back on every flush.
+        if stdout is sys.stdout:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
 
     except XrayHTTPError as e:
-        print_out(
-            {"ok": False, "error": str(e), "status_code": e.status_code, "details": e.details},
+        write_out(
+            _failure({"ok": False, "error": str(e), "status_code": e.status_code, "details": e.details}, args, metrics),
+            stdout,
             fmt=settings.fmt,
         )
-        sys.exit(2)
+        return 2
 
     except Exception as e:
-        print_out({"ok": False, "error": str(e)}, fmt=settings.fmt)
-        sys.exit(1)
+        write_out(_failure({"ok": False, "error": str(e)}, args, metrics), stdout, fmt=settings.fmt)
+        return 1
+
+    finally:
+        _write_metrics_file(metrics, args.metrics_file)
+
+
+def main() -> None:
+    parser = build_parser()
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        from xrayctl.daemon import serve_command
+
+        sys.exit(serve_command(args))
+
+    # A running `xrayctl serve` answers forwardable commands with warm imports and connections
+    from xrayctl.daemon import forward
+
+    code = forward(args)
+    if code is None:
+        code = execute(args)
+    if code:
+        sys.exit(code)
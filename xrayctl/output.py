@@ -1,13 +1,128 @@
+import csv
 import json
-from typing import Any, Literal
-import yaml
+import sys
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Iterable, Iterator, Literal, Optional, TextIO
 
-Format = Literal["json", "yaml"]
+Format = Literal["json", "yaml", "ndjson", "csv"]
 
-def render(obj: Any, fmt: Format = "json") -> str:
+
+@lru_cache(maxsize=None)
+def _orjson() -> Any:
+    """The optional orjson module (several times faster than the stdlib encoder), or None."""
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+@lru_cache(maxsize=None)
+def _yaml_dumper() -> Any:
+    import yaml  # deferred: JSON output never needs it
+
+    # libyaml's C emitter when PyYAML was built with it; same output, much faster
+    return getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def _json_bytes(obj: Any, *, indent: bool) -> Optional[bytes]:
+    orjson = _orjson()
+    if orjson is None:
+        return None
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+    try:
+        data = orjson.dumps(obj, option=option)
+    except TypeError:
+        # Types orjson does not handle (e.g. ints beyond 64 bits): use the stdlib encoder.
+        return None
+    # orjson writes non-ASCII text as raw UTF-8; the stdlib encoder escapes it (\uXXXX), so that
+    # output stays byte-for-byte the same whether or not orjson is installed.
+    return data if data.isascii() else None
+
+
+def render_record(obj: Any, fmt: Format = "json") -> str:
+    """Render one record of a streamed result: a compact JSON line or a YAML document."""
+    if fmt == "yaml":
+        import yaml
+
+        return "---\n" + yaml.dump(obj, Dumper=_yaml_dumper(), sort_keys=False).rstrip("\n")
+    data = _json_bytes(obj, indent=False)
+    if data is not None:
+        return data.decode("utf-8")
+    return json.dumps(obj, sort_keys=False, separators=(",", ":"))
+
+
+def _write_bytes(data: bytes, stream: TextIO) -> None:
+    buffer = getattr(stream, "buffer", None)
+    if buffer is None:
+        stream.write(data.decode("utf-8"))
+        return
+    stream.flush()
+    buffer.write(data)
+
+
+def write_out(obj: Any, stream: TextIO, fmt: Format = "json") -> None:
+    """
+    Write a whole result to `stream`.
+
+    Large results are encoded straight into the stream (YAML emitter, stdlib
+    `json.dump`) or as one bytes buffer (orjson) rather than via an
+    intermediate str.
+    """
     if fmt == "yaml":
-        return yaml.safe_dump(obj, sort_keys=False)
-    return json.dumps(obj, indent=2, sort_keys=False)
+        import yaml
+
+        yaml.dump(obj, stream, Dumper=_yaml_dumper(), sort_keys=False)
+        return
+    if fmt == "ndjson":
+        write_record(obj, stream)
+        return
+    data = _json_bytes(obj, indent=True)
+    if data is not None:
+        _write_bytes(data + b"\n", stream)
+    else:
+        json.dump(obj, stream, indent=2, sort_keys=False)
+        stream.write("\n")
+    stream.flush()
+
 
 def print_out(obj: Any, fmt: Format = "json") -> None:
-    print(render(obj, fmt=fmt))
+    write_out(obj, sys.stdout, fmt=fmt)
+
+
+def write_record(obj: Any, stream: TextIO, fmt: Format = "json") -> None:
+    # Flushed per record so consumers (e.g. `| jq`) see results as they finish
+    stream.write(render_record(obj, fmt=fmt) + "\n")
+    stream.flush()
+
+
+def write_records(records: Iterable[Any], stream: TextIO, fmt: Format = "json") -> None:
+    """
+    Write a stream of records as they are produced.
+
+    json/ndjson write one JSON object per line and yaml one document per
+    record; csv writes a header taken from the first record's keys, then one
+    row per record.
+    """
+    if fmt == "csv":
+        writer = None
+        for rec in records:
+            if writer is None:
+                writer = csv.DictWriter(stream, fieldnames=list(rec), extrasaction="ignore")
+                writer.writeheader()
+            writer.writerow(rec)
+        stream.flush()
+        return
+    for rec in records:
+        write_record(rec, stream, fmt="yaml" if fmt == "yaml" else "json")
+
+
+@contextmanager
+def open_output(path: Optional[str], stdout: Optional[TextIO] = None) -> Iterator[TextIO]:
+    """Stream for command output: `path` (created or truncated), or `stdout` (default sys.stdout) when None."""
+    if path is None:
+        yield stdout or sys.stdout
+        return
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        yield f
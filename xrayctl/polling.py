@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from xrayctl.config import DEFAULT_CACHE_DIR
+
+DEFAULT_HISTORY_PATH = DEFAULT_CACHE_DIR / "scan_durations.json"
+HISTORY_VERSION = 1
+# Weight of the newest observation in the per-package-type moving average.
+_EWMA_ALPHA = 0.3
+
+
+def package_type(component_id: str) -> str:
+    """Package type of an Xray component id, e.g. 'docker' for 'docker://alpine:3.20'."""
+    prefix, sep, _ = component_id.partition("://")
+    return prefix.lower() if sep and prefix else "unknown"
+
+
+class PollSchedule:
+    """
+    Delays between status polls of one scan.
+
+    The first poll is scheduled at `first` seconds (typically the expected
+    scan duration learned by ScanDurationHistory), later polls back off
+    exponentially from `interval` by `factor` up to `max_interval`. Every
+    delay gets +/- `jitter` so that scans triggered together do not poll in
+    lockstep. Delays never run past `deadline` (a time.monotonic() value),
+    so the last poll lands on the deadline rather than after it.
+    """
+
+    def __init__(
+        self,
+        *,
+        interval: float,
+        max_interval: float,
+        deadline: float,
+        first: Optional[float] = None,
+        factor: float = 1.6,
+        jitter: float = 0.2,
+    ) -> None:
+        self.interval = interval
+        self.max_interval = max(max_interval, interval)
+        self.deadline = deadline
+        self.factor = factor
+        self.jitter = jitter
+        self._first = first
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.deadline
+
+    def next_delay(self) -> float:
+        if self._first is not None:
+            delay, self._first = self._first, None
+        else:
+            delay = self.interval
+            self.interval = min(self.max_interval, self.interval * self.factor)
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return max(0.0, min(delay, self.deadline - time.monotonic()))
+
+
+class ScanDurationHistory:
+    """
+    Locally learned scan durations, per package type.
+
+    Stored as a small JSON file (default under ~/.cache/xrayctl) holding a
+    moving average of how long completed scans took for each package type.
+    Durations are estimated as the midpoint between the last poll that was
+    still pending and the poll that saw the scan finish, so coarse polling
+    does not inflate them.
+
+    Reads and writes are best-effort: a missing or unreadable file just means
+    no history.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = Path(path).expanduser() if path else DEFAULT_HISTORY_PATH
+        self._data: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+            if raw.get("version") == HISTORY_VERSION and isinstance(raw.get("types"), dict):
+                self._data = raw["types"]
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def expected(self, pkg_type: str) -> Optional[float]:
+        """Expected scan duration in seconds, or None if nothing was learned yet."""
+        entry = self._data.get(pkg_type)
+        return float(entry["seconds"]) if entry else None
+
+    def record(self, pkg_type: str, seconds: float) -> None:
+        entry = self._data.get(pkg_type)
+        if entry is None:
+            entry = {"seconds": seconds, "samples": 0}
+        else:
+            entry["seconds"] = (1 - _EWMA_ALPHA) * float(entry["seconds"]) + _EWMA_ALPHA * seconds
+        entry["samples"] = int(entry["samples"]) + 1
+        self._data[pkg_type] = entry
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": HISTORY_VERSION, "types": self._data}, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError:
+            return
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import cProfile
+import os
+import pstats
+import re
+import sys
+import sysconfig
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+PROFILE_KINDS = ("cpu", "mem")
+DEFAULT_PROFILE_PATHS = {"cpu": "xrayctl-cpu.prof", "mem": "xrayctl-mem.folded"}
+DEFAULT_TOP = 25
+# Frames kept per allocation traceback. tracemalloc's per-allocation cost grows linearly with the
+# depth, so this stops at enough to tell which workflow call allocated.
+_TRACEMALLOC_FRAMES = 8
+# A new allocation snapshot is taken once traced memory exceeds the last one by this factor and
+# step. Snapshots cost time proportional to the live allocations, so they are kept few.
+_SNAPSHOT_GROWTH = 1.25
+_SNAPSHOT_MIN_STEP = 16 * 1024 * 1024
+
+_STDLIB = os.path.normcase(sysconfig.get_paths()["stdlib"]) + os.sep
+_SITE_DIRS = ("site-packages", "dist-packages")
+# C functions as cProfile names them, e.g. "<method 'recv_into' of '_socket.socket' objects>"
+# or "<built-in method _json.scanstring>"
+_BUILTIN_OWNER = re.compile(r"of '([\w.]+)'|<built-in method ([\w.]+)>")
+# Blocking calls that are idle time rather than work: threads waiting on each other, and sleeps
+# (retry backoff, rate limiting, scan polling). Network waits stay under socket/ssl.
+_WAITS = {
+    "_thread.lock": "(wait: threads)",
+    "_thread.RLock": "(wait: threads)",
+    "_queue.SimpleQueue": "(wait: threads)",
+    "time.sleep": "(wait: sleep)",
+}
+
+
+def package_of(filename: str, funcname: str = "") -> str:
+    """
+    Top-level package a profiled function belongs to, e.g. 'pyarrow', 'json', 'socket' or 'xrayctl'.
+
+    Used to group profile time and allocations so the split between network
+    waits, JSON decoding, pandas and parquet writing is visible at a glance.
+    Idle waits (threads blocked on each other, sleeps) get their own
+    "(wait: ...)" groups.
+    """
+    if filename == "~":  # C function: classify by its owning module or type
+        m = _BUILTIN_OWNER.search(funcname)
+        owner = (m.group(1) or m.group(2)) if m else "builtins"
+        if owner in _WAITS:
+            return _WAITS[owner]
+        return owner.split(".")[0].lstrip("_") if "." in owner else "builtins"
+    if filename.startswith("<frozen "):  # e.g. <frozen importlib._bootstrap>
+        return filename[len("<frozen "):].split(".")[0].rstrip(">")
+    path = os.path.normcase(filename)
+    parts = path.split(os.sep)
+    for site in _SITE_DIRS:
+        if site in parts:
+            i = parts.index(site)
+            if i + 1 < len(parts):
+                return _module_name(parts[i + 1])
+    if path.startswith(_STDLIB):
+        return _module_name(path[len(_STDLIB):].split(os.sep)[0])
+    if "xrayctl" in parts:
+        return "xrayctl"
+    return _module_name(os.path.basename(path)) if path else "?"
+
+
+def _module_name(part: str) -> str:
+    name = part[:-3] if part.endswith(".py") else part.split(".")[0]
+    return name.lstrip("_") or part
+
+
+def _share(part: float, whole: float) -> str:
+    return f"{part / whole * 100:5.1f}%" if whole > 0 else "    -"
+
+
+def _mib(size: float) -> str:
+    return f"{size / (1024 * 1024):.1f} MiB"
+
+
+class CpuProfiler:
+    """
+    cProfile over the command, including the worker threads it starts.
+
+    cProfile only sees the thread that enabled it, so every thread started
+    while the profiler runs (refresh and fetch-all pools, scan fan-out)
+    enables its own; their stats are merged into one pstats file. Where the
+    interpreter allows just one active profiler, only the main thread's is kept.
+    Timings are wall clock, so time blocked on the network shows up in socket
+    and ssl reads.
+    """
+
+    def __init__(self) -> None:
+        self._main = cProfile.Profile()
+        self._threads: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._started = 0.0
+        self.seconds = 0.0
+
+    def _thread_hook(self, frame: Any, event: str, arg: Any) -> None:
+        # Runs once as the first profile event of a new thread, then hands over to cProfile.
+        sys.setprofile(None)
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError:
+            return
+        with self._lock:
+            self._threads.append(prof)
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        threading.setprofile(self._thread_hook)
+        self._main.enable()
+
+    def stop(self) -> pstats.Stats:
+        self._main.disable()
+        threading.setprofile(None)
+        self.seconds = time.perf_counter() - self._started
+        stats = pstats.Stats(self._main)
+        with self._lock:
+            for prof in self._threads:
+                prof.disable()
+                stats.add(prof)
+        return stats
+
+    def report(self, stats: pstats.Stats, *, path: str, top: int, stream: TextIO) -> None:
+        """Write the pstats file and print time by package plus the top functions by own time."""
+        stats.dump_stats(path)
+        calls = sum(nc for _, nc, _, _, _ in stats.stats.values())
+        own: Dict[str, float] = {}
+        for (filename, _, funcname), (_, _, tottime, _, _) in stats.stats.items():
+            pkg = package_of(filename, funcname)
+            own[pkg] = own.get(pkg, 0.0) + tottime
+        total = sum(own.values())
+
+        print(
+            f"cpu profile: {self.seconds:.2f}s wall, {calls:,} calls, {len(self._threads) + 1} thread(s); "
+            f"written to {path} (python -m pstats {path})",
+            file=stream,
+        )
+        print("own time by package (all threads):", file=stream)
+        for pkg, seconds in sorted(own.items(), key=lambda kv: -kv[1])[:top]:
+            print(f"  {pkg:<24} {seconds:9.3f}s {_share(seconds, total)}", file=stream)
+        print(f"top {top} functions by own time:", file=stream)
+        stats.stream = stream
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(top)
+
+
+class MemProfiler:
+    """
+    tracemalloc over the command.
+
+    A background thread watches traced memory and snapshots the allocations
+    whenever it reaches a new high (in `_SNAPSHOT_GROWTH` steps), so the
+    report shows what was alive near the peak rather than what is left at
+    the end. Allocations are grouped by package and by source line, and
+    written as collapsed stacks (`frame;frame;... bytes`), the input format
+    of flamegraph.pl and speedscope.
+
+    tracemalloc slows allocation-heavy code down many times over: the
+    profile shows where memory goes, not how long things take.
+    """
+
+    def __init__(self, *, interval: float = 0.2) -> None:
+        self.interval = interval
+        self.peak = 0
+        self.at_snapshot = 0
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    def _take(self) -> None:
+        current = tracemalloc.get_traced_memory()[0]
+        threshold = max(self.at_snapshot * _SNAPSHOT_GROWTH, self.at_snapshot + _SNAPSHOT_MIN_STEP)
+        if self._snapshot is None or current > threshold:
+            self._snapshot = tracemalloc.take_snapshot()
+            self.at_snapshot = current
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._take()
+
+    def start(self) -> None:
+        tracemalloc.start(_TRACEMALLOC_FRAMES)
+        self._watcher = threading.Thread(target=self._watch, name="xrayctl-memprofile", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> tracemalloc.Snapshot:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+        self._take()
+        self.peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert self._snapshot is not None
+        return self._snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+    def report(self, snapshot: tracemalloc.Snapshot, *, path: str, top: int, stream: TextIO) -> None:
+        """Write the collapsed stacks and print allocations by package plus the top source lines."""
+        by_package: Dict[str, int] = {}
+        with open(path, "w", encoding="utf-8") as f:
+            for stat in snapshot.statistics("traceback"):
+                frames = [f"{_short_path(fr.filename)}:{fr.lineno}" for fr in stat.traceback]
+                f.write(f"{';'.join(frames)} {stat.size}\n")
+                pkg = package_of(stat.traceback[-1].filename)
+                by_package[pkg] = by_package.get(pkg, 0) + stat.size
+        total = sum(by_package.values())
+
+        print(
+            f"mem profile: peak {_mib(self.peak)} traced, snapshot at {_mib(self.at_snapshot)}; "
+            f"written to {path} (flamegraph.pl {path})",
+            file=stream,
+        )
+        print("allocated at snapshot by package:", file=stream)
+        for pkg, size in sorted(by_package.items(), key=lambda kv: -kv[1])[:top]:
+            print(f"  {pkg:<24} {_mib(size):>12} {_share(size, total)}", file=stream)
+        print(f"top {top} lines by allocated size:", file=stream)
+        for stat in snapshot.statistics("lineno")[:top]:
+            where = f"{_short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}"
+            print(f"  {_mib(stat.size):>12} {stat.count:>9,} blocks  {where}", file=stream)
+
+
+def _short_path(filename: str) -> str:
+    # site-packages/pandas/io/json/_normalize.py -> pandas/io/json/_normalize.py
+    norm = os.path.normcase(filename)
+    for site in _SITE_DIRS:
+        marker = os.sep + site + os.sep
+        if marker in norm:
+            return filename[norm.index(marker) + len(marker):]
+    if norm.startswith(_STDLIB):
+        return filename[len(_STDLIB):]
+    return filename
+
+
+@contextmanager
+def profile(
+    kind: str,
+    *,
+    path: Optional[str] = None,
+    top: int = DEFAULT_TOP,
+    stream: Optional[TextIO] = None,
+) -> Iterator[None]:
+    """
+    Profile the enclosed block and report on exit, also when it raises.
+
+    Args:
+        kind: 'cpu' (cProfile, written as a pstats file) or 'mem'
+            (tracemalloc, written as collapsed stacks).
+        path: Output file (default: DEFAULT_PROFILE_PATHS[kind] in the working directory).
+        top: Number of packages and functions/lines in the summary.
+        stream: Where the summary goes (default: stderr, so it never mixes with command output).
+
+    Raises:
+        ValueError: If `kind` or `top` is invalid.
+    """
+    if kind not in PROFILE_KINDS:
+        raise ValueError(f"--profile must be one of: {', '.join(PROFILE_KINDS)}")
+    if top < 1:
+        raise ValueError("--profile-top must be >= 1")
+    path = path or DEFAULT_PROFILE_PATHS[kind]
+    prof: Any = CpuProfiler() if kind == "cpu" else MemProfiler()
+    prof.start()
+    try:
+        yield
+    finally:
+        result = prof.stop()
+        prof.report(result, path=path, top=top, stream=stream or sys.stderr)
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from xrayctl.config import DEFAULT_CACHE_DIR
+
+DEFAULT_CATALOG_PATH = DEFAULT_CACHE_DIR / "repos.sqlite"
+# Max age (seconds) of a catalog that commands such as `artifacts refresh` use instead of listing repos again
+DEFAULT_CATALOG_TTL = 3600
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS repos (
+    position INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+"""
+
+
+def _token_id(token: str) -> str:
+    # Same short token hash as the response cache: tells tokens apart without storing them
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+
+
+def repo_entry_name(repo: Dict[str, Any]) -> Optional[str]:
+    """Name of a repos listing entry; most commonly `repo` or `name`, depending on the Xray version."""
+    return repo.get("repo") or repo.get("name") or repo.get("key")
+
+
+class RepoCatalog:
+    """
+    Local SQLite copy of the Xray repository listing.
+
+    `replace` swaps the whole listing in one transaction and records when,
+    from which server and with which token (a hash of it) it was taken, so
+    commands can tell whether the copy is recent enough, and was visible to
+    the same user, to use instead of paging `/repos` again. Entries keep the
+    listing order and their full metadata.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = Path(path).expanduser() if path else DEFAULT_CATALOG_PATH
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+            self._conn = sqlite3.connect(str(self.path))
+            self._conn.executescript(_SCHEMA)
+            version = self._meta().get("schema_version")
+            if version is not None and version != str(SCHEMA_VERSION):
+                raise ValueError(f"Unsupported repo catalog version {version}: {self.path}")
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> "RepoCatalog":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _meta(self) -> Dict[str, str]:
+        return dict(self.conn.execute("SELECT key, value FROM meta").fetchall())
+
+    def info(self) -> Dict[str, Any]:
+        """Sync metadata: synced_at, age_seconds, url and repo count (empty if never synced)."""
+        meta = self._meta()
+        if "synced_at" not in meta:
+            return {}
+        synced = datetime.fromisoformat(meta["synced_at"].replace("Z", "+00:00"))
+        return {
+            "path": str(self.path),
+            "synced_at": meta["synced_at"],
+            "age_seconds": int((datetime.now(timezone.utc) - synced).total_seconds()),
+            "url": meta.get("url"),
+            "repos": int(meta.get("repos", 0)),
+        }
+
+    def is_fresh(self, *, url: str, token: str, ttl: float) -> bool:
+        """Whether the catalog was synced from `url` with `token` less than `ttl` seconds ago."""
+        info = self.info()
+        return (
+            bool(info)
+            and info["url"] == url
+            and self._meta().get("token_id") == _token_id(token)
+            and info["age_seconds"] < ttl
+        )
+
+    def replace(self, repos: List[Dict[str, Any]], *, url: str, token: str) -> Dict[str, Any]:
+        """Replace the catalog with a full repos listing and record the sync time."""
+        synced_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        rows = []
+        for repo in repos:
+            name = repo_entry_name(repo) if isinstance(repo, dict) else None
+            if name:
+                rows.append((len(rows), name, json.dumps(repo, separators=(",", ":"))))
+
+        conn = self.conn
+        with conn:
+            conn.execute("DELETE FROM repos")
+            conn.executemany("INSERT INTO repos VALUES (?, ?, ?)", rows)
+            meta = {
+                "schema_version": str(SCHEMA_VERSION),
+                "synced_at": synced_at,
+                "url": url,
+                "token_id": _token_id(token),
+                "repos": str(len(rows)),
+            }
+            conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", meta.items())
+        return self.info()
+
+    def repos(self, pattern: Optional["re.Pattern[str]"] = None) -> List[Dict[str, Any]]:
+        """Catalog entries in listing order, optionally only those whose name matches `pattern` (re.search)."""
+        rows = self.conn.execute("SELECT name, body FROM repos ORDER BY position")
+        return [json.loads(body) for name, body in rows if pattern is None or pattern.search(name)]
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from xrayctl.config import DEFAULT_CACHE_DIR
+
+DEFAULT_INDEX_PATH = DEFAULT_CACHE_DIR / "ignore_rules.sqlite"
+SCHEMA_VERSION = 1
+
+# ignore_filters key -> filter kind stored in rule_filters
+_LIST_FILTERS = {
+    "cves": "cve",
+    "vulnerabilities": "vulnerability",
+    "watches": "watch",
+    "policies": "policy",
+    "licenses": "license",
+}
+# --order-by values accepted locally -> column
+_ORDER_COLUMNS = {"id": "id", "created": "created", "expires_at": "expires_at", "author": "author"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS rules (
+    id TEXT PRIMARY KEY,
+    notes TEXT,
+    author TEXT,
+    created TEXT,
+    expires_at TEXT,
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rule_filters (
+    rule_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL COLLATE NOCASE,
+    version TEXT
+);
+CREATE INDEX IF NOT EXISTS rule_filters_lookup ON rule_filters (kind, value, version);
+CREATE INDEX IF NOT EXISTS rule_filters_rule ON rule_filters (rule_id);
+CREATE INDEX IF NOT EXISTS rules_expires_at ON rules (expires_at);
+"""
+
+
+def normalize_timestamp(value: Optional[str]) -> Optional[str]:
+    """
+    Canonical UTC form (YYYY-MM-DDTHH:MM:SSZ) of an ISO8601 timestamp.
+
+    Stored and queried expiry times go through this so they compare correctly
+    as strings. Unparseable values are returned unchanged.
+    """
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return value
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _rule_filters(rule: Dict[str, Any]) -> Iterator[Tuple[str, str, Optional[str]]]:
+    filters = rule.get("ignore_filters") or {}
+    if not isinstance(filters, dict):
+        return
+    for key, kind in _LIST_FILTERS.items():
+        for value in filters.get(key) or []:
+            if isinstance(value, str) and value:
+                yield kind, value, None
+    # Components appear as {"name", "version"} objects (or bare names on some versions)
+    for comp in (filters.get("components") or []) + (filters.get("component") or []):
+        if isinstance(comp, dict) and comp.get("name"):
+            yield "component", str(comp["name"]), (str(comp["version"]) if comp.get("version") else None)
+        elif isinstance(comp, str) and comp:
+            yield "component", comp, None
+
+
+class RulesIndex:
+    """
+    Local SQLite mirror of ignore rules.
+
+    `replace` swaps the whole rule set in one transaction, so a query never
+    sees a half-synced index. Every rule's cves, vulnerabilities, watches,
+    policies, licenses and components go into an indexed `rule_filters`
+    table, which `query` matches against with the same filters as the
+    server-side list.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = Path(path).expanduser() if path else DEFAULT_INDEX_PATH
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+            self._conn = sqlite3.connect(str(self.path))
+            self._conn.executescript(_SCHEMA)
+            version = self._meta().get("schema_version")
+            if version is not None and version != str(SCHEMA_VERSION):
+                raise ValueError(f"Unsupported ignore rules index version {version}: {self.path}")
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> "RulesIndex":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _meta(self) -> Dict[str, str]:
+        return dict(self.conn.execute("SELECT key, value FROM meta").fetchall())
+
+    def info(self) -> Dict[str, Any]:
+        """Sync metadata: synced_at, url, project and rule count (empty if never synced)."""
+        meta = self._meta()
+        if "synced_at" not in meta:
+            return {}
+        out: Dict[str, Any] = {
+            "path": str(self.path),
+            "synced_at": meta["synced_at"],
+            "url": meta.get("url"),
+            "project": meta.get("project") or None,
+            "rules": int(meta.get("rules", 0)),
+        }
+        synced = datetime.fromisoformat(meta["synced_at"].replace("Z", "+00:00"))
+        out["age_seconds"] = int((datetime.now(timezone.utc) - synced).total_seconds())
+        return out
+
+    def replace(self, rules: List[Dict[str, Any]], *, url: str, project: Optional[str]) -> Dict[str, Any]:
+        """Replace the indexed rule set and record the sync time."""
+        synced_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        rows = []
+        filter_rows = []
+        for rule in rules:
+            if not isinstance(rule, dict) or rule.get("id") is None:
+                continue
+            rule_id = str(rule["id"])
+            rows.append(
+                (
+                    rule_id,
+                    rule.get("notes"),
+                    rule.get("author"),
+                    rule.get("created"),
+                    normalize_timestamp(rule.get("expires_at")),
+                    json.dumps(rule, separators=(",", ":")),
+                )
+            )
+            filter_rows.extend((rule_id, kind, value, version) for kind, value, version in _rule_filters(rule))
+
+        conn = self.conn
+        with conn:
+            conn.execute("DELETE FROM rules")
+            conn.execute("DELETE FROM rule_filters")
+            conn.executemany("INSERT OR REPLACE INTO rules VALUES (?, ?, ?, ?, ?, ?)", rows)
+            conn.executemany("INSERT INTO rule_filters VALUES (?, ?, ?, ?)", filter_rows)
+            meta = {
+                "schema_version": str(SCHEMA_VERSION),
+                "synced_at": synced_at,
+                "url": url,
+                "project": project or "",
+                "rules": str(len(rows)),
+            }
+            conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", meta.items())
+        return self.info()
+
+    def query(
+        self,
+        *,
+        watch: Optional[str] = None,
+        policy: Optional[str] = None,
+        vulnerability: Optional[str] = None,
+        cve: Optional[str] = None,
+        license_name: Optional[str] = None,
+        component_name: Optional[str] = None,
+        component_version: Optional[str] = None,
+        expires_before: Optional[str] = None,
+        expires_after: Optional[str] = None,
+        order_by: Optional[str] = None,
+        direction: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Rules matching all given filters.
+
+        Returns:
+            `(rules of the requested page, total number of matches)`.
+
+        Raises:
+            ValueError: If `order_by` is not a locally sortable field.
+        """
+        where: List[str] = []
+        args: List[Any] = []
+
+        for kind, value in (
+            ("watch", watch),
+            ("policy", policy),
+            ("vulnerability", vulnerability),
+            ("cve", cve),
+            ("license", license_name),
+        ):
+            if value:
+                where.append("id IN (SELECT rule_id FROM rule_filters WHERE kind = ? AND value = ?)")
+                args.extend([kind, value])
+        if component_name or component_version:
+            cond = ["kind = 'component'"]
+            if component_name:
+                cond.append("value = ?")
+                args.append(component_name)
+            if component_version:
+                cond.append("version = ?")
+                args.append(component_version)
+            where.append(f"id IN (SELECT rule_id FROM rule_filters WHERE {' AND '.join(cond)})")
+        if expires_before:
+            where.append("expires_at < ?")
+            args.append(normalize_timestamp(expires_before))
+        if expires_after:
+            where.append("expires_at > ?")
+            args.append(normalize_timestamp(expires_after))
+
+        if order_by and order_by not in _ORDER_COLUMNS:
+            raise ValueError(f"--order-by with --local must be one of: {', '.join(sorted(_ORDER_COLUMNS))}")
+        order = f"{_ORDER_COLUMNS[order_by or 'id']} {'DESC' if direction == 'desc' else 'ASC'}, id"
+
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+        total = self.conn.execute(f"SELECT COUNT(*) FROM rules{clause}", args).fetchone()[0]
+        sql = f"SELECT body FROM rules{clause} ORDER BY {order}"
+        page_args = list(args)
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            page_args.extend([-1 if limit is None else limit, offset])
+        rules = [json.loads(body) for (body,) in self.conn.execute(sql, page_args)]
+        return rules, total
@@ -1,49 +1,316 @@
 from __future__ import annotations
 
+import os
+import queue
 import re
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+from collections import deque
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
 
-from xrayctl.api.client import XrayClient
-from xrayctl.api import repos as repos_api
+from xrayctl.errors import XrayHTTPError
 from xrayctl.api import artifacts as artifacts_api
+from xrayctl.inventory import (
+    UNKNOWN_COLUMN_POLICIES,
+    RecordHasher,
+    RefreshCheckpoint,
+    build_inventory_filter,
+    checkpoint_dir,
+    hash_records,
+    load_manifest,
+    manifest_path,
+    normalize_inventory,
+    open_inventory,
+    open_writer,
+    read_snapshot_by_repo,
+    scan_inventory,
+    write_manifest,
+)
+from xrayctl.repo_catalog import DEFAULT_CATALOG_TTL, repo_entry_name
+from xrayctl.workflows.repos import load_repos
 
+if TYPE_CHECKING:
+    from xrayctl.api.client import XrayClient
 
-def _iter_all_repos(client: XrayClient, *, page_size: int) -> List[Dict[str, Any]]:
-    offset = 0
-    repos: List[Dict[str, Any]] = []
 
+# Pages buffered per in-flight repo when fetching concurrently.
+_PAGES_PER_REPO_BUFFER = 2
+_END = object()
+# First item of a repo's page stream when incremental probing found it unchanged.
+_UNCHANGED = object()
+
+# (offset requested, records, next offset or -1)
+Page = Tuple[int, List[Dict[str, Any]], int]
+PagesFn = Callable[[str, Dict[str, Any]], Iterator[Any]]
+
+
+def _fetch_artifact_page(client: XrayClient, *, repo: str, offset: int, page_size: int) -> Page:
+    # Records are decoded as they arrive, so the raw page body is never held in memory.
+    page = artifacts_api.stream_artifacts(client, repo=repo, offset=offset, num_of_rows=page_size)
+    data = list(page)
+    return offset, data, int(page.meta.get("offset", -1))
+
+
+def _iter_artifact_pages(client: XrayClient, *, repo: str, page_size: int, offset: int = 0) -> Iterator[Page]:
     while True:
-        resp = repos_api.list_repos(client, offset=offset, num_of_rows=page_size)
-        data = resp.get("data") or resp.get("repos") or []  # some envs differ in key name
-        repos.extend(data)
+        page = _fetch_artifact_page(client, repo=repo, offset=offset, page_size=page_size)
+        yield page
 
-        next_offset = resp.get("offset", -1)
+        next_offset = page[2]
         if next_offset == -1:
             break
-        offset = int(next_offset)
+        offset = next_offset
+
 
-    return repos
+def _iter_changed_pages(
+    client: XrayClient,
+    *,
+    repo: str,
+    page_size: int,
+    previous: Optional[Dict[str, Any]],
+) -> Iterator[Any]:
+    """
+    Probe a repo against its manifest entry and yield its pages only if it changed.
 
+    An unchanged repo costs one request (single-page repos) or two (head and
+    tail page). The probe compares the head page hash, the tail page hash at
+    the last-seen offset and whether paging still ends there. If anything
+    differs, the already-fetched head page is reused and paging continues.
+    Otherwise the stream yields `_UNCHANGED` and stops.
+    """
+    head = _fetch_artifact_page(client, repo=repo, offset=0, page_size=page_size)
 
-def _iter_all_artifacts_for_repo(client: XrayClient, *, repo: str, page_size: int) -> List[Dict[str, Any]]:
-    offset = 0
-    rows: List[Dict[str, Any]] = []
+    if previous is not None and hash_records(head[1]) == previous.get("head_hash"):
+        last_offset = int(previous.get("last_offset", 0))
+        if last_offset == 0:
+            if head[2] == -1:
+                yield _UNCHANGED
+                return
+        elif head[2] != -1:
+            tail = _fetch_artifact_page(client, repo=repo, offset=last_offset, page_size=page_size)
+            if tail[2] == -1 and hash_records(tail[1]) == previous.get("tail_hash"):
+                yield _UNCHANGED
+                return
+
+    yield head
+    if head[2] != -1:
+        yield from _iter_artifact_pages(client, repo=repo, page_size=page_size, offset=head[2])
+
+
+def _iter_checkpointed_pages(
+    client: XrayClient,
+    ckpt: RefreshCheckpoint,
+    *,
+    repo: str,
+    page_size: int,
+    fresh: Iterator[Any],
+) -> Iterator[Any]:
+    """
+    Tee a repo's page stream into the checkpoint, or continue it from there.
+
+    Repos already `done` (or `unchanged`) in the checkpoint are replayed
+    without any request. Partially fetched repos replay their checkpointed
+    pages and resume paging from the last journaled offset. Others run
+    `fresh` and checkpoint each page as it arrives.
+    """
+    status = ckpt.status(repo)
+    if status == "unchanged":
+        yield _UNCHANGED
+        return
+
+    remaining: Iterator[Any] = fresh
+    if status is not None:
+        yield from ckpt.replay(repo)
+        if status == "done":
+            return
+        next_offset = ckpt.next_offset(repo)
+        remaining = iter(()) if next_offset == -1 else _iter_artifact_pages(
+            client, repo=repo, page_size=page_size, offset=next_offset
+        )
+
+    for item in remaining:
+        if item is _UNCHANGED:
+            ckpt.mark(repo, "unchanged")
+            yield item
+            return
+        ckpt.append(repo, *item)
+        yield item
+    ckpt.mark(repo, "done")
 
+
+def _put(q: queue.Queue, item: Any, cancel: threading.Event) -> bool:
+    while not cancel.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _pump_pages(pages: Iterator[Any], *, q: queue.Queue, cancel: threading.Event) -> None:
+    # Runs on a worker thread: forwards pages, then either _END or the exception that stopped the repo.
+    try:
+        for page in pages:
+            if not _put(q, page, cancel):
+                return
+        _put(q, _END, cancel)
+    except Exception as e:
+        _put(q, e, cancel)
+
+
+def _drain(q: queue.Queue) -> Iterator[Any]:
     while True:
-        resp = artifacts_api.list_artifacts(client, repo=repo, offset=offset, num_of_rows=page_size)
-        data = resp.get("data", [])
-        rows.extend(data)
+        item = q.get()
+        if item is _END:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
 
-        next_offset = resp.get("offset", -1)
-        if next_offset == -1:
-            break
-        offset = int(next_offset)
 
+def _iter_repo_pages(
+    repo_entries: List[Tuple[str, Dict[str, Any]]],
+    *,
+    pages_fn: PagesFn,
+    concurrency: int,
+) -> Iterator[Tuple[str, Dict[str, Any], Iterator[Any]]]:
+    """
+    Yield `(repo_name, repo_meta, pages)` in `repo_entries` order.
+
+    `pages` is `pages_fn(repo_name, repo_meta)`: it iterates the repo's
+    artifact pages and raises if the repo fails.
+    With concurrency > 1, repos are fetched on a bounded thread pool: at most
+    `2 * concurrency` repos are in flight, each buffering only a couple of
+    pages, so results are deterministic and memory stays bounded. Callers must
+    exhaust `pages` before advancing to the next repo.
+    """
+    if concurrency == 1:
+        for repo_name, repo_meta in repo_entries:
+            yield repo_name, repo_meta, pages_fn(repo_name, repo_meta)
+        return
+
+    entries = iter(repo_entries)
+    cancel = threading.Event()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="xrayctl-repo") as pool:
+        pending: deque = deque()
+
+        def submit_next() -> None:
+            entry = next(entries, None)
+            if entry is not None:
+                repo_name, repo_meta = entry
+                q: queue.Queue = queue.Queue(maxsize=_PAGES_PER_REPO_BUFFER)
+                pool.submit(_pump_pages, pages_fn(repo_name, repo_meta), q=q, cancel=cancel)
+                pending.append((repo_name, repo_meta, q))
+
+        try:
+            for _ in range(2 * concurrency):
+                submit_next()
+
+            while pending:
+                repo_name, repo_meta, q = pending.popleft()
+                yield repo_name, repo_meta, _drain(q)
+                submit_next()
+        finally:
+            # Unblock workers still waiting to hand over pages (early exit, Ctrl-C).
+            cancel.set()
+
+
+def _repo_rows(
+    artifacts: List[Dict[str, Any]],
+    *,
+    repo_name: str,
+    repo_meta: Dict[str, Any],
+    include_repo_metadata: bool,
+) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for a in artifacts:
+        row = dict(a)
+        row["repo"] = repo_name  # <-- the key requirement
+        if include_repo_metadata:
+            # Prefix repo metadata to avoid collisions
+            for k, v in repo_meta.items():
+                if k in ("repo", "name", "key"):
+                    continue
+                row[f"repo_{k}"] = v
+        rows.append(row)
     return rows
 
 
+class _RepoDigest:
+    """Accumulates the manifest entry of a repo while its pages are written."""
+
+    def __init__(self, meta_hash: str) -> None:
+        self.meta_hash = meta_hash
+        self.pages = 0
+        self.rows = 0
+        self.last_offset = 0
+        self.head_hash: Optional[str] = None
+        self.tail_hash: Optional[str] = None
+        self._content = RecordHasher()
+
+    def add(self, offset: int, records: List[Dict[str, Any]]) -> None:
+        page_hash = hash_records(records)
+        if self.pages == 0:
+            self.head_hash = page_hash
+        self.tail_hash = page_hash
+        self.last_offset = offset
+        self.pages += 1
+        self.rows += len(records)
+        self._content.update(records)
+
+    def entry(self, refreshed_at: str) -> Dict[str, Any]:
+        return {
+            "row_count": self.rows,
+            "pages": self.pages,
+            "last_offset": self.last_offset,
+            "head_hash": self.head_hash,
+            "tail_hash": self.tail_hash,
+            "content_hash": self._content.hexdigest(),
+            "meta_hash": self.meta_hash,
+            "refreshed_at": refreshed_at,
+        }
+
+
+def _reusable_entry(
+    manifest: Optional[Dict[str, Any]],
+    snapshot: Dict[str, pd.DataFrame],
+    *,
+    repo: str,
+    meta_hash: str,
+    max_age_hours: Optional[float],
+    now: datetime,
+) -> Optional[Dict[str, Any]]:
+    # A manifest entry is only worth probing if the repo listing entry is unchanged,
+    # it is recent enough and its rows are actually present in the previous snapshot.
+    if manifest is None:
+        return None
+    entry = (manifest.get("repos") or {}).get(repo)
+    if not entry or entry.get("meta_hash") != meta_hash:
+        return None
+    if entry.get("row_count") and repo not in snapshot:
+        return None
+    if max_age_hours is not None:
+        try:
+            refreshed_at = datetime.fromisoformat(entry["refreshed_at"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if now - refreshed_at > timedelta(hours=max_age_hours):
+            return None
+    return entry
+
+
+def _failure(repo: str, e: Exception) -> Dict[str, Any]:
+    failure: Dict[str, Any] = {"repo": repo, "error": str(e)}
+    if isinstance(e, XrayHTTPError):
+        failure["status_code"] = e.status_code
+    return failure
+
+
 def refresh_inventory(
     client: XrayClient,
     *,
@@ -52,23 +319,59 @@ def refresh_inventory(
     repo_page_size: int,
     repo_regex: Optional[str],
     include_repo_metadata: bool,
+    concurrency: int = 1,
+    stream: bool = False,
+    incremental: bool = False,
+    manifest: Optional[str] = None,
+    max_age_hours: Optional[float] = None,
+    checkpoint: bool = False,
+    checkpoint_path: Optional[str] = None,
+    resume: bool = False,
+    partition_by: Optional[str] = None,
+    unknown_columns: str = "keep",
+    catalog_path: Optional[str] = None,
+    catalog_ttl: float = DEFAULT_CATALOG_TTL,
 ) -> Dict[str, Any]:
     """
     Refresh the local artifact inventory cache across all repositories.
 
     This function:
-    - Fetches all repositories
+    - Lists all repositories (from the local repo catalog if it is younger
+      than `catalog_ttl`)
     - Fetches all artifacts per repository
     - Normalizes artifacts into a flat table
-    - Persists the result to disk
+    - Persists the result to disk, plus a per-repo manifest next to it
 
     Args:
         client: Initialized XrayClient.
-        out_path: Output file path (.parquet or .csv).
+        out_path: Output file path (.parquet or .csv), or dataset directory
+            with `partition_by`.
         page_size: Artifacts page size.
         repo_page_size: Repository page size.
         repo_regex: Optional regex to filter repositories.
         include_repo_metadata: Whether to include repo metadata columns.
+        concurrency: Number of repositories fetched in parallel.
+        stream: Normalize and flush each page as it arrives (bounded memory)
+            instead of building the whole table before writing.
+        incremental: Reuse rows from the previous `out_path` for repos whose
+            manifest entry still matches, and refetch only the others.
+        manifest: Manifest path (default: `<out_path>.manifest.json`).
+        max_age_hours: In incremental mode, always refetch repos last
+            refreshed longer ago than this.
+        checkpoint: Journal every fetched page to a checkpoint directory so
+            an interrupted refresh can be resumed.
+        checkpoint_path: Checkpoint directory (default: `<out_path>.checkpoint`).
+        resume: Continue the refresh recorded in the checkpoint directory:
+            finished repos are replayed from disk and partially fetched repos
+            continue from their last offset. Implies `checkpoint`.
+        partition_by: Write a hive-style dataset directory partitioned by
+            this column ("repo") instead of a single file. Only the
+            partitions of refetched repos are rewritten.
+        unknown_columns: What to do with columns outside the inventory
+            schema: "keep" them as strings or "drop" them.
+        catalog_path: Repo catalog file (default under ~/.cache/xrayctl).
+        catalog_ttl: Max age in seconds of a repo catalog used instead of
+            listing repos from Xray; 0 always lists them.
 
     Returns:
         Summary of refresh operation including counts and output path.
@@ -77,52 +380,341 @@ def refresh_inventory(
         raise ValueError("--page-size must be >= 1")
     if repo_page_size < 1:
         raise ValueError("--repo-page-size must be >= 1")
+    if concurrency < 1:
+        raise ValueError("--concurrency must be >= 1")
+    if max_age_hours is not None and max_age_hours <= 0:
+        raise ValueError("--max-age-hours must be > 0")
+    if unknown_columns not in UNKNOWN_COLUMN_POLICIES:
+        raise ValueError(f"--unknown-columns must be one of: {', '.join(UNKNOWN_COLUMN_POLICIES)}")
+    if catalog_ttl < 0:
+        raise ValueError("--catalog-ttl must be >= 0")
 
     repo_pat = re.compile(repo_regex) if repo_regex else None
+    if partition_by:
+        out_path = out_path.rstrip("/") or out_path
+    writer = open_writer(out_path, stream=stream, partition_by=partition_by)
+    manifest_file = manifest or manifest_path(out_path)
+    now = datetime.now(timezone.utc)
+
+    # Incremental mode needs a compatible previous manifest and snapshot; otherwise fall back to a full refresh.
+    previous: Optional[Dict[str, Any]] = None
+    snapshot: Dict[str, pd.DataFrame] = {}
+    fallback_reason: Optional[str] = None
+    if incremental:
+        previous = load_manifest(manifest_file)
+        if previous is None:
+            fallback_reason = f"no usable manifest at {manifest_file}"
+        elif not os.path.exists(out_path):
+            fallback_reason = f"previous output {out_path} not found"
+        elif (
+            previous.get("page_size") != page_size
+            or previous.get("include_repo_metadata") != include_repo_metadata
+            or previous.get("unknown_columns") != unknown_columns
+        ):
+            fallback_reason = (
+                "--page-size, --include-repo-metadata or --unknown-columns changed since the previous refresh"
+            )
+        if fallback_reason:
+            previous = None
+        else:
+            snapshot = read_snapshot_by_repo(out_path)
+
+    ckpt: Optional[RefreshCheckpoint] = None
+    if checkpoint or resume:
+        ckpt_dir = checkpoint_path or checkpoint_dir(out_path)
+        ckpt_params = {
+            "out": out_path,
+            "page_size": page_size,
+            "include_repo_metadata": include_repo_metadata,
+            "unknown_columns": unknown_columns,
+            "repo_regex": repo_regex,
+            "incremental": previous is not None,
+        }
+        if resume:
+            ckpt = RefreshCheckpoint.resume(ckpt_dir, ckpt_params)
+        else:
+            ckpt = RefreshCheckpoint.start(ckpt_dir, ckpt_params)
+
+    try:
+        summary = _refresh_repos(
+            client,
+            out_path=out_path,
+            writer=writer,
+            ckpt=ckpt,
+            page_size=page_size,
+            repo_page_size=repo_page_size,
+            repo_pat=repo_pat,
+            include_repo_metadata=include_repo_metadata,
+            unknown_columns=unknown_columns,
+            concurrency=concurrency,
+            stream=stream,
+            previous=previous,
+            snapshot=snapshot,
+            manifest_file=manifest_file,
+            max_age_hours=max_age_hours,
+            now=now,
+            catalog_path=catalog_path,
+            catalog_ttl=catalog_ttl,
+        )
+    finally:
+        if ckpt is not None:
+            ckpt.close()
 
-    repos = _iter_all_repos(client, page_size=repo_page_size)
+    if incremental:
+        summary["incremental"] = previous is not None
+        if fallback_reason:
+            summary["incremental_fallback"] = fallback_reason
+    if resume:
+        summary["resumed"] = True
+    if ckpt is not None:
+        if summary["failures"]:
+            # Keep the checkpoint so `--resume` only has to retry the failed repos.
+            summary["checkpoint"] = ckpt.directory
+        else:
+            ckpt.remove()
+    return summary
+
+
+def _refresh_repos(
+    client: XrayClient,
+    *,
+    out_path: str,
+    writer: Any,
+    ckpt: Optional[RefreshCheckpoint],
+    page_size: int,
+    repo_page_size: int,
+    repo_pat: Optional["re.Pattern[str]"],
+    include_repo_metadata: bool,
+    unknown_columns: str,
+    concurrency: int,
+    stream: bool,
+    previous: Optional[Dict[str, Any]],
+    snapshot: Dict[str, pd.DataFrame],
+    manifest_file: str,
+    max_age_hours: Optional[float],
+    now: datetime,
+    catalog_path: Optional[str],
+    catalog_ttl: float,
+) -> Dict[str, Any]:
+    refreshed_at = now.isoformat(timespec="seconds")
+    repos, repos_source = load_repos(client, page_size=repo_page_size, catalog_path=catalog_path, ttl=catalog_ttl)
 
     # Normalize repo list to names + optional metadata
     repo_entries: List[Tuple[str, Dict[str, Any]]] = []
     for r in repos:
-        # handle different shapes; most commonly the repo name field is `repo` or `name`
-        name = r.get("repo") or r.get("name") or r.get("key")
+        name = repo_entry_name(r)
         if not name:
             continue
         if repo_pat and not repo_pat.search(name):
             continue
         repo_entries.append((name, r))
 
-    all_rows: List[Dict[str, Any]] = []
-
-    for repo_name, repo_meta in repo_entries:
-        artifacts = _iter_all_artifacts_for_repo(client, repo=repo_name, page_size=page_size)
-        for a in artifacts:
-            row = dict(a)
-            row["repo"] = repo_name  # <-- the key requirement
-            if include_repo_metadata:
-                # Prefix repo metadata to avoid collisions
-                for k, v in repo_meta.items():
-                    if k in ("repo", "name", "key"):
+    meta_hashes = {name: hash_records([meta]) for name, meta in repo_entries}
+    reusable = {
+        name: _reusable_entry(
+            previous,
+            snapshot,
+            repo=name,
+            meta_hash=meta_hashes[name],
+            max_age_hours=max_age_hours,
+            now=now,
+        )
+        for name, _ in repo_entries
+    }
+
+    def pages_fn(repo_name: str, repo_meta: Dict[str, Any]) -> Iterator[Any]:
+        if previous is None:
+            pages = _iter_artifact_pages(client, repo=repo_name, page_size=page_size)
+        else:
+            pages = _iter_changed_pages(client, repo=repo_name, page_size=page_size, previous=reusable[repo_name])
+        if ckpt is None:
+            return pages
+        return _iter_checkpointed_pages(client, ckpt, repo=repo_name, page_size=page_size, fresh=pages)
+
+    failures: List[Dict[str, Any]] = []
+    manifest_repos: Dict[str, Any] = {}
+    unknown_dropped: List[str] = []
+
+    def normalize(rows: List[Dict[str, Any]]) -> pd.DataFrame:
+        df, dropped = normalize_inventory(rows, unknown_columns=unknown_columns)
+        unknown_dropped.extend(c for c in dropped if c not in unknown_dropped)
+        return df
+    reused = 0
+    resumed = sum(1 for name, _ in repo_entries if ckpt is not None and ckpt.status(name) is not None)
+
+    # closing() stops in-flight workers promptly if the loop is interrupted (errors, Ctrl-C)
+    with writer, closing(_iter_repo_pages(repo_entries, pages_fn=pages_fn, concurrency=concurrency)) as results:
+        for repo_name, repo_meta, pages in results:
+            digest = _RepoDigest(meta_hashes[repo_name])
+            written = 0
+            unchanged = False
+            buffered: List[Dict[str, Any]] = []
+            try:
+                for item in pages:
+                    if item is _UNCHANGED:
+                        unchanged = True
                         continue
-                    row[f"repo_{k}"] = v
-            all_rows.append(row)
+                    offset, data, _ = item
+                    digest.add(offset, data)
+                    rows = _repo_rows(
+                        data,
+                        repo_name=repo_name,
+                        repo_meta=repo_meta,
+                        include_repo_metadata=include_repo_metadata,
+                    )
+                    if stream:
+                        writer.write(normalize(rows))
+                        written += len(rows)
+                    else:
+                        buffered.extend(rows)
+            except (XrayHTTPError, OSError, ValueError) as e:
+                # A failing repo is reported on its own instead of aborting the whole refresh.
+                # OSError covers connection/timeout errors raised by the HTTP layer, ValueError
+                # truncated or malformed pages reported by the streaming decoder.
+                failure = _failure(repo_name, e)
+                if stream:
+                    failure["rows_written"] = written
+                prev_entry = (previous or {}).get("repos", {}).get(repo_name)
+                if written == 0 and prev_entry and (repo_name in snapshot or not prev_entry.get("row_count")):
+                    # Keep serving the previous rows rather than dropping the repo from the snapshot.
+                    writer.reuse(repo_name, snapshot)
+                    manifest_repos[repo_name] = prev_entry
+                    failure["kept_previous"] = True
+                failures.append(failure)
+                continue
 
-    df = pd.json_normalize(all_rows)
+            if unchanged:
+                writer.reuse(repo_name, snapshot)
+                manifest_repos[repo_name] = reusable[repo_name]
+                reused += 1
+                continue
 
-    # Persist
-    if out_path.endswith(".parquet"):
-        df.to_parquet(out_path, index=False)
-    elif out_path.endswith(".csv"):
-        df.to_csv(out_path, index=False)
-    else:
-        raise ValueError("--out must end with .parquet or .csv")
+            if buffered:
+                writer.write(normalize(buffered))
+            manifest_repos[repo_name] = digest.entry(refreshed_at)
 
-    return {
-        "ok": True,
+        # Partitioned output: drop repos that vanished or came back empty, but never a failed one.
+        writer.prune(
+            keep={f["repo"] for f in failures},
+            scope=lambda repo: repo_pat is None or bool(repo_pat.search(repo)),
+        )
+        # Partitions outside --repo-regex stay in the dataset, and so do their manifest entries.
+        partitions = getattr(writer, "partitions", None)
+        if partitions and repo_pat is not None:
+            old = load_manifest(manifest_file) or {}
+            if all(
+                old.get(k) == v
+                for k, v in (
+                    ("page_size", page_size),
+                    ("include_repo_metadata", include_repo_metadata),
+                    ("unknown_columns", unknown_columns),
+                )
+            ):
+                for repo, entry in (old.get("repos") or {}).items():
+                    if repo in partitions and not repo_pat.search(repo):
+                        manifest_repos.setdefault(repo, entry)
+
+    write_manifest(
+        manifest_file,
+        {
+            "out": out_path,
+            "refreshed_at": refreshed_at,
+            "page_size": page_size,
+            "include_repo_metadata": include_repo_metadata,
+            "unknown_columns": unknown_columns,
+            "repos": manifest_repos,
+        },
+    )
+
+    summary: Dict[str, Any] = {
+        "ok": not failures,
         "repos_total": len(repos),
         "repos_included": len(repo_entries),
-        "artifacts_total": int(df.shape[0]),
+        "repos_failed": len(failures),
+        "repos_source": repos_source["source"],
+        # Age of the catalog listing (0 when just listed from Xray), so a stale catalog shows in the output
+        "repos_source_age_seconds": repos_source.get("age_seconds", 0),
+        "failures": failures,
+        "artifacts_total": writer.rows,
         "out": out_path,
-        "columns": list(df.columns),
+        "manifest": manifest_file,
+        "columns": writer.columns,
+    }
+    if previous is not None:
+        summary["repos_reused"] = reused
+        summary["repos_fetched"] = len(repo_entries) - reused - len(failures)
+    if resumed:
+        summary["repos_resumed"] = resumed
+    if writer.columns_dropped:
+        summary["columns_dropped"] = writer.columns_dropped
+    if unknown_dropped:
+        summary["unknown_columns_dropped"] = unknown_dropped
+    if getattr(writer, "pruned", None):
+        summary["partitions_removed"] = writer.pruned
+    return summary
+
+
+def query_inventory(
+    *,
+    inventory_path: str,
+    repos: Optional[List[str]] = None,
+    name: Optional[str] = None,
+    path: Optional[str] = None,
+    sha256: Optional[List[str]] = None,
+    min_size: Optional[str] = None,
+    max_size: Optional[str] = None,
+    where: Optional[List[str]] = None,
+    columns: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    result_format: Optional[str] = None,
+) -> Any:
+    """
+    Query an inventory file written by `refresh_inventory`.
+
+    Filters are pushed down to the reader: for parquet, row groups whose
+    column statistics cannot match are skipped and only the selected columns
+    are decoded. No client is needed.
+
+    Args:
+        inventory_path: Inventory file (.parquet or .csv).
+        repos: Keep only these repos.
+        name: Glob on the artifact name.
+        path: Glob on the artifact path.
+        sha256: Keep only these checksums.
+        min_size: Lower size bound, e.g. "10MB".
+        max_size: Upper size bound.
+        where: Generic `COLUMN OP VALUE` conditions.
+        columns: Columns to return (default: all).
+        limit: Max rows returned.
+        result_format: json/yaml return one document; ndjson/csv stream rows.
+
+    Returns:
+        For ndjson/csv, an iterator of rows printed as they are read;
+        otherwise a dict with the matching rows.
+    """
+    if limit is not None and limit < 1:
+        raise ValueError("--limit must be >= 1")
+
+    dataset = open_inventory(inventory_path, repos=repos)
+    expr = build_inventory_filter(
+        dataset.schema,
+        repos=repos,
+        name=name,
+        path=path,
+        sha256=sha256,
+        min_size=min_size,
+        max_size=max_size,
+        where=where,
+    )
+    rows = scan_inventory(dataset, filter=expr, columns=columns, limit=limit)
+    if result_format in ("ndjson", "csv"):
+        return rows
+
+    data = list(rows)
+    return {
+        "ok": True,
+        "inventory": inventory_path,
+        "rows": len(data),
+        "columns": columns or dataset.schema.names,
+        "data": data,
     }
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import argparse
+import json
+import queue
+import shlex
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from xrayctl.api.client import XrayClient
+from xrayctl.commands import get_command
+from xrayctl.errors import XrayHTTPError
+
+# Commands a batch spec may run. All of them are single requests (or a bounded
+# fan-out) against Xray, so they fit the batch's shared client.
+BATCH_HANDLERS = ("ping", "ignore_rules_get", "ignore_rules_list", "ignore_rules_create", "scan_artifact")
+ORDERS = ("input", "completion")
+# Specs read ahead of the oldest unfinished one, per worker. Bounds memory on
+# endless input while keeping workers busy behind a slow spec in input order.
+_READ_AHEAD_PER_WORKER = 4
+
+
+class _SpecError(ValueError):
+    """A spec line that cannot be run; reported as that spec's result."""
+
+
+def _raise_on_error(parser: argparse.ArgumentParser) -> None:
+    # argparse prints usage to stderr and exits on a bad command line; in a batch that is one
+    # spec's error, so every (sub)parser raises instead.
+    def error(message: str) -> None:
+        raise _SpecError(f"{parser.prog}: {message}")
+
+    parser.error = error  # type: ignore[method-assign,assignment]
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            for sub in action.choices.values():
+                _raise_on_error(sub)
+
+
+class _SpecParser:
+    """Parses spec command lines with the CLI's own parser."""
+
+    def __init__(self) -> None:
+        from xrayctl.xrayparser import build_parser
+
+        self._parser = build_parser()
+        _raise_on_error(self._parser)
+
+    def parse(self, argv: List[str]) -> Any:
+        """
+        Parse one spec's argv.
+
+        Raises:
+            _SpecError: If it is not a valid command line for a batch command.
+        """
+        if not argv or argv[0].startswith("-"):
+            # Connection settings, output and metrics belong to the batch as a whole
+            raise _SpecError("Global options are not allowed in a spec; pass them to 'xrayctl batch'")
+        if "-h" in argv or "--help" in argv:
+            raise _SpecError("--help is not available in a spec")
+        args = self._parser.parse_args(argv)
+        if getattr(args, "handler", None) not in BATCH_HANDLERS:
+            raise _SpecError(
+                f"'{' '.join(argv[:2])}' cannot run in a batch; supported: ping, ignore-rules get/list/create, "
+                "scan artifact"
+            )
+        # List results come back whole, as one result per spec
+        args.output_format = "json"
+        return args
+
+
+def _load_spec(line: str) -> Tuple[Any, List[str]]:
+    """
+    (id or None, argv) of one spec line.
+
+    Raises:
+        _SpecError: If the line is not JSON or not in one of the spec shapes.
+    """
+    try:
+        spec = json.loads(line)
+    except ValueError as e:
+        raise _SpecError(f"Invalid JSON: {e}") from e
+    spec_id = None
+    if isinstance(spec, dict):
+        spec_id = spec.get("id")
+        spec = spec.get("argv")
+    if isinstance(spec, str):
+        return spec_id, shlex.split(spec)
+    if isinstance(spec, list) and all(isinstance(a, str) for a in spec):
+        return spec_id, spec
+    raise _SpecError('A spec is an argv list or string, or an object with "argv" (and optional "id")')
+
+
+def _run_spec(client: XrayClient, args: Any) -> Tuple[int, Any]:
+    # Same results and exit codes as running the command on its own
+    try:
+        cmd = get_command(args.handler)
+        return 0, cmd.run(cmd.load(), client, args)
+    except XrayHTTPError as e:
+        return 2, {"ok": False, "error": str(e), "status_code": e.status_code, "details": e.details}
+    except Exception as e:
+        return 1, {"ok": False, "error": str(e)}
+
+
+def run_batch(
+    client: XrayClient,
+    *,
+    from_file: Optional[str],
+    concurrency: int,
+    order: str = "input",
+    stream: Optional[TextIO] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Run many commands in this process on one shared client.
+
+    Reads one spec per line (NDJSON): an argv list such as
+    `["ignore-rules", "get", "--id", "abc"]`, the same as a string, or an
+    object `{"id": ..., "argv": [...]}` whose id is echoed back. Blank lines
+    are skipped. Specs take no global options: they all use the batch's
+    connection settings, client (pooled connections, rate limiter, response
+    cache) and output.
+
+    Specs run on `concurrency` threads while the input is still being read,
+    so results stream back for endless input too. A spec that fails (bad
+    line, unsupported command, HTTP error) only fails its own result.
+
+    Args:
+        client: Initialized XrayClient shared by every spec.
+        from_file: NDJSON file of specs, or None / '-' for `stream`.
+        concurrency: Max specs running at once.
+        order: 'input' yields results in spec order, 'completion' as soon
+            as each finishes.
+        stream: Spec input when no file is given (default: stdin).
+
+    Returns:
+        Iterator of one record per spec (`"type": "command"`, with index,
+        id, argv, exit_code and result), then a summary (`"type": "summary"`).
+
+    Raises:
+        ValueError: If concurrency/order is invalid or the file is missing.
+    """
+    if concurrency < 1:
+        raise ValueError("--concurrency must be >= 1")
+    if order not in ORDERS:
+        raise ValueError(f"--order must be one of: {', '.join(ORDERS)}")
+    if from_file and from_file != "-":
+        try:
+            source: TextIO = open(from_file, "r", encoding="utf-8")
+        except OSError as e:
+            raise ValueError(f"Cannot read batch file {from_file}: {e.strerror}") from e
+        return _run(client, source=source, close=True, concurrency=concurrency, order=order)
+    return _run(client, source=stream or sys.stdin, close=False, concurrency=concurrency, order=order)
+
+
+def _run(
+    client: XrayClient,
+    *,
+    source: TextIO,
+    close: bool,
+    concurrency: int,
+    order: str,
+) -> Iterator[Dict[str, Any]]:
+    parser = _SpecParser()
+    # Finished records in completion order, then one "end" item with the number of specs read
+    done: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+    slots = threading.Semaphore(concurrency * _READ_AHEAD_PER_WORKER)
+    stopped = threading.Event()
+
+    def finish(record: Dict[str, Any], fut: Future) -> None:
+        if fut.cancelled():  # the consumer stopped early
+            return
+        record["exit_code"], record["result"] = fut.result()
+        done.put(record)
+
+    def read(pool: ThreadPoolExecutor) -> None:
+        # Reads and submits specs on its own thread, so finished results are yielded
+        # while the next input line is still on its way
+        end: Dict[str, Any] = {"type": "end", "count": 0}
+        try:
+            for line in source:
+                if not line.strip():
+                    continue
+                slots.acquire()
+                if stopped.is_set():
+                    return
+                end["count"] += 1
+                record: Dict[str, Any] = {"type": "command", "index": end["count"]}
+                try:
+                    spec_id, argv = _load_spec(line)
+                    if spec_id is not None:
+                        record["id"] = spec_id
+                    record["argv"] = argv
+                    args = parser.parse(argv)
+                except _SpecError as e:
+                    done.put(dict(record, exit_code=1, result={"ok": False, "error": str(e)}))
+                    continue
+                pool.submit(_run_spec, client, args).add_done_callback(lambda f, rec=record: finish(rec, f))
+        except Exception as e:
+            end["error"] = f"Reading batch input failed: {e}"
+        finally:
+            if close:
+                source.close()
+            done.put(end)
+
+    counts = {"total": 0, "succeeded": 0, "failed": 0}
+    error: Optional[str] = None
+    read_total: Optional[int] = None
+    # Records finished ahead of an earlier spec (input order only), by index
+    pending: Dict[int, Dict[str, Any]] = {}
+    next_index = 1
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="xrayctl-batch")
+    threading.Thread(target=read, args=(pool,), name="xrayctl-batch-reader", daemon=True).start()
+    try:
+        while read_total is None or counts["total"] < read_total:
+            record = done.get()
+            if record["type"] == "end":
+                read_total, error = record["count"], record.get("error")
+                continue
+            if order == "completion":
+                ready = [record]
+            else:
+                pending[record["index"]] = record
+                ready = []
+                while next_index in pending:
+                    ready.append(pending.pop(next_index))
+                    next_index += 1
+            for out in ready:
+                counts["total"] += 1
+                counts["succeeded" if out["exit_code"] == 0 else "failed"] += 1
+                slots.release()
+                yield out
+    finally:
+        stopped.set()
+        slots.release()  # wakes the reader if it waits for a slot, so it sees `stopped`
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    summary: Dict[str, Any] = {"ok": counts["failed"] == 0 and error is None, "type": "summary", **counts}
+    if error is not None:
+        summary["error"] = error
+    yield summary
@@ -2,9 +2,9 @@ from __future__ import annotations
 
 from typing import Any, Dict, Optional
 
-from xrayctl.config import default_config, load_settings, update_config, write_config
+from xrayctl.config import parse_bool, default_config, load_settings, update_config, write_config
 
-_ALLOWED_KEYS = {"url", "token", "project", "timeout", "format"}
+_ALLOWED_KEYS = {"url", "token", "project", "timeout", "format", "pool_size", "keep_alive", "cache_ttl", "cache_dir", "max_retries", "rate_limit"}
 
 
 def init_config(config_path: Optional[str]) -> Dict[str, Any]:
@@ -18,8 +18,12 @@ def set_value(config_path: Optional[str], key: str, value: str) -> Dict[str, Any
         raise ValueError(f"Unsupported key: {key}")
 
     # basic coercion
-    if key == "timeout":
+    if key in ("timeout", "pool_size", "cache_ttl", "max_retries"):
         value = int(value)
+    if key == "rate_limit":
+        value = float(value)
+    if key == "keep_alive":
+        value = parse_bool(value)
 
     path = update_config({key: value}, config_path=config_path)
     return {"ok": True, "path": str(path), "updated": {key: value}}
@@ -38,9 +42,24 @@ def save_from_flags(args) -> Dict[str, Any]:
         patch["timeout"] = args.timeout
     if args.format is not None:
         patch["format"] = args.format
+    if args.pool_size is not None:
+        patch["pool_size"] = args.pool_size
+    if args.keep_alive is not None:
+        patch["keep_alive"] = args.keep_alive
+    if args.cache_ttl is not None:
+        patch["cache_ttl"] = args.cache_ttl
+    if args.cache_dir is not None:
+        patch["cache_dir"] = args.cache_dir
+    if args.max_retries is not None:
+        patch["max_retries"] = args.max_retries
+    if args.rate_limit is not None:
+        patch["rate_limit"] = args.rate_limit
 
     if not patch:
-        raise ValueError("No flags provided to save. Provide --url/--token/--project/--timeout/--format.")
+        raise ValueError(
+            "No flags provided to save. Provide --url/--token/--project/--timeout/--format/--pool-size/"
+            "--no-keep-alive/--cache-ttl/--cache-dir/--max-retries/--rate-limit."
+        )
 
     path = update_config(patch, config_path=args.config)
     # don’t echo token back
@@ -58,6 +77,12 @@ def view_effective(args) -> Dict[str, Any]:
         timeout=args.timeout,
         fmt=args.format,
         config_path=args.config,
+        pool_size=args.pool_size,
+        keep_alive=args.keep_alive,
+        cache_ttl=args.cache_ttl,
+        cache_dir=args.cache_dir,
+        max_retries=args.max_retries,
+        rate_limit=args.rate_limit,
     )
     # Don’t print token by default
     return {
@@ -67,5 +92,11 @@ def view_effective(args) -> Dict[str, Any]:
             "project": s.project,
             "timeout": s.timeout,
             "format": s.fmt,
+            "pool_size": s.pool_size,
+            "keep_alive": s.keep_alive,
+            "cache_ttl": s.cache_ttl,
+            "cache_dir": s.cache_dir,
+            "max_retries": s.max_retries,
+            "rate_limit": s.rate_limit,
         },
     }
@@ -1,8 +1,14 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Optional
+import csv
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from xrayctl.api.client import XrayClient
 from xrayctl.api import ignore_rules as ignore_api
+from xrayctl.rules_index import RulesIndex, normalize_timestamp
 
 
 def build_payload(
@@ -165,26 +171,39 @@ def list_rules(
     expires_before: Optional[str],
     expires_after: Optional[str],
     fetch_all: bool,
-) -> Dict[str, Any]:
+    concurrency: int = 4,
+    local: bool = False,
+    index_path: Optional[str] = None,
+    stream: bool = False,
+) -> Union[Dict[str, Any], Iterator[Any]]:
     """
-    Create an ignore rule via Xray.
+    List ignore rules, optionally fetching every page.
 
     Args:
         client: Initialized XrayClient.
-        note: Reason for ignore rule.
-        watches: Watch names.
-        cves: CVE identifiers.
-        vulns: Vulnerability identifiers.
-        licenses: License names.
-        expires_at: Optional expiration timestamp.
+        watch, policy, vulnerability, cve, license_name, component_name,
+        component_version, expires_before, expires_after: Optional filters.
+        page: Page number (first page with `fetch_all`).
+        rows: Rules per page.
+        order_by: Optional sort field.
+        direction: Optional sort direction.
+        fetch_all: Fetch all pages from `page` on.
+        concurrency: Pages fetched in parallel with `fetch_all`.
+        local: Query the index written by `sync_rules` instead of Xray.
+        index_path: Local index file (default under ~/.cache/xrayctl).
+        stream: Yield the rules one at a time, as their pages arrive, instead
+            of returning one document (ndjson output).
 
     Returns:
-        Structured result containing request and response.
+        Structured result containing request params and response, or an
+        iterator of rules with `stream`.
     """
     if page < 1:
         raise ValueError("--page must be >= 1")
     if rows < 1:
         raise ValueError("--rows must be >= 1")
+    if concurrency < 1:
+        raise ValueError("--concurrency must be >= 1")
 
     params = _build_list_params(
         watch=watch,
@@ -202,45 +221,397 @@ def list_rules(
         expires_after=expires_after,
     )
 
+    if local:
+        result = _list_local(params, index_path=index_path, fetch_all=fetch_all)
+        return iter(result["response"]["data"]) if stream else result
+
+    if stream:
+        if not fetch_all:
+            return iter(_page_data(ignore_api.get_ignore_rules(client, params=params)))
+        pages = _iter_pages(client, params=params, concurrency=concurrency, meta={})
+        return _unique_by_id(rule for page in pages for rule in page)
+
     if not fetch_all:
         resp = ignore_api.get_ignore_rules(client, params=params)
         return {"ok": True, "params": params, "response": resp}
 
-    # Auto-paginate: keep requesting pages until we collected total_count
-    all_data: List[Any] = []
-    current_page = page
-    total_count = None
+    all_data, total_count = _fetch_all_pages(client, params=params, concurrency=concurrency)
+    return {
+        "ok": True,
+        "params": params,
+        "response": {"data": all_data, "total_count": total_count if total_count is not None else len(all_data)},
+    }
 
-    while True:
-        params["page_num"] = current_page
-        resp = ignore_api.get_ignore_rules(client, params=params)
 
-        data = resp.get("data", []) if isinstance(resp, dict) else []
-        all_data.extend(data)
+# Multi-value CSV cells (watches, cves, ...) are separated by this.
+_CSV_LIST_SEP = ";"
+# Columns/keys of an apply file -> build_payload argument
+_APPLY_LIST_FIELDS = {
+    "watches": "watches",
+    "cves": "cves",
+    "vulns": "vulns",
+    "vulnerabilities": "vulns",
+    "licenses": "licenses",
+}
 
-        if isinstance(resp, dict):
-            total_count = resp.get("total_count", total_count)
 
-        if total_count is None:
-            # No total_count -> stop when the page is empty
-            if not data:
-                break
-        else:
-            if len(all_data) >= int(total_count):
-                break
+def canonical_rule_hash(rule: Dict[str, Any]) -> str:
+    """
+    Hash identifying an ignore rule by its notes, ignore_filters and expires_at.
+
+    Filter lists are compared as sets and empty filters are dropped, so a rule
+    read back from Xray hashes the same as the payload that created it.
+    """
+    filters = rule.get("ignore_filters") or {}
+    canonical_filters: Dict[str, Any] = {}
+    for key, value in filters.items():
+        if value in (None, "", [], {}):
+            continue
+        if isinstance(value, list):
+            value = sorted((json.dumps(v, sort_keys=True) for v in value))
+        canonical_filters[key] = value
+    canonical = {
+        "notes": (rule.get("notes") or "").strip(),
+        "ignore_filters": canonical_filters,
+        "expires_at": normalize_timestamp(rule.get("expires_at")),
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode("utf-8")).hexdigest()
 
-        if not data:
-            break
 
-        current_page += 1
+def _split_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v.strip() for v in str(value).split(_CSV_LIST_SEP) if v.strip()]
+
+
+def read_rule_specs(path: str) -> List[Dict[str, Any]]:
+    """
+    Read ignore rule specs from a YAML or CSV file.
+
+    YAML: a list of mappings (or a mapping with a `rules` list) with keys
+    note, watches, cves, vulns, licenses, expires_at. CSV: a header with the
+    same columns; multi-value cells are separated by ';'.
+
+    Returns:
+        Raw rule specs in file order.
+
+    Raises:
+        ValueError: If the file is missing or not in one of the supported shapes.
+    """
+    p = Path(path).expanduser()
+    if not p.is_file():
+        raise ValueError(f"Rules file not found: {path}")
+
+    if p.suffix.lower() == ".csv":
+        with p.open("r", encoding="utf-8", newline="") as f:
+            return [dict(row) for row in csv.DictReader(f)]
+
+    if p.suffix.lower() not in (".yaml", ".yml"):
+        raise ValueError("Rules file must be .yaml, .yml or .csv")
+
+    import yaml
+
+    with p.open("r", encoding="utf-8") as f:
+        doc = yaml.safe_load(f) or []
+    if isinstance(doc, dict):
+        doc = doc.get("rules", [])
+    if not isinstance(doc, list) or not all(isinstance(r, dict) for r in doc):
+        raise ValueError(f"{path}: expected a list of rules (or a mapping with a 'rules' list)")
+    return doc
+
+
+def _spec_payload(spec: Dict[str, Any]) -> Dict[str, Any]:
+    lists: Dict[str, List[str]] = {"watches": [], "cves": [], "vulns": [], "licenses": []}
+    for key, arg in _APPLY_LIST_FIELDS.items():
+        lists[arg].extend(_split_list(spec.get(key)))
+    return build_payload(
+        note=str(spec.get("note") or spec.get("notes") or ""),
+        expires_at=str(spec.get("expires_at") or "").strip() or None,
+        **lists,
+    )
+
+
+def apply_rules(
+    client: XrayClient,
+    *,
+    rules_file: str,
+    concurrency: int,
+    dry_run: bool,
+) -> Dict[str, Any]:
+    """
+    Create every ignore rule in a file that does not exist yet.
+
+    All specs are validated through `build_payload` before anything is sent.
+    Existing rules are fetched with one bulk listing and matched by
+    `canonical_rule_hash`; rules already present (or repeated in the file)
+    are skipped and the rest are created on `concurrency` threads.
+
+    Args:
+        client: Initialized XrayClient.
+        rules_file: YAML or CSV file of rule specs.
+        concurrency: Max create requests in flight.
+        dry_run: Report what would be created without creating anything.
+
+    Returns:
+        Per-rule results (in file order) and a summary of counts.
 
+    Raises:
+        ValueError: If any spec is invalid, or if the listing of existing
+            rules came back incomplete (nothing is created in either case).
+    """
+    if concurrency < 1:
+        raise ValueError("--concurrency must be >= 1")
+
+    specs = read_rule_specs(rules_file)
+    payloads: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    for i, spec in enumerate(specs, start=1):
+        try:
+            payloads.append(_spec_payload(spec))
+        except ValueError as e:
+            errors.append(f"rule {i}: {e}")
+    if errors:
+        shown = "; ".join(errors[:10])
+        more = f" (and {len(errors) - 10} more)" if len(errors) > 10 else ""
+        raise ValueError(f"{len(errors)} invalid rule(s) in {rules_file}: {shown}{more}")
+
+    existing, total_count = _fetch_all_pages(
+        client, params={"page_num": 1, "num_of_rows": 500}, concurrency=concurrency
+    )
+    # Rules missing from the listing would be created a second time
+    _require_complete(existing, total_count, action="no rules were created")
+    existing_ids: Dict[str, Any] = {}
+    for rule in existing:
+        if isinstance(rule, dict):
+            existing_ids.setdefault(canonical_rule_hash(rule), rule.get("id"))
+
+    results: List[Dict[str, Any]] = []
+    to_create: List[int] = []
+    seen: Dict[str, int] = {}
+    for i, payload in enumerate(payloads):
+        digest = canonical_rule_hash(payload)
+        result: Dict[str, Any] = {"index": i + 1, "hash": digest, "request": payload}
+        if digest in existing_ids:
+            result.update(status="exists", id=existing_ids[digest])
+        elif digest in seen:
+            result.update(status="duplicate", duplicate_of=seen[digest])
+        else:
+            seen[digest] = i + 1
+            result["status"] = "would_create" if dry_run else "pending"
+            to_create.append(i)
+        results.append(result)
+
+    def create_one(i: int) -> Dict[str, Any]:
+        try:
+            return {"status": "created", "response": ignore_api.create_ignore_rule(client, payloads[i])}
+        except Exception as e:
+            return {"status": "failed", "error": str(e), "status_code": getattr(e, "status_code", None)}
+
+    if to_create and not dry_run:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(to_create)), thread_name_prefix="xrayctl-apply") as pool:
+            for i, outcome in zip(to_create, pool.map(create_one, to_create)):
+                results[i].update(outcome)
+
+    summary: Dict[str, int] = {}
+    for r in results:
+        summary[r["status"]] = summary.get(r["status"], 0) + 1
     return {
-        "ok": True,
-        "params": params,
-        "response": {"data": all_data, "total_count": total_count if total_count is not None else len(all_data)},
+        "ok": "failed" not in summary,
+        "dry_run": dry_run,
+        "summary": {"total": len(results), **summary},
+        "results": results,
     }
 
 
+def _list_local(params: Dict[str, Any], *, index_path: Optional[str], fetch_all: bool) -> Dict[str, Any]:
+    index = RulesIndex(index_path)
+    if not index.path.exists():
+        raise ValueError(f"No local ignore rules index at {index.path}; run `xrayctl ignore-rules sync` first")
+
+    rows = int(params["num_of_rows"])
+    with index:
+        info = index.info()
+        if not info:
+            raise ValueError(f"Local ignore rules index was never synced: {index.path}")
+        data, total = index.query(
+            watch=params.get("watch"),
+            policy=params.get("policy"),
+            vulnerability=params.get("vulnerability"),
+            cve=params.get("cve"),
+            license_name=params.get("license"),
+            component_name=params.get("component_name"),
+            component_version=params.get("component_version"),
+            expires_before=params.get("expires_before"),
+            expires_after=params.get("expires_after"),
+            order_by=params.get("order_by"),
+            direction=params.get("direction"),
+            limit=None if fetch_all else rows,
+            offset=(int(params["page_num"]) - 1) * rows,
+        )
+    return {"ok": True, "params": params, "response": {"data": data, "total_count": total}, "local": info}
+
+
+def sync_rules(
+    client: XrayClient,
+    *,
+    index_path: Optional[str],
+    rows: int,
+    concurrency: int,
+) -> Dict[str, Any]:
+    """
+    Mirror every ignore rule into the local SQLite index.
+
+    Args:
+        client: Initialized XrayClient.
+        index_path: Local index file (default under ~/.cache/xrayctl).
+        rows: Rules per page while fetching.
+        concurrency: Pages fetched in parallel.
+
+    Returns:
+        Sync summary including the index path, rule count and sync time.
+
+    Raises:
+        ValueError: If fewer rules were fetched than Xray reported (the
+            index is left as it was).
+    """
+    if rows < 1:
+        raise ValueError("--rows must be >= 1")
+    if concurrency < 1:
+        raise ValueError("--concurrency must be >= 1")
+
+    rules, total_count = _fetch_all_pages(client, params={"page_num": 1, "num_of_rows": rows}, concurrency=concurrency)
+    _require_complete(rules, total_count, action="the local index was left unchanged")
+    with RulesIndex(index_path) as index:
+        info = index.replace(rules, url=client.base_url, project=client.project)
+    return {"ok": True, **info}
+
+
+def _page_data(resp: Any) -> List[Any]:
+    return resp.get("data", []) if isinstance(resp, dict) else []
+
+
+def _unique_by_id(rules: Iterable[Any]) -> Iterator[Any]:
+    # Rules created/deleted while paging shift page boundaries, so neighbouring
+    # pages can overlap; keep the first occurrence of each id.
+    seen = set()
+    for rule in rules:
+        rule_id = rule.get("id") if isinstance(rule, dict) else None
+        if rule_id is not None:
+            if rule_id in seen:
+                continue
+            seen.add(rule_id)
+        yield rule
+
+
+def _dedupe_by_id(rules: List[Any]) -> List[Any]:
+    return list(_unique_by_id(rules))
+
+
+# Upper bound on pages fetched one by one after the expected last page, so a server that keeps
+# answering with full pages (e.g. clamping page_num to its last page) cannot make paging endless.
+_MAX_EXTRA_PAGES = 1000
+
+
+def _iter_pages(
+    client: XrayClient, *, params: Dict[str, Any], concurrency: int, meta: Dict[str, Any]
+) -> Iterator[List[Any]]:
+    """
+    Yield every page from `params["page_num"]` on, in page order, as it arrives.
+
+    The first response reports `total_count`, which fixes the number of
+    pages; the remaining ones are then fetched on `concurrency` threads and
+    yielded in page order as soon as each is available. A server may cap
+    `num_of_rows`: a first page shorter than requested that is not the last
+    one gives the page size actually used. Paging continues one page at a
+    time past the last page only while fewer than `total_count` rules have
+    arrived (e.g. rules were deleted meanwhile and shifted into a later
+    page), or, without `total_count`, until an empty or short page.
+    `meta["total_count"]` holds the count reported by the server (or None).
+
+    Raises:
+        ValueError: If paging does not end within `_MAX_EXTRA_PAGES` pages past the expected last page.
+    """
+    first_page = int(params["page_num"])
+    rows = int(params["num_of_rows"])
+
+    def fetch(page_num: int) -> List[Any]:
+        return _page_data(ignore_api.get_ignore_rules(client, params=dict(params, page_num=page_num)))
+
+    first = ignore_api.get_ignore_rules(client, params=params)
+    page = _page_data(first)
+    total_count = first.get("total_count") if isinstance(first, dict) else None
+    meta["total_count"] = total_count
+    yield page
+    if not page:
+        return
+    fetched = 1
+    collected = len(page)
+
+    page_size = rows
+    if len(page) < rows and (total_count is None or (first_page - 1) * rows + len(page) < int(total_count)):
+        page_size = len(page)  # capped by the server rather than the last page
+
+    # Rules expected from `first_page` on
+    expected: Optional[int] = None
+    if total_count is not None:
+        expected = int(total_count) - (first_page - 1) * page_size
+        last_page = -(-int(total_count) // page_size)  # ceil
+        remaining = list(range(first_page + 1, last_page + 1))
+        if concurrency == 1 or len(remaining) <= 1:
+            for n in remaining:
+                page = fetch(n)
+                fetched += 1
+                collected += len(page)
+                yield page
+        else:
+            pool = ThreadPoolExecutor(max_workers=min(concurrency, len(remaining)), thread_name_prefix="xrayctl-rules")
+            try:
+                # map() yields in submission order, so pages come back in order
+                for page in pool.map(fetch, remaining):
+                    fetched += 1
+                    collected += len(page)
+                    yield page
+            finally:
+                # A consumer that stops early (e.g. `| head`) should not wait for the remaining pages.
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    extra = 0
+    while len(page) == page_size and (expected is None or collected < expected):
+        if extra == _MAX_EXTRA_PAGES:
+            raise ValueError(
+                f"Ignore rules paging did not end after {fetched} pages (server keeps returning full pages?)"
+            )
+        page = fetch(first_page + fetched)
+        fetched += 1
+        extra += 1
+        collected += len(page)
+        yield page
+
+
+def _fetch_all_pages(
+    client: XrayClient, *, params: Dict[str, Any], concurrency: int
+) -> Tuple[List[Any], Optional[int]]:
+    """Every rule from `params["page_num"]` on (see `_iter_pages`), plus the server's total_count or None."""
+    meta: Dict[str, Any] = {}
+    pages = _iter_pages(client, params=params, concurrency=concurrency, meta=meta)
+    return _dedupe_by_id([rule for page in pages for rule in page]), meta.get("total_count")
+
+
+def _require_complete(rules: List[Any], total_count: Optional[int], *, action: str) -> None:
+    """
+    Raise if a full listing returned fewer rules than the server reported.
+
+    Raises:
+        ValueError: If `rules` is shorter than `total_count`.
+    """
+    if total_count is not None and len(rules) < int(total_count):
+        raise ValueError(
+            f"Fetched {len(rules)} of {total_count} ignore rules (rules changed while paging?); {action}. Retry."
+        )
+
+
 def get_ignore_rule(client: XrayClient, rule_id: str) -> Any:
     """
     Retrieve a single ignore rule and normalize output.
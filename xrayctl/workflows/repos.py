@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from xrayctl.api import repos as repos_api
+from xrayctl.repo_catalog import RepoCatalog, repo_entry_name
+
+if TYPE_CHECKING:
+    from xrayctl.api.client import XrayClient
+
+
+def fetch_repos(client: XrayClient, *, page_size: int) -> List[Dict[str, Any]]:
+    """Every repository in the Xray listing, paging `/repos` until the last page."""
+    offset = 0
+    repos: List[Dict[str, Any]] = []
+
+    while True:
+        resp = repos_api.list_repos(client, offset=offset, num_of_rows=page_size)
+        data = resp.get("data") or resp.get("repos") or []  # some envs differ in key name
+        repos.extend(data)
+
+        next_offset = resp.get("offset", -1)
+        if next_offset == -1:
+            break
+        offset = int(next_offset)
+
+    return repos
+
+
+def load_repos(
+    client: XrayClient,
+    *,
+    page_size: int,
+    catalog_path: Optional[str],
+    ttl: float,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    The repository listing, from the local catalog when it is recent enough.
+
+    A catalog synced from the client's server with the client's token less
+    than `ttl` seconds ago is used as is. Otherwise the listing is fetched and stored in the catalog
+    for the next command. The catalog only saves requests: if it cannot be
+    read or written, the listing is fetched as before.
+
+    Args:
+        client: Initialized XrayClient.
+        page_size: Repos per page when fetching.
+        catalog_path: Catalog file (default under ~/.cache/xrayctl).
+        ttl: Max catalog age in seconds; 0 always fetches.
+
+    Returns:
+        `(repos, source)`, where source says whether the listing came from
+        the catalog (and how old it is) or from Xray.
+    """
+    catalog = RepoCatalog(catalog_path)
+    try:
+        with catalog:
+            if ttl > 0 and catalog.path.exists() and catalog.is_fresh(url=client.base_url, token=client.token, ttl=ttl):
+                return catalog.repos(), {"source": "catalog", **catalog.info()}
+    except (sqlite3.Error, ValueError):
+        pass
+
+    repos = fetch_repos(client, page_size=page_size)
+    try:
+        with catalog:
+            catalog.replace(repos, url=client.base_url, token=client.token)
+    except (sqlite3.Error, OSError, ValueError):
+        pass
+    return repos, {"source": "xray"}
+
+
+def sync_repos(client: XrayClient, *, catalog_path: Optional[str], page_size: int) -> Dict[str, Any]:
+    """
+    Store the full repository listing in the local catalog.
+
+    Args:
+        client: Initialized XrayClient.
+        catalog_path: Catalog file (default under ~/.cache/xrayctl).
+        page_size: Repos per page while fetching.
+
+    Returns:
+        Sync summary including the catalog path, repo count and sync time.
+    """
+    if page_size < 1:
+        raise ValueError("--page-size must be >= 1")
+
+    repos = fetch_repos(client, page_size=page_size)
+    with RepoCatalog(catalog_path) as catalog:
+        info = catalog.replace(repos, url=client.base_url, token=client.token)
+    return {"ok": True, **info}
+
+
+def list_repos(
+    client: Optional[XrayClient],
+    *,
+    repo_regex: Optional[str],
+    page_size: int,
+    local: bool = False,
+    catalog_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    List repositories, from Xray or from the local catalog.
+
+    Args:
+        client: Initialized XrayClient (unused with `local`).
+        repo_regex: Only include repos whose name matches this regex.
+        page_size: Repos per page when fetching.
+        local: Read the catalog written by `repos sync` instead of Xray.
+        catalog_path: Catalog file (default under ~/.cache/xrayctl).
+
+    Returns:
+        The matching repos in listing order, plus the catalog's sync
+        metadata with `local`.
+
+    Raises:
+        ValueError: If the regex is invalid, or with `local` if the catalog
+            was never synced.
+    """
+    if page_size < 1:
+        raise ValueError("--page-size must be >= 1")
+    try:
+        pattern = re.compile(repo_regex) if repo_regex else None
+    except re.error as e:
+        raise ValueError(f"Invalid --repo-regex: {e}") from e
+
+    if local:
+        catalog = RepoCatalog(catalog_path)
+        if not catalog.path.exists():
+            raise ValueError(f"No local repo catalog at {catalog.path}; run `xrayctl repos sync` first")
+        with catalog:
+            info = catalog.info()
+            if not info:
+                raise ValueError(f"Local repo catalog was never synced: {catalog.path}")
+            repos = catalog.repos(pattern)
+        return {"ok": True, "response": {"data": repos, "total_count": len(repos)}, "local": info}
+
+    assert client is not None
+    repos = [r for r in fetch_repos(client, page_size=page_size) if pattern is None or _matches(pattern, r)]
+    return {"ok": True, "response": {"data": repos, "total_count": len(repos)}}
+
+
+def _matches(pattern: "re.Pattern[str]", repo: Dict[str, Any]) -> bool:
+    name = repo_entry_name(repo) if isinstance(repo, dict) else None
+    return bool(name and pattern.search(name))
@@ -1,10 +1,17 @@
 from __future__ import annotations
 
+import csv
+import heapq
+import json
 import time
-from typing import Any, Dict, Optional
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait as wait_futures
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from xrayctl.api.client import XrayClient
 from xrayctl.api import scans as scans_api
+from xrayctl.errors import XrayHTTPError
+from xrayctl.polling import PollSchedule, ScanDurationHistory, package_type
 
 
 # These are common terminal-ish values; if your instance returns different ones,
@@ -12,6 +19,58 @@ from xrayctl.api import scans as scans_api
 _TERMINAL = {"DONE", "FAILED", "PARTIAL", "NOT_SUPPORTED"}
 
 
+def _extract_status(status_resp: Any) -> Optional[str]:
+    # Different Xray versions may shape this differently; we try a couple common patterns.
+    # If you see your instance returns something else, we can adjust here.
+    if isinstance(status_resp, dict):
+        overall = status_resp.get("overall") or status_resp.get("summary") or {}
+        if isinstance(overall, dict):
+            return overall.get("status") or overall.get("scan_status") or status_resp.get("status")
+    return None
+
+
+def _history(learn: bool, history_path: Optional[str]) -> Optional[ScanDurationHistory]:
+    return ScanDurationHistory(history_path) if learn else None
+
+
+def _schedule(
+    history: Optional[ScanDurationHistory],
+    component_id: str,
+    *,
+    poll_seconds: int,
+    max_poll_seconds: int,
+    deadline: float,
+) -> PollSchedule:
+    first = history.expected(package_type(component_id)) if history is not None else None
+    if first is not None:
+        # One slow scan must not push the first poll of every later (possibly quick) scan far out
+        first = min(first, max_poll_seconds)
+    return PollSchedule(interval=poll_seconds, max_interval=max_poll_seconds, deadline=deadline, first=first)
+
+
+def _learn(
+    history: Optional[ScanDurationHistory],
+    component_id: str,
+    *,
+    triggered_at: float,
+    last_pending_at: Optional[float],
+) -> None:
+    if history is None:
+        return
+    # The scan finished somewhere between the last pending poll and now.
+    finished_at = ((last_pending_at or triggered_at) + time.monotonic()) / 2
+    history.record(package_type(component_id), finished_at - triggered_at)
+
+
+def _validate_polling(poll_seconds: int, max_poll_seconds: int, timeout_seconds: int) -> None:
+    if poll_seconds < 1:
+        raise ValueError("--poll-seconds must be >= 1")
+    if max_poll_seconds < poll_seconds:
+        raise ValueError("--max-poll-seconds must be >= --poll-seconds")
+    if timeout_seconds < 1:
+        raise ValueError("--timeout-seconds must be >= 1")
+
+
 def scan_artifact(
     client: XrayClient,
     *,
@@ -21,24 +80,37 @@ def scan_artifact(
     path: Optional[str],
     poll_seconds: int,
     timeout_seconds: int,
+    max_poll_seconds: int = 60,
+    learn: bool = True,
+    history_path: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
-    Retrieve a single ignore rule and normalize output.
+    Trigger an on-demand scan and optionally wait for it to complete.
+
+    With `wait`, status is polled on a PollSchedule: the first poll lands at
+    the duration learned for this package type, at most `max_poll_seconds`
+    (or `poll_seconds` without history), later polls back off with jitter up to `max_poll_seconds`,
+    and a monotonic deadline bounds the total wait.
 
     Args:
         client: Initialized XrayClient.
-        rule_id: Ignore rule identifier.
+        component_id: Xray component identifier.
+        wait: Poll until the scan reaches a terminal status.
+        repo: Repo key for status polling (required for `wait`).
+        path: Artifact path for status polling (required for `wait`).
+        poll_seconds: Initial polling interval.
+        timeout_seconds: Max wait time.
+        max_poll_seconds: Upper bound of the backed-off polling interval.
+        learn: Use and update locally recorded scan durations.
+        history_path: Scan duration history file (default under ~/.cache/xrayctl).
 
     Returns:
-        Structured ignore rule response.
+        Structured scan response.
     """
     if not component_id.strip():
         raise ValueError("--component-id must not be empty")
 
-    if poll_seconds < 1:
-        raise ValueError("--poll-seconds must be >= 1")
-    if timeout_seconds < 1:
-        raise ValueError("--timeout-seconds must be >= 1")
+    _validate_polling(poll_seconds, max_poll_seconds, timeout_seconds)
 
     # 1) Trigger scan
     start_resp = scans_api.scan_artifact(client, component_id)
@@ -56,22 +128,29 @@ def scan_artifact(
     if not repo or not path:
         raise ValueError("--wait requires --repo and --path (artifact status API uses repo/path, not component-id)")
 
-    deadline = time.time() + timeout_seconds
+    history = _history(learn, history_path)
+    triggered_at = time.monotonic()
+    schedule = _schedule(
+        history,
+        component_id,
+        poll_seconds=poll_seconds,
+        max_poll_seconds=max_poll_seconds,
+        deadline=triggered_at + timeout_seconds,
+    )
     last_status = None
     last_resp = None
+    last_pending_at = None
 
-    while time.time() < deadline:
+    while True:
+        time.sleep(schedule.next_delay())
         status_resp = scans_api.artifact_status(client, repo=repo, path=path)
         last_resp = status_resp
-
-        # Different Xray versions may shape this differently; we try a couple common patterns.
-        # If you see your instance returns something else, we can adjust here.
-        if isinstance(status_resp, dict):
-            overall = status_resp.get("overall") or status_resp.get("summary") or {}
-            if isinstance(overall, dict):
-                last_status = overall.get("status") or overall.get("scan_status") or status_resp.get("status")
+        last_status = _extract_status(status_resp)
 
         if last_status in _TERMINAL:
+            if last_status == "DONE" and history is not None:
+                _learn(history, component_id, triggered_at=triggered_at, last_pending_at=last_pending_at)
+                history.save()
             return {
                 "ok": last_status == "DONE",
                 "type": "artifact",
@@ -82,7 +161,9 @@ def scan_artifact(
                 "status": status_resp,
             }
 
-        time.sleep(poll_seconds)
+        last_pending_at = time.monotonic()
+        if schedule.expired():
+            break
 
     return {
         "ok": False,
@@ -94,3 +175,255 @@ def scan_artifact(
         "status": last_resp,
         "error": f"Timed out after {timeout_seconds}s waiting for artifact scan to complete",
     }
+
+
+def read_scan_targets(path: str) -> List[Dict[str, Optional[str]]]:
+    """
+    Read bulk scan targets from a CSV (with header) or NDJSON file.
+
+    Each row needs `component_id`; `repo` and `path` are needed to track
+    completion. Files ending in .ndjson/.jsonl, or whose first character is
+    `{`, are read as NDJSON; anything else as CSV.
+
+    Returns:
+        List of {"component_id", "repo", "path"} dicts in file order.
+
+    Raises:
+        ValueError: If the file is missing, malformed or a row lacks component_id.
+    """
+    p = Path(path).expanduser()
+    if not p.is_file():
+        raise ValueError(f"--from-file not found: {path}")
+
+    with p.open("r", encoding="utf-8", newline="") as f:
+        text = f.read()
+
+    rows: List[Tuple[int, Dict[str, Any]]] = []
+    if p.suffix.lower() in (".ndjson", ".jsonl") or text.lstrip().startswith("{"):
+        for lineno, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{lineno}: invalid JSON ({e})") from e
+            if not isinstance(obj, dict):
+                raise ValueError(f"{path}:{lineno}: expected a JSON object")
+            rows.append((lineno, obj))
+    else:
+        reader = csv.DictReader(text.splitlines())
+        # Line 1 is the header
+        rows = [(lineno, row) for lineno, row in enumerate(reader, start=2)]
+
+    targets: List[Dict[str, Optional[str]]] = []
+    for lineno, row in rows:
+        component_id = str(row.get("component_id") or "").strip()
+        if not component_id:
+            raise ValueError(f"{path}:{lineno}: missing component_id")
+        targets.append(
+            {
+                "component_id": component_id,
+                "repo": str(row.get("repo") or "").strip() or None,
+                "path": str(row.get("path") or "").strip() or None,
+            }
+        )
+    if not targets:
+        raise ValueError(f"--from-file contains no scan targets: {path}")
+    return targets
+
+
+def _error_fields(e: Exception) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"error": str(e)}
+    if isinstance(e, XrayHTTPError):
+        out["status_code"] = e.status_code
+    return out
+
+
+def scan_artifacts(
+    client: XrayClient,
+    *,
+    from_file: str,
+    wait: bool,
+    concurrency: int,
+    poll_seconds: int,
+    timeout_seconds: int,
+    max_poll_seconds: int = 60,
+    learn: bool = True,
+    history_path: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Trigger scans for many artifacts and yield each result as it finishes.
+
+    Scans are triggered on a pool of `concurrency` workers. With `wait`, the
+    same pool also runs every status poll: one scheduler keeps a single
+    queue of due polls across all artifacts, so tracking 2,000 scans costs
+    `concurrency` threads rather than one blocking loop per artifact. Each
+    artifact polls on its own PollSchedule (learned first poll, then jittered
+    backoff) with a deadline `timeout_seconds` after its trigger.
+
+    Results are yielded in completion order, followed by one summary record
+    (`"type": "summary"`).
+
+    Args:
+        client: Initialized XrayClient.
+        from_file: CSV or NDJSON file of component_id/repo/path.
+        wait: Poll each artifact until its scan reaches a terminal status.
+        concurrency: Max requests in flight.
+        poll_seconds: Initial polling interval per artifact.
+        timeout_seconds: Max wait per artifact.
+        max_poll_seconds: Upper bound of the backed-off polling interval.
+        learn: Use and update locally recorded scan durations.
+        history_path: Scan duration history file (default under ~/.cache/xrayctl).
+
+    Returns:
+        Iterator of per-artifact result dicts, then the summary.
+    """
+    if concurrency < 1:
+        raise ValueError("--concurrency must be >= 1")
+    _validate_polling(poll_seconds, max_poll_seconds, timeout_seconds)
+
+    targets = read_scan_targets(from_file)
+    if wait:
+        missing = [t["component_id"] for t in targets if not t["repo"] or not t["path"]]
+        if missing:
+            raise ValueError(
+                f"--wait requires repo and path for every row; missing for {len(missing)} row(s), "
+                f"e.g. {missing[0]}"
+            )
+
+    # Validation is done before the first request; the rest runs lazily as results are consumed.
+    return _run_bulk_scan(
+        client,
+        targets=targets,
+        wait=wait,
+        concurrency=concurrency,
+        poll_seconds=poll_seconds,
+        timeout_seconds=timeout_seconds,
+        max_poll_seconds=max_poll_seconds,
+        history=_history(learn and wait, history_path),
+    )
+
+
+def _run_bulk_scan(
+    client: XrayClient,
+    *,
+    targets: List[Dict[str, Optional[str]]],
+    wait: bool,
+    concurrency: int,
+    poll_seconds: int,
+    timeout_seconds: int,
+    max_poll_seconds: int,
+    history: Optional[ScanDurationHistory],
+) -> Iterator[Dict[str, Any]]:
+    counts = {"done": 0, "failed": 0, "timed_out": 0, "started": 0}
+    started: Dict[int, Any] = {}
+    schedules: Dict[int, PollSchedule] = {}
+    triggered_at: Dict[int, float] = {}
+    last_pending_at: Dict[int, float] = {}
+    # (due time, target index) of every artifact waiting for its next poll
+    due: List[Tuple[float, int]] = []
+    to_trigger = iter(range(len(targets)))
+    inflight: Dict[Future, Tuple[str, int]] = {}
+
+    def result(i: int, **fields: Any) -> Dict[str, Any]:
+        t = targets[i]
+        rec: Dict[str, Any] = {"ok": False, "type": "artifact", "component_id": t["component_id"]}
+        if t["repo"] and t["path"]:
+            rec["artifact"] = {"repo": t["repo"], "path": t["path"], "project": client.project}
+        if i in started:
+            rec["started"] = started[i]
+        rec.update(fields)
+        return rec
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="xrayctl-scan") as pool:
+            while True:
+                # Fill free slots: due polls first (they are older work), then new triggers.
+                now = time.monotonic()
+                while len(inflight) < concurrency and due and due[0][0] <= now:
+                    _, i = heapq.heappop(due)
+                    t = targets[i]
+                    fut = pool.submit(scans_api.artifact_status, client, repo=t["repo"], path=t["path"])
+                    inflight[fut] = ("poll", i)
+                while len(inflight) < concurrency:
+                    i = next(to_trigger, None)
+                    if i is None:
+                        break
+                    inflight[pool.submit(scans_api.scan_artifact, client, targets[i]["component_id"])] = ("trigger", i)
+
+                if not inflight and not due:
+                    break
+
+                timeout = max(0.0, due[0][0] - time.monotonic()) if due else None
+                if not inflight:
+                    time.sleep(timeout or 0)
+                    continue
+                if due and len(inflight) >= concurrency:
+                    timeout = None
+                finished, _ = wait_futures(list(inflight), timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for fut in finished:
+                    kind, i = inflight.pop(fut)
+                    try:
+                        resp = fut.result()
+                    except Exception as e:
+                        counts["failed"] += 1
+                        yield result(i, **_error_fields(e))
+                        continue
+
+                    if kind == "trigger":
+                        started[i] = resp
+                        if not wait:
+                            counts["started"] += 1
+                            yield result(i, ok=True)
+                            continue
+                        cid = targets[i]["component_id"] or ""
+                        triggered_at[i] = time.monotonic()
+                        schedules[i] = _schedule(
+                            history,
+                            cid,
+                            poll_seconds=poll_seconds,
+                            max_poll_seconds=max_poll_seconds,
+                            deadline=triggered_at[i] + timeout_seconds,
+                        )
+                        heapq.heappush(due, (time.monotonic() + schedules[i].next_delay(), i))
+                        continue
+
+                    status = _extract_status(resp)
+                    if status in _TERMINAL:
+                        counts["done" if status == "DONE" else "failed"] += 1
+                        if status == "DONE":
+                            _learn(
+                                history,
+                                targets[i]["component_id"] or "",
+                                triggered_at=triggered_at[i],
+                                last_pending_at=last_pending_at.get(i),
+                            )
+                        yield result(i, ok=status == "DONE", final_status=status, status=resp)
+                        continue
+
+                    last_pending_at[i] = time.monotonic()
+                    if schedules[i].expired():
+                        counts["timed_out"] += 1
+                        yield result(
+                            i,
+                            final_status=status,
+                            status=resp,
+                            error=f"Timed out after {timeout_seconds}s waiting for artifact scan to complete",
+                        )
+                    else:
+                        heapq.heappush(due, (time.monotonic() + schedules[i].next_delay(), i))
+    finally:
+        if history is not None:
+            history.save()
+
+    summary: Dict[str, Any] = {
+        "ok": counts["failed"] == 0 and counts["timed_out"] == 0,
+        "type": "summary",
+        "total": len(targets),
+    }
+    if wait:
+        summary.update(done=counts["done"], failed=counts["failed"], timed_out=counts["timed_out"])
+    else:
+        summary.update(started=counts["started"], failed=counts["failed"])
+    yield summary
@@ -1,5 +1,19 @@
 import argparse
 
+def _add_poll_tuning(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--max-poll-seconds",
+        type=int,
+        default=60,
+        help="Upper bound of the backed-off polling interval (default: 60)",
+    )
+    parser.add_argument(
+        "--no-learn",
+        dest="learn",
+        action="store_false",
+        help="Don't use or record learned scan durations (~/.cache/xrayctl/scan_durations.json)",
+    )
+
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(prog="xrayctl")
 
@@ -9,12 +23,86 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--token", default=None, help="JFrog access token")
     p.add_argument("--project", default=None, help="Optional Xray project key")
     p.add_argument("--timeout", type=int, default=None, help="HTTP timeout seconds")
-    p.add_argument("--format", choices=["json", "yaml"], default=None, help="Output format")
+    p.add_argument(
+        "--format",
+        choices=["json", "yaml", "ndjson"],
+        default=None,
+        help="Output format; ndjson prints one compact JSON record per line and streams list results",
+    )
+    p.add_argument("--output-file", default=None, metavar="PATH", help="Write the result to PATH instead of stdout")
+    p.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Attach per-endpoint request metrics (counts, latency percentiles, bytes, retries, statuses) to the output",
+    )
+    p.add_argument("--metrics-file", default=None, metavar="PATH", help="Write the request metrics as JSON to PATH instead")
+    p.add_argument(
+        "--profile",
+        choices=["cpu", "mem"],
+        default=None,
+        help="Profile the command with cProfile (cpu) or tracemalloc (mem); a summary is printed to stderr",
+    )
+    p.add_argument(
+        "--profile-file",
+        default=None,
+        metavar="PATH",
+        help="Where to write the profile (default: xrayctl-cpu.prof pstats / xrayctl-mem.folded collapsed stacks)",
+    )
+    p.add_argument("--profile-top", type=int, default=25, metavar="N", help="Entries in the profile summary (default: 25)")
+    p.add_argument("--pool-size", type=int, default=None, help="Max pooled HTTP connections kept open to Xray (default: 10)")
+    p.add_argument(
+        "--no-keep-alive",
+        dest="keep_alive",
+        action="store_const",
+        const=False,
+        default=None,
+        help="Close the HTTP connection after every request instead of reusing it",
+    )
+    p.add_argument(
+        "--cache-ttl",
+        type=int,
+        default=None,
+        help="Serve GET responses from the local cache for this many seconds (default: 0, cache off)",
+    )
+    p.add_argument("--cache-dir", default=None, help="Response cache directory (default: ~/.cache/xrayctl/http)")
+    p.add_argument("--no-cache", action="store_true", help="Bypass the response cache for this command")
+    p.add_argument(
+        "--max-retries",
+        type=int,
+        default=None,
+        help="Retries for throttled (429) and transient (5xx/connection) failures (default: 3)",
+    )
+    p.add_argument(
+        "--rate-limit",
+        type=float,
+        default=None,
+        help="Cap requests per second; lowered automatically while Xray throttles (default: no cap)",
+    )
+
+    p.add_argument(
+        "--daemon-socket",
+        default=None,
+        metavar="PATH",
+        help="Socket of 'xrayctl serve' (default: $XRAY_DAEMON_SOCKET or ~/.cache/xrayctl/daemon.sock)",
+    )
+    p.add_argument("--no-daemon", action="store_true", help="Run in this process even if 'xrayctl serve' is running")
 
     sub = p.add_subparsers(dest="command", required=True)
 
     sub.add_parser("hello", help="Sanity check the CLI wiring")
 
+    serve = sub.add_parser(
+        "serve",
+        help="Run a local daemon that answers CLI calls with warm imports and connections",
+    )
+    serve.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=0,
+        help="Exit after this many seconds without commands (default: 0, run until stopped)",
+    )
+    serve.add_argument("--stop", action="store_true", help="Stop the daemon listening on --daemon-socket")
+
     ping = sub.add_parser("ping", help="Check connectivity/auth against Xray")
     ping.set_defaults(handler="ping")
 
@@ -29,7 +117,10 @@ def build_parser() -> argparse.ArgumentParser:
     cfg_view.set_defaults(handler="config_view")
 
     cfg_set = cfg_sub.add_parser("set", help="Set a config value")
-    cfg_set.add_argument("key", choices=["url", "token", "project", "timeout", "format"])
+    cfg_set.add_argument(
+        "key",
+        choices=["url", "token", "project", "timeout", "format", "pool_size", "keep_alive", "cache_ttl", "cache_dir", "max_retries", "rate_limit"],
+    )
     cfg_set.add_argument("value")
     cfg_set.set_defaults(handler="config_set")
 
@@ -80,6 +171,11 @@ def build_parser() -> argparse.ArgumentParser:
 
     # Convenience: fetch all pages
     ir_list.add_argument("--all", action="store_true", help="Fetch all pages")
+    ir_list.add_argument("--concurrency", type=int, default=4, help="Pages fetched in parallel with --all")
+
+    # Offline queries against the index written by `ignore-rules sync`
+    ir_list.add_argument("--local", action="store_true", help="Query the local index instead of Xray")
+    ir_list.add_argument("--index", default=None, help="Local index path (default: ~/.cache/xrayctl/ignore_rules.sqlite)")
 
     ir_list.set_defaults(handler="ignore_rules_list")
 
@@ -87,6 +183,18 @@ def build_parser() -> argparse.ArgumentParser:
     ir_get.add_argument("id", help="Ignore rule id")
     ir_get.set_defaults(handler="ignore_rules_get")
 
+    ir_sync = ir_sub.add_parser("sync", help="Mirror all ignore rules into a local SQLite index")
+    ir_sync.add_argument("--index", default=None, help="Local index path (default: ~/.cache/xrayctl/ignore_rules.sqlite)")
+    ir_sync.add_argument("--rows", type=int, default=500, help="Rules per page while syncing")
+    ir_sync.add_argument("--concurrency", type=int, default=4, help="Pages fetched in parallel")
+    ir_sync.set_defaults(handler="ignore_rules_sync")
+
+    ir_apply = ir_sub.add_parser("apply", help="Create the ignore rules in a file that don't exist yet")
+    ir_apply.add_argument("-f", "--file", required=True, help="Rules file (.yaml/.yml or .csv)")
+    ir_apply.add_argument("--concurrency", type=int, default=4, help="Max create requests in flight")
+    ir_apply.add_argument("--dry-run", action="store_true", help="Report what would be created without creating")
+    ir_apply.set_defaults(handler="ignore_rules_apply")
+
 
 
     # scan
@@ -104,11 +212,25 @@ def build_parser() -> argparse.ArgumentParser:
     scan_art.add_argument("--repo", default=None, help="Repo key for status polling (required for --wait)")
     scan_art.add_argument("--path", default=None, help="Artifact path in repo for status polling (required for --wait)")
     scan_art.add_argument("--wait", action="store_true", help="Poll status until scan completes (requires --repo and --path)")
-    scan_art.add_argument("--poll-seconds", type=int, default=5, help="Polling interval when --wait is set")
+    scan_art.add_argument("--poll-seconds", type=int, default=5, help="Initial polling interval when --wait is set")
     scan_art.add_argument("--timeout-seconds", type=int, default=300, help="Max wait time when --wait is set")
+    _add_poll_tuning(scan_art)
 
     scan_art.set_defaults(handler="scan_artifact")
 
+    scan_bulk = scan_sub.add_parser("artifacts", help="Trigger scans for many artifacts listed in a file")
+    scan_bulk.add_argument(
+        "--from-file",
+        required=True,
+        help="CSV (with header) or NDJSON file with component_id, repo, path per artifact",
+    )
+    scan_bulk.add_argument("--wait", action="store_true", help="Poll status until every scan completes (requires repo and path)")
+    scan_bulk.add_argument("--concurrency", type=int, default=8, help="Max scan/status requests in flight")
+    scan_bulk.add_argument("--poll-seconds", type=int, default=5, help="Initial polling interval per artifact when --wait is set")
+    scan_bulk.add_argument("--timeout-seconds", type=int, default=900, help="Max wait per artifact when --wait is set")
+    _add_poll_tuning(scan_bulk)
+    scan_bulk.set_defaults(handler="scan_artifacts")
+
 
     # artifacts
     arts = sub.add_parser("artifacts", help="Artifact inventory commands")
@@ -120,7 +242,118 @@ def build_parser() -> argparse.ArgumentParser:
     arts_refresh.add_argument("--repo-page-size", type=int, default=200, help="Repos page size per request")
     arts_refresh.add_argument("--repo-regex", default=None, help="Only include repos whose name matches this regex")
     arts_refresh.add_argument("--include-repo-metadata", action="store_true", help="Add repo metadata columns if available")
+    arts_refresh.add_argument("--concurrency", type=int, default=4, help="Number of repositories fetched in parallel")
+    arts_refresh.add_argument(
+        "--stream",
+        action="store_true",
+        help="Flush rows to disk page by page (parquet row groups / csv chunks) to keep memory flat",
+    )
+    arts_refresh.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Refetch only repos that changed since the previous --out (uses its manifest) and splice them in",
+    )
+    arts_refresh.add_argument("--manifest", default=None, help="Per-repo manifest path (default: <out>.manifest.json)")
+    arts_refresh.add_argument(
+        "--max-age-hours",
+        type=float,
+        default=168,
+        help="With --incremental, always refetch repos refreshed longer ago than this (default: 168)",
+    )
+    arts_refresh.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="Journal fetched pages to disk so an interrupted run can be resumed with --resume",
+    )
+    arts_refresh.add_argument(
+        "--checkpoint-dir",
+        default=None,
+        help="Directory for the resumable progress journal (default: <out>.checkpoint)",
+    )
+    arts_refresh.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted --checkpoint refresh from its checkpoint instead of starting over",
+    )
+    arts_refresh.add_argument(
+        "--partition-by",
+        choices=["repo"],
+        default=None,
+        help="Write a hive-style dataset directory (--out dir/) with one parquet partition per repo",
+    )
+    arts_refresh.add_argument(
+        "--unknown-columns",
+        choices=["keep", "drop"],
+        default="keep",
+        help="Columns outside the inventory schema: keep them as strings (default) or drop them",
+    )
+    arts_refresh.add_argument(
+        "--catalog-ttl",
+        type=float,
+        default=3600,
+        help="Use the local repo catalog instead of listing repos if it is younger than this (default: 3600s; 0: never)",
+    )
+    arts_refresh.add_argument("--catalog", default=None, help="Repo catalog path (default: ~/.cache/xrayctl/repos.sqlite)")
     arts_refresh.set_defaults(handler="artifacts_refresh")
 
+    arts_query = arts_sub.add_parser("query", help="Query an inventory file written by 'artifacts refresh'")
+    arts_query.add_argument("--inventory", default="artifacts.parquet", help="Inventory file (.parquet or .csv) or partitioned dataset directory")
+    arts_query.add_argument("--repo", action="append", default=None, help="Repo name (repeatable)")
+    arts_query.add_argument("--name", default=None, help="Glob on the artifact name, e.g. 'alpine*'")
+    arts_query.add_argument("--path", default=None, help="Glob on the artifact path")
+    arts_query.add_argument("--sha256", action="append", default=None, help="Artifact checksum (repeatable)")
+    arts_query.add_argument("--min-size", default=None, help="Minimum size, e.g. 1048576 or 10MB")
+    arts_query.add_argument("--max-size", default=None, help="Maximum size, e.g. 2GB")
+    arts_query.add_argument(
+        "--where",
+        action="append",
+        default=None,
+        help="Condition on any column: COLUMN OP VALUE with OP one of = != > >= < <= (repeatable)",
+    )
+    arts_query.add_argument("--columns", default=None, help="Comma-separated columns to return (default: all)")
+    arts_query.add_argument("--limit", type=int, default=None, help="Max rows returned")
+    arts_query.add_argument(
+        "--result-format",
+        choices=["json", "yaml", "ndjson", "csv"],
+        default=None,
+        help="Output format for rows (default: --format); ndjson and csv stream rows as they are read",
+    )
+    arts_query.set_defaults(handler="artifacts_query")
+
+    # repos
+    repos = sub.add_parser("repos", help="Repository listing and the local repo catalog")
+    repos_sub = repos.add_subparsers(dest="subcommand", required=True)
+
+    repos_sync = repos_sub.add_parser("sync", help="Store the full repo listing in the local repo catalog")
+    repos_sync.add_argument("--page-size", type=int, default=200, help="Repos page size per request")
+    repos_sync.add_argument("--catalog", default=None, help="Repo catalog path (default: ~/.cache/xrayctl/repos.sqlite)")
+    repos_sync.set_defaults(handler="repos_sync")
+
+    repos_list = repos_sub.add_parser("list", help="List repositories")
+    repos_list.add_argument("--repo-regex", default=None, help="Only include repos whose name matches this regex")
+    repos_list.add_argument("--page-size", type=int, default=200, help="Repos page size per request")
+    repos_list.add_argument("--local", action="store_true", help="Read the local repo catalog instead of Xray")
+    repos_list.add_argument("--catalog", default=None, help="Repo catalog path (default: ~/.cache/xrayctl/repos.sqlite)")
+    repos_list.set_defaults(handler="repos_list")
+
+    # batch
+    batch = sub.add_parser(
+        "batch",
+        help="Run many commands (NDJSON specs) in one process on a shared connection pool",
+    )
+    batch.add_argument(
+        "--from-file",
+        default=None,
+        help="NDJSON file with one command spec per line (default: stdin)",
+    )
+    batch.add_argument("--concurrency", type=int, default=8, help="Max commands running at once")
+    batch.add_argument(
+        "--order",
+        choices=["input", "completion"],
+        default="input",
+        help="Emit results in input order (default) or as each command completes",
+    )
+    batch.set_defaults(handler="batch")
+
 
     return p